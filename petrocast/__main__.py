@@ -7,6 +7,7 @@ This script initializes execution and delegates processing to `run.py`.
 import argparse
 from pathlib import Path
 from petrocast.run import run_petrocast
+from petrocast.watch import PetroCastWatcher
 
 
 def main():
@@ -20,6 +21,8 @@ def main():
     - petrocast example_1 : runs the example_1 with the historical data and estimate 1 (Laherrare et al. 2022).
     - petrocast example_2 : runs the example_2 with the historical data and estimate 2 (IEA Reserves + cumulative extraction). 
     - python -m petrocast --config examples/config.toml --urr-key \"Estimate1\" : runs using a custom configuration file and estimate 1 (Laherrare et al. 2022).
+    - petrocast --watch --urr-key all : refits every estimate whenever the dataset, URR file or configuration changes.
+    - petrocast example_1 --units EJ,Gb : reports example_1 in EJ and Gb from a single fit.
     """
     # Parse command-line arguments
     parser = argparse.ArgumentParser(
@@ -45,15 +48,37 @@ def main():
         "--urr-key", type=str, required=False, default="Estimate1",
         help="Specify the URR estimate to use from the file."
     )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running and refit the affected estimates whenever the dataset, URR file "
+             "or configuration changes. --urr-key accepts a comma-separated list or 'all'."
+    )
+    parser.add_argument(
+        "--units", type=str, required=False, default=None,
+        help="Comma-separated units to report (e.g. EJ,Gb). The models are fitted once and "
+             "rescaled to every unit, except units whose URR estimate is listed separately."
+    )
     args = parser.parse_args()
     # Process the arguments
     if args.example_name:
         arg_cfn = config_file_name
-        urr_key = f"Estimate{args.example_name.split("_")[1]}"
+        urr_key = f"Estimate{args.example_name.split('_')[1]}"
     else:
         arg_cfn = args.config
         urr_key = args.urr_key
-    run_petrocast(config_path=arg_cfn, urr_key=urr_key, root_path=root_folder)
+
+    if args.watch:
+        urr_keys = None if urr_key == "all" else urr_key.split(",")
+        PetroCastWatcher(arg_cfn, urr_keys, root_folder).run()
+        return
+
+    print("Wait, processing request...")
+    units = args.units.split(",") if args.units else None
+    result = run_petrocast(config_path=arg_cfn, urr_key=urr_key, root_path=root_folder,
+                           units=units)
+    for unit_result in (result.values() if units else [result]):
+        print(unit_result.summary())
+        unit_result.plot()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""
+Data-driven initial guesses from linearized production curves.
+
+Hubbert linearization: for a logistic curve, production ``q`` and cumulative production
+``Q`` satisfy ``q = a * Q * (1 - Q / U)``, so steepness ``a`` (and, if unknown, the URR
+``U``) follow from one linear least-squares solve of ``q`` on ``Q`` and ``Q**2``. The
+Gompertz curve has the analogous transform ``q = b * Q * log(U / Q)``. The peak year then
+follows from inverting the cumulative curve at every observation.
+
+Production before the first observed year is unknown. For the logistic curve it follows
+from a quadratic fit of ``q`` on the observed cumulative sum (the offset shifts the
+intercept and slope); it is then refined, as for the Gompertz curve, by evaluating the
+fitted cumulative curve half a year before the first observation and re-solving. All
+functions work on padded ``(n_series, n_years)`` arrays with a mask of observed entries
+(annual data), so a whole batch of series is initialized with a handful of array
+operations.
+"""
+
+import numpy as np
+from scipy.special import expit, logit
+
+
+def _first_year(years, mask):
+    """Year of the first observed entry of every row."""
+    return np.take_along_axis(years, np.argmax(mask, axis=1)[:, None], axis=1)[:, 0]
+
+
+def history_cumulative(production, mask, offset=0.0):
+    """
+    Cumulative production at every observation (annual data, mid-year convention).
+
+    Parameters:
+        production (np.ndarray): Production, shape ``(n_series, n_years)``.
+        mask (np.ndarray): Boolean mask of observed entries.
+        offset (float or np.ndarray): Production before the first observation, per row.
+
+    Returns:
+        np.ndarray: ``offset + sum of earlier years + half the current year``.
+    """
+    q = np.where(mask, production, 0.0)
+    return np.asarray(offset, dtype=np.float64).reshape(-1, 1) + np.cumsum(q, axis=1) - q / 2
+
+
+def _logistic_offset(production, mask):
+    """
+    Pre-history production implied by a quadratic fit ``q = c0 + c1 * S + c2 * S**2``.
+
+    With ``Q = Q0 + S`` the logistic relation ``q = a * Q + b * Q**2`` becomes such a
+    quadratic with ``b = c2`` and ``Q0`` the smaller root of ``b * Q0**2 - c1 * Q0 + c0``.
+    Rows where the fit is degenerate get 0.
+    """
+    observed = history_cumulative(production, mask)
+    basis = np.stack([mask.astype(np.float64), np.where(mask, observed, 0.0),
+                      np.where(mask, observed ** 2, 0.0)], axis=-1)
+    q = np.where(mask, production, 0.0)
+    normal = np.einsum("nti,ntj->nij", basis, basis)
+    rhs = np.einsum("nti,nt->ni", basis, q)
+    usable = np.linalg.matrix_rank(normal) == 3
+    coefficients = np.full(rhs.shape, np.nan)
+    if usable.any():
+        coefficients[usable] = np.linalg.solve(normal[usable], rhs[usable][..., None])[..., 0]
+    c0, c1, c2 = coefficients.T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        offset = (c1 - np.sqrt(c1 ** 2 - 4 * c2 * c0)) / (2 * c2)
+    return np.where(np.isfinite(offset) & (offset >= 0), offset, 0.0)
+
+
+def _weighted_mean(values, weights):
+    """Row-wise weighted mean ignoring non-finite values (NaN for empty rows)."""
+    valid = np.isfinite(values) & (weights > 0)
+    total = np.sum(np.where(valid, weights, 0.0), axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.sum(np.where(valid, weights * values, 0.0), axis=1) / total
+
+
+def _ratio(numerator, denominator):
+    """Row-wise ratio of sums, NaN where the denominator vanishes."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def logistic_linearization(years, production, mask, urr=None, iterations=2):
+    """
+    Hubbert-linearization estimate of logistic parameters for stacked series.
+
+    Parameters:
+        years (np.ndarray): Years, shape ``(n_series, n_years)``.
+        production (np.ndarray): Production, same shape as `years`.
+        mask (np.ndarray): Boolean mask of observed entries.
+        urr (float or np.ndarray, optional): Known URR per series. Rows without a finite
+            URR estimate it from the data (``q = a * Q + b * Q**2`` gives ``U = -a / b``).
+        iterations (int): Number of refinements of the pre-history production.
+
+    Returns:
+        dict: ``{'steepness', 'peak_time', 'urr'}`` arrays of shape ``(n_series,)``;
+        NaN where the history does not determine the parameters.
+    """
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool) & np.isfinite(production)
+    n_series = years.shape[0]
+    known = np.broadcast_to(np.asarray(np.nan if urr is None else urr, dtype=np.float64),
+                            (n_series,))
+    fixed = np.isfinite(known) & (known > 0)
+
+    q = np.where(mask, production, 0.0)
+    first_year = _first_year(years, mask)
+    offset = _logistic_offset(q, mask)
+    steepness = peak_time = total = np.full(n_series, np.nan)
+
+    for _ in range(iterations):
+        cumulative = history_cumulative(q, mask, offset)
+        c1 = np.where(mask, cumulative, 0.0)
+        c2 = c1 ** 2
+
+        # Free URR: least squares of q on [Q, Q**2] through the origin
+        s11, s12, s22 = np.sum(c1 * c1, 1), np.sum(c1 * c2, 1), np.sum(c2 * c2, 1)
+        r1, r2 = np.sum(q * c1, 1), np.sum(q * c2, 1)
+        det = s11 * s22 - s12 ** 2
+        a_free = _ratio(r1 * s22 - r2 * s12, det)
+        b_free = _ratio(s11 * r2 - s12 * r1, det)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            urr_free = np.where((a_free > 0) & (b_free < 0), -a_free / b_free, np.nan)
+        urr_free = np.where(urr_free > c1.max(axis=1), urr_free, np.nan)
+
+        # Known URR: least squares of q on Q * (1 - Q / U)
+        total = np.where(fixed, known, urr_free)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            basis = np.where(mask, c1 * (1 - c1 / total[:, None]), 0.0)
+        steepness = _ratio(np.sum(q * basis, 1), np.sum(basis ** 2, 1))
+        steepness = np.where(steepness > 0, steepness, np.nan)
+
+        # Peak year from inverting Q(t) = U * expit(a * (t - peak_time)) at every point
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = np.where(mask, c1 / total[:, None], np.nan)
+            share = np.where((share > 0) & (share < 1), share, np.nan)
+            peaks = years - logit(share) / steepness[:, None]
+        peak_time = _weighted_mean(peaks, q)
+
+        offset = total * expit(steepness * (first_year - 0.5 - peak_time))
+        offset = np.where(np.isfinite(offset), offset, 0.0)
+
+    return {"steepness": steepness, "peak_time": peak_time, "urr": total}
+
+
+def gompertz_linearization(years, production, mask, urr, iterations=4):
+    """
+    Linearized estimate of Gompertz parameters for stacked series with known URR.
+
+    Uses ``q = b * Q * log(U / Q)`` and ``Q(t) = U * exp(-exp(-b * (t - peak_time)))``.
+
+    Parameters:
+        years (np.ndarray): Years, shape ``(n_series, n_years)``.
+        production (np.ndarray): Production, same shape as `years`.
+        mask (np.ndarray): Boolean mask of observed entries.
+        urr (float or np.ndarray): URR per series.
+        iterations (int): Number of estimates of the pre-history production.
+
+    Returns:
+        dict: ``{'steepness', 'peak_time'}`` arrays of shape ``(n_series,)``; NaN where
+        the history does not determine the parameters.
+    """
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool) & np.isfinite(production)
+    n_series = years.shape[0]
+    total = np.broadcast_to(np.asarray(urr, dtype=np.float64), (n_series,))
+
+    q = np.where(mask, production, 0.0)
+    first_year = _first_year(years, mask)
+    offset = np.zeros(n_series)
+    steepness = peak_time = np.full(n_series, np.nan)
+
+    for _ in range(iterations):
+        cumulative = history_cumulative(q, mask, offset)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            depletion = np.log(total[:, None] / cumulative)  # log(U / Q)
+            usable = mask & (cumulative > 0) & (depletion > 0)
+            basis = np.where(usable, cumulative * depletion, 0.0)
+        steepness = _ratio(np.sum(np.where(usable, q, 0.0) * basis, 1), np.sum(basis ** 2, 1))
+        steepness = np.where(steepness > 0, steepness, np.nan)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            peaks = np.where(usable, years + np.log(depletion) / steepness[:, None], np.nan)
+        peak_time = _weighted_mean(peaks, q)
+
+        with np.errstate(over="ignore", invalid="ignore"):
+            offset = total * np.exp(-np.exp(-steepness * (first_year - 0.5 - peak_time)))
+        offset = np.where(np.isfinite(offset), offset, 0.0)
+
+    return {"steepness": steepness, "peak_time": peak_time}
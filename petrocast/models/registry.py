@@ -0,0 +1,407 @@
+"""
+Registry of production (decline-curve) models.
+
+Every model registered here declares its parameter names and provides a vectorized
+evaluation, an analytic Jacobian, an analytic cumulative production curve and
+data-driven initial guesses (from a linearization of the curve, see
+`petrocast.models.linearization`). Fitting, projection and batch utilities look models up by
+name, so a new model family only has to be registered once to be usable everywhere.
+
+All methods broadcast over their arguments: passing parameter arrays of shape ``(n, 1)``
+together with a time array of shape ``(m,)`` evaluates ``n`` parameter sets at once.
+"""
+
+import numpy as np
+from scipy.special import expit, logit
+from petrocast.models.linearization import gompertz_linearization, logistic_linearization
+
+# Peak year window shared by the default fitting bounds of all models.
+PEAK_WINDOW = (2030, 2040)
+
+
+class DeclineModel:
+    """
+    Base class for registered production models.
+
+    Subclasses set the class attributes below and implement `evaluate`, `jacobian`,
+    `cumulative` and `initial_guesses`.
+
+    Attributes:
+        name (str): Registry name of the model.
+        param_names (tuple): Names of all model parameters, in evaluation order.
+        fixed (tuple): Parameters taken from the inputs (the URR) instead of being fitted.
+        scale_param (str): Parameter the production curve is linear in.
+        peak_param (str): Parameter holding the year of peak production.
+        bounds (dict): Default fitting bounds ``{name: (lower, upper)}`` of the free parameters.
+        default_guess (dict): Starting values used where the data do not determine an
+            initial guess.
+    """
+
+    name = None
+    param_names = ()
+    fixed = ()
+    scale_param = None
+    peak_param = None
+    bounds = {}
+    default_guess = {}
+
+    @property
+    def free_params(self):
+        """tuple: Names of the parameters estimated by the fitters."""
+        return tuple(name for name in self.param_names if name not in self.fixed)
+
+    def evaluate(self, t, *params):
+        """Annual production at time `t` (parameters in `param_names` order)."""
+        raise NotImplementedError
+
+    def jacobian(self, t, *params):
+        """Derivatives of `evaluate` w.r.t. every parameter, stacked on the last axis."""
+        raise NotImplementedError
+
+    def cumulative(self, t, *params):
+        """Cumulative production from the start of extraction up to time `t`."""
+        raise NotImplementedError
+
+    def total(self, *params):
+        """Ultimate cumulative production implied by the parameters."""
+        return self.cumulative(np.inf, *params)
+
+    def inverse_cumulative(self, fraction, *params):
+        """
+        Time at which cumulative production reaches a fraction of `total`.
+
+        Models without an analytic inverse raise NotImplementedError; callers then fall
+        back to numerical root finding on `cumulative`.
+        """
+        raise NotImplementedError
+
+    def inverse_rate(self, rate, *params):
+        """
+        Time after the peak at which annual production has declined to `rate`.
+
+        Models without an analytic inverse raise NotImplementedError; callers then fall
+        back to numerical root finding on `evaluate`.
+        """
+        raise NotImplementedError
+
+    def initial_guesses(self, years, production, mask, urr):
+        """
+        Initial guesses for the free parameters of stacked series.
+
+        Parameters:
+            years (np.ndarray): Years, shape ``(n_series, n_years)``.
+            production (np.ndarray): Production, same shape as `years`.
+            mask (np.ndarray): Boolean mask of observed entries.
+            urr (np.ndarray): URR per series, shape ``(n_series,)``.
+
+        Returns:
+            dict: ``{name: (n_series,) array}`` of starting values within `bounds`.
+        """
+        raise NotImplementedError
+
+    def initial_guess(self, years, production, urr):
+        """
+        Initial guess for the free parameters of a single series.
+
+        Parameters:
+            years (np.ndarray): Historical years.
+            production (np.ndarray): Historical production.
+            urr (float): Ultimate Recoverable Resources (URR).
+
+        Returns:
+            dict: Starting values keyed by free parameter name.
+        """
+        years = np.asarray(years, dtype=np.float64)[None, :]
+        production = np.asarray(production, dtype=np.float64)[None, :]
+        urr = np.array([np.nan if urr is None else urr], dtype=np.float64)
+        guesses = self.initial_guesses(years, production, np.ones(years.shape, dtype=bool), urr)
+        return {name: float(value[0]) for name, value in guesses.items()}
+
+    def _complete_guesses(self, guesses):
+        """Replaces undetermined guesses by `default_guess` and clips them to `bounds`."""
+        completed = {}
+        for name in self.free_params:
+            values = np.asarray(guesses[name], dtype=np.float64)
+            values = np.where(np.isfinite(values), values, self.default_guess.get(name, np.nan))
+            completed[name] = np.clip(values, *self.bounds.get(name, (-np.inf, np.inf)))
+        return completed
+
+    def fixed_values(self, urr):
+        """Values of the fixed parameters for a given URR."""
+        return {name: urr for name in self.fixed}
+
+    def params_to_args(self, params):
+        """
+        Orders a parameter dictionary for `evaluate`.
+
+        Parameters:
+            params (dict): Parameter values keyed by name.
+
+        Returns:
+            tuple: Parameter values in `param_names` order.
+        """
+        missing = [name for name in self.param_names if name not in params]
+        if missing:
+            raise ValueError(f"Missing parameters for model '{self.name}': {missing}")
+        return tuple(params[name] for name in self.param_names)
+
+    def rescale(self, params, factor):
+        """
+        Parameters of the same fit with production in another unit.
+
+        The curve is linear in `scale_param`, so scaling it by `factor` scales the
+        production, the cumulative and the least-squares optimum by the same factor; the
+        shape parameters do not depend on the unit.
+
+        Parameters:
+            params (dict): Parameter values (floats or arrays) keyed by name.
+            factor (float): Unit conversion factor, see `petrocast.utils.units.unit_factor`.
+
+        Returns:
+            dict: Rescaled copy of `params`.
+        """
+        rescaled = dict(params)
+        rescaled[self.scale_param] = params[self.scale_param] * factor
+        return rescaled
+
+    def __call__(self, t, **params):
+        """Evaluates the model with parameters passed by name."""
+        return self.evaluate(t, *self.params_to_args(params))
+
+    def __repr__(self):
+        return f"<{type(self).__name__} '{self.name}' {self.param_names}>"
+
+
+def _logistic_decline(ratio):
+    """
+    Solves ``expit(z) * expit(-z) == ratio`` for ``z >= 0`` (the declining side).
+
+    Ratios above the peak value 1/4 give 0 (the peak), non-positive ratios give NaN.
+    """
+    ratio = np.asarray(ratio, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        root = np.sqrt(np.clip(1 - 4 * ratio, 0, 1))
+        z = np.log((1 + root) / (1 - root))  # logit((1 + root) / 2)
+    return np.where(ratio > 0, z, np.nan)
+
+
+class HubbertModel(DeclineModel):
+    """Symmetric logistic (Hubbert) curve with the URR taken from the inputs."""
+
+    name = "hubbert"
+    param_names = ("urr", "steepness", "peak_time")
+    fixed = ("urr",)
+    scale_param = "urr"
+    peak_param = "peak_time"
+    bounds = {"steepness": (0.01, 0.05), "peak_time": PEAK_WINDOW}
+    default_guess = {"steepness": 0.02, "peak_time": 2040}  # Conservative peak assumption
+
+    def evaluate(self, t, urr, steepness, peak_time):
+        z = steepness * (t - peak_time)
+        return urr * steepness * expit(z) * expit(-z)
+
+    def jacobian(self, t, urr, steepness, peak_time):
+        z = steepness * (t - peak_time)
+        shape = expit(z) * expit(-z)
+        tilt = 1 - 2 * expit(z)
+        d_urr = steepness * shape
+        d_steepness = urr * shape * (1 + z * tilt)
+        d_peak_time = -urr * steepness ** 2 * shape * tilt
+        return np.stack(np.broadcast_arrays(d_urr, d_steepness, d_peak_time), axis=-1)
+
+    def cumulative(self, t, urr, steepness, peak_time):
+        return urr * expit(steepness * (t - peak_time))
+
+    def inverse_cumulative(self, fraction, urr, steepness, peak_time):
+        return peak_time + logit(fraction) / steepness
+
+    def inverse_rate(self, rate, urr, steepness, peak_time):
+        return peak_time + _logistic_decline(rate / (urr * steepness)) / steepness
+
+    def initial_guesses(self, years, production, mask, urr):
+        guesses = logistic_linearization(years, production, mask, urr)
+        return self._complete_guesses(guesses)
+
+
+class LaherrereModel(DeclineModel):
+    """Laherrère bell curve; the URR is implied by the fitted peak production and width."""
+
+    name = "laherrere"
+    param_names = ("peak_production", "tm", "c")
+    scale_param = "peak_production"
+    peak_param = "tm"
+    bounds = {"peak_production": (0, np.inf), "tm": PEAK_WINDOW, "c": (10, 300)}
+    default_guess = {"tm": 2040, "c": 100}  # Peak at 2040 with reasonable width
+
+    def evaluate(self, t, peak_production, tm, c):
+        # 2 / (1 + cosh(z)) == 4 * expit(z) * expit(-z), without overflow for large |z|
+        z = 5 / c * (t - tm)
+        return 4 * peak_production * expit(z) * expit(-z)
+
+    def jacobian(self, t, peak_production, tm, c):
+        z = 5 / c * (t - tm)
+        shape = 4 * expit(z) * expit(-z)
+        tilt = 1 - 2 * expit(z)
+        d_peak_production = shape
+        d_tm = -peak_production * shape * tilt * 5 / c
+        d_c = -peak_production * shape * tilt * z / c
+        return np.stack(np.broadcast_arrays(d_peak_production, d_tm, d_c), axis=-1)
+
+    def cumulative(self, t, peak_production, tm, c):
+        return 4 * peak_production * c / 5 * expit(5 / c * (t - tm))
+
+    def inverse_cumulative(self, fraction, peak_production, tm, c):
+        return tm + c / 5 * logit(fraction)
+
+    def inverse_rate(self, rate, peak_production, tm, c):
+        return tm + c / 5 * _logistic_decline(rate / (4 * peak_production))
+
+    def initial_guesses(self, years, production, mask, urr):
+        # The URR is estimated from the history; the given URR is only a fallback
+        free = logistic_linearization(years, production, mask)
+        fixed = logistic_linearization(years, production, mask, urr)
+        use_free = np.isfinite(free["urr"]) & np.isfinite(free["steepness"])
+        steepness = np.where(use_free, free["steepness"], fixed["steepness"])
+        total = np.where(use_free, free["urr"], fixed["urr"])
+        peak_time = np.where(use_free, free["peak_time"], fixed["peak_time"])
+
+        observed_max = np.max(np.where(mask, production, -np.inf), axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            guesses = {"peak_production": steepness * total / 4, "tm": peak_time,
+                       "c": 5 / steepness}
+        guesses["peak_production"] = np.where(np.isfinite(guesses["peak_production"]),
+                                              guesses["peak_production"], observed_max)
+        return self._complete_guesses(guesses)
+
+
+class GompertzModel(DeclineModel):
+    """Asymmetric Gompertz curve with the URR taken from the inputs."""
+
+    name = "gompertz"
+    param_names = ("urr", "steepness", "peak_time")
+    fixed = ("urr",)
+    scale_param = "urr"
+    peak_param = "peak_time"
+    bounds = {"steepness": (0.005, 0.1), "peak_time": PEAK_WINDOW}
+    default_guess = {"steepness": 0.02, "peak_time": 2040}
+
+    def evaluate(self, t, urr, steepness, peak_time):
+        z = steepness * (t - peak_time)
+        with np.errstate(over="ignore"):
+            return urr * steepness * np.exp(-z - np.exp(-z))
+
+    def jacobian(self, t, urr, steepness, peak_time):
+        z = steepness * (t - peak_time)
+        with np.errstate(over="ignore", invalid="ignore"):
+            decay = np.exp(-z)
+            shape = np.exp(-z - decay)
+            d_urr = steepness * shape
+            d_steepness = np.where(shape > 0, urr * shape * (1 + z * (decay - 1)), 0.0)
+            d_peak_time = np.where(shape > 0, urr * steepness ** 2 * shape * (1 - decay), 0.0)
+        return np.stack(np.broadcast_arrays(d_urr, d_steepness, d_peak_time), axis=-1)
+
+    def cumulative(self, t, urr, steepness, peak_time):
+        with np.errstate(over="ignore"):
+            return urr * np.exp(-np.exp(-steepness * (t - peak_time)))
+
+    def inverse_cumulative(self, fraction, urr, steepness, peak_time):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return peak_time - np.log(-np.log(fraction)) / steepness
+
+    def initial_guesses(self, years, production, mask, urr):
+        guesses = gompertz_linearization(years, production, mask, urr)
+        return self._complete_guesses(guesses)
+
+
+class RichardsModel(DeclineModel):
+    """Generalized logistic (Richards) curve with the URR taken from the inputs."""
+
+    name = "richards"
+    param_names = ("urr", "steepness", "peak_time", "shape")
+    fixed = ("urr",)
+    scale_param = "urr"
+    peak_param = "peak_time"
+    bounds = {"steepness": (0.005, 0.2), "peak_time": PEAK_WINDOW, "shape": (0.05, 20)}
+    default_guess = {"steepness": 0.02, "peak_time": 2040, "shape": 1.0}
+
+    @staticmethod
+    def _terms(t, steepness, peak_time, shape):
+        z = steepness * (t - peak_time)
+        log_term = np.logaddexp(0, np.log(shape) - z)  # log(1 + shape * exp(-z))
+        weight = expit(np.log(shape) - z)  # shape * exp(-z) / (1 + shape * exp(-z))
+        unit_rate = steepness * np.exp(-z - (1 + 1 / shape) * log_term)
+        return z, log_term, weight, unit_rate
+
+    def evaluate(self, t, urr, steepness, peak_time, shape):
+        return urr * self._terms(t, steepness, peak_time, shape)[3]
+
+    def jacobian(self, t, urr, steepness, peak_time, shape):
+        z, log_term, weight, unit_rate = self._terms(t, steepness, peak_time, shape)
+        rate = urr * unit_rate
+        d_urr = unit_rate
+        d_steepness = rate / steepness * (1 + z * ((1 + 1 / shape) * weight - 1))
+        d_peak_time = rate * steepness * (1 - (1 + 1 / shape) * weight)
+        d_shape = rate * (log_term - (1 + shape) * weight) / shape ** 2
+        return np.stack(np.broadcast_arrays(d_urr, d_steepness, d_peak_time, d_shape), axis=-1)
+
+    def cumulative(self, t, urr, steepness, peak_time, shape):
+        z = steepness * (t - peak_time)
+        return urr * np.exp(-np.logaddexp(0, np.log(shape) - z) / shape)
+
+    def initial_guesses(self, years, production, mask, urr):
+        # shape == 1 is the logistic curve, so start from the Hubbert linearization
+        guesses = logistic_linearization(years, production, mask, urr)
+        guesses["shape"] = np.ones(len(guesses["steepness"]))
+        return self._complete_guesses(guesses)
+
+
+_REGISTRY = {}
+
+
+def register_model(model):
+    """
+    Adds a model to the registry.
+
+    Parameters:
+        model (DeclineModel): Model instance to register under `model.name`.
+
+    Returns:
+        DeclineModel: The registered model.
+    """
+    if not isinstance(model, DeclineModel):
+        raise TypeError("model must be a DeclineModel instance.")
+    if not model.name:
+        raise ValueError("model must define a name.")
+    _REGISTRY[model.name.lower()] = model
+    return model
+
+
+def get_model(model):
+    """
+    Looks up a registered model.
+
+    Parameters:
+        model (str or DeclineModel): Registry name or model instance.
+
+    Returns:
+        DeclineModel: The registered model.
+    """
+    if isinstance(model, DeclineModel):
+        return model
+    if not isinstance(model, str):
+        raise TypeError("model must be a model name or a DeclineModel instance.")
+    try:
+        return _REGISTRY[model.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Model '{model}' not found. Available models: {available_models()}"
+        ) from None
+
+
+def available_models():
+    """list: Names of all registered models."""
+    return sorted(_REGISTRY)
+
+
+for _model in (HubbertModel(), LaherrereModel(), GompertzModel(), RichardsModel()):
+    register_model(_model)
@@ -0,0 +1,309 @@
+"""
+Lazy result object returned by the PetroCast pipeline.
+
+A `PetroCastResult` holds the loaded production history and URR. Model fits, projected
+curves, cumulative totals and peak years are computed the first time they are read and
+cached afterwards, so callers only pay for what they use. Every consumer (cumulative
+totals, plots) reads the same cached model evaluation. Results in other units
+(`PetroCastResult.in_unit`) rescale the fits of the original result instead of refitting.
+"""
+
+from functools import cached_property
+from pathlib import Path
+import numpy as np
+
+from petrocast.models.registry import get_model
+from petrocast.utils.curve_fitting import fit_model
+from petrocast.utils.fit_diagnostics import rescale_diagnostics
+from petrocast.utils.calculate_future_prod import calculate_model_projection
+from petrocast.utils.model_selection import rescale_selection, select_models
+from petrocast.utils.units import convert, unit_factor
+from petrocast.visualization import plot_results
+
+DEFAULT_MODELS = ("laherrere", "hubbert")
+
+MODEL_LABELS = {"laherrere": "Laherrère", "hubbert": "Hubbert",
+                "gompertz": "Gompertz", "richards": "Richards"}
+
+
+class PetroCastResult:
+    """
+    Fits, projections and plots for one production history and URR estimate.
+
+    Parameters:
+        years (np.ndarray): Historical years.
+        production (np.ndarray): Historical production.
+        urr (float): Ultimate Recoverable Resources (URR).
+        unit (str): Unit of production and URR.
+        urr_key (str): Key of the URR estimate, used for labels and plot names.
+        dataset_name (str): Name of the dataset, used in the summary.
+        output_path (Path or str): Default folder for plots.
+        models (tuple): Registered model names to fit.
+        end_year (int): Last year of the projection.
+        warm_start (dict, optional): Previous fitted parameters keyed by model name,
+            used as starting values of the fits.
+        telemetry (FitTelemetry, optional): Receives the diagnostics of every fit.
+        commodity (str): Commodity, selects the unit conversions.
+        conversions (dict, optional): Conversion table (see `petrocast.utils.units`),
+            defaults to the built-in one.
+
+    Attributes:
+        diagnostics (dict): Diagnostics records of the fits done so far, keyed by model name.
+    """
+
+    def __init__(self, years, production, urr, unit="EJ", urr_key=None, dataset_name=None,
+                 output_path=None, models=DEFAULT_MODELS, end_year=2100, warm_start=None,
+                 telemetry=None, commodity="oil", conversions=None):
+        self.years = np.asarray(years, dtype=np.float64)
+        self.production = np.asarray(production, dtype=np.float64)
+        self.urr = float(urr)
+        self.unit = unit
+        self.urr_key = urr_key
+        self.dataset_name = dataset_name
+        self.output_path = output_path
+        self.models = tuple(get_model(name).name for name in models)
+        self.end_year = end_year
+        self.warm_start = warm_start or {}
+        self.telemetry = telemetry
+        self.commodity = commodity
+        self.conversions = conversions
+        self._source = None
+        self._units = {}
+        self._params = {}
+        self._curves = {}
+        self.diagnostics = {}
+
+    def fit(self, model):
+        """
+        Fitted parameters of one model, fitted on first access.
+
+        Parameters:
+            model (str): Registered model name.
+
+        Returns:
+            dict: Fitted parameters keyed by name.
+        """
+        name = get_model(model).name
+        if name not in self._params and self._source is not None:
+            source, factor = self._source
+            self._params[name] = get_model(name).rescale(source.fit(name), factor)
+            self.diagnostics[name] = rescale_diagnostics(get_model(name),
+                                                         source.diagnostics[name], factor)
+        elif name not in self._params:
+            self._params[name], self.diagnostics[name] = fit_model(
+                name, self.years, self.production, self.urr, p0=self.warm_start.get(name),
+                full_output=True, telemetry=self.telemetry, label=self.urr_key,
+            )
+        return self._params[name]
+
+    def curve(self, model):
+        """
+        Model production over `full_years`, evaluated once and shared by all consumers.
+
+        Parameters:
+            model (str): Registered model name.
+
+        Returns:
+            np.ndarray: Annual production from the first historical year to `end_year`.
+        """
+        name = get_model(model).name
+        if name not in self._curves and self._source is not None:
+            source, factor = self._source
+            self._curves[name] = source.curve(name) * factor
+        elif name not in self._curves:
+            self._curves[name] = calculate_model_projection(self.full_years, name, self.fit(name))
+        return self._curves[name]
+
+    def cumulative(self, model):
+        """
+        Historical production plus the model projection after the last historical year.
+
+        Parameters:
+            model (str): Registered model name.
+
+        Returns:
+            float: Total cumulative production up to `end_year`.
+        """
+        future = self.curve(model)[self.full_years > self.years[-1]]
+        return float(np.sum(self.production) + np.sum(future))
+
+    def peak(self, model):
+        """Year of peak production of a fitted model."""
+        model = get_model(model)
+        return self.fit(model.name)[model.peak_param]
+
+    def in_unit(self, unit, urr=None):
+        """
+        The same result with production, URR and fits in another unit.
+
+        The models are linear in their scale parameter, so the fits of this result are
+        rescaled instead of repeated: fits, curves and the model selection are computed
+        once (lazily, in this result's unit) and shared by the results in every unit.
+        A URR estimate listed separately in `unit` (e.g. the Gb column of an estimate
+        file) need not equal the converted URR; if it differs, the fits do not carry
+        over and a separate result is fitted with that URR.
+
+        Parameters:
+            unit (str): Target unit, from the conversion table of `commodity`.
+            urr (float, optional): URR estimate given in `unit`. Defaults to this
+                result's URR converted to `unit`.
+
+        Returns:
+            PetroCastResult: This result if `unit` is its unit, else a cached derived
+            result, or a separately fitted result if `urr` differs from the converted URR.
+        """
+        if self._source is not None:
+            return self._source[0].in_unit(unit, urr)
+        converted = convert(self.urr, self.unit, unit, self.commodity, self.conversions)
+        if urr is not None and not np.isclose(urr, converted, rtol=1e-9, atol=0.0):
+            return PetroCastResult(
+                self.years, convert(self.production, self.unit, unit, self.commodity,
+                                    self.conversions),
+                urr, unit=unit, urr_key=self.urr_key, dataset_name=self.dataset_name,
+                output_path=self.output_path, models=self.models, end_year=self.end_year,
+                telemetry=self.telemetry, commodity=self.commodity,
+                conversions=self.conversions,
+            )
+        if unit == self.unit:
+            return self
+        if unit not in self._units:
+            result = PetroCastResult(
+                self.years, convert(self.production, self.unit, unit, self.commodity,
+                                    self.conversions),
+                converted, unit=unit, urr_key=self.urr_key, dataset_name=self.dataset_name,
+                output_path=self.output_path, models=self.models, end_year=self.end_year,
+                commodity=self.commodity, conversions=self.conversions,
+            )
+            result._source = (self, unit_factor(self.unit, unit, self.commodity,
+                                                self.conversions))
+            self._units[unit] = result
+        return self._units[unit]
+
+    @cached_property
+    def full_years(self):
+        """np.ndarray: Years from the first historical year up to `end_year`."""
+        return np.arange(self.years[0], self.end_year + 1)
+
+    @cached_property
+    def future_years(self):
+        """np.ndarray: Projection years after the last historical year."""
+        return np.arange(self.years[-1] + 1, self.end_year + 1)
+
+    @cached_property
+    def selection(self):
+        """dict: `select_models` result comparing the fitted models on this history."""
+        if self._source is not None:
+            source, factor = self._source
+            return rescale_selection(source.selection, factor)
+        # Score this result's own fits, so weights and averages match `params`
+        fits = {name: dict(self.fit(name), cost=self.diagnostics[name]["cost"])
+                for name in self.models}
+        return select_models({self.urr_key: (self.years, self.production)},
+                             models=self.models, urr=self.urr, fits=fits)
+
+    @property
+    def preferred_model(self):
+        """str: Model preferred by the model selection."""
+        return self.selection["winner"].iloc[0]
+
+    @property
+    def model_weights(self):
+        """dict: Akaike weights of the models, for model averaging."""
+        return self.selection["weights"].iloc[0].to_dict()
+
+    def averaged_curve(self):
+        """
+        Model-averaged production over `full_years`.
+
+        Returns:
+            np.ndarray: The cached `curves` weighted by `model_weights`.
+        """
+        weights = self.model_weights
+        return sum(weights[name] * self.curve(name) for name in self.models
+                   if weights[name] > 0)
+
+    @property
+    def fitted_params(self):
+        """dict: Parameters of the models fitted so far, without triggering new fits."""
+        return dict(self._params)
+
+    @property
+    def params(self):
+        """dict: Fitted parameters of every model."""
+        return {name: self.fit(name) for name in self.models}
+
+    @property
+    def curves(self):
+        """dict: Production curves over `full_years` of every model."""
+        return {name: self.curve(name) for name in self.models}
+
+    @property
+    def cumulative_totals(self):
+        """dict: Cumulative production up to `end_year` of every model."""
+        return {name: self.cumulative(name) for name in self.models}
+
+    @property
+    def peaks(self):
+        """dict: Peak years of every model."""
+        return {name: self.peak(name) for name in self.models}
+
+    def summary(self):
+        """
+        Human-readable summary of the fits.
+
+        Returns:
+            str: Dataset, URR, peak years, cumulative totals and the preferred model.
+        """
+        lines = []
+        if self.dataset_name:
+            lines.append(f"\nUsing dataset: {self.dataset_name}")
+        lines.append(f"URR: {self.urr:,.1f} {self.unit} (Key: {self.urr_key})\n")
+        for name in self.models:
+            lines.append(f"{MODEL_LABELS.get(name, name)} Model Peak Year: {int(self.peak(name))}")
+        lines.append("")
+        for name in self.models:
+            lines.append(f"{MODEL_LABELS.get(name, name)} Cumulative: "
+                         f"{self.cumulative(name):.2f} {self.unit}")
+        if len(self.models) > 1:
+            preferred = self.preferred_model
+            lines.append(f"\nPreferred model: {MODEL_LABELS.get(preferred, preferred)} "
+                         f"(Akaike weight {self.model_weights[preferred]:.2f})")
+        return "\n".join(lines)
+
+    def plot(self, output_path=None):
+        """
+        Plots the history with the Laherrère and Hubbert fits.
+
+        Parameters:
+            output_path (Path or str, optional): Output folder, defaults to `output_path`.
+
+        Returns:
+            Path: Path to the plot image.
+        """
+        output_path = output_path if output_path is not None else self.output_path
+        if output_path is None:
+            raise ValueError("No output path given for the plot.")
+
+        data = {
+            "years": self.years,
+            "production": self.production,
+            "future_years": self.full_years,
+            "tm": int(self.peak("laherrere")),
+            "peak_time": int(self.peak("hubbert")),
+            "urr_key": self.urr_key,
+            "unit": self.unit,
+            # One manifest entry per dataset, estimate and unit
+            "scenario": "_".join(str(part) for part in
+                                 (self.dataset_name, self.urr_key, self.unit) if part),
+        }
+        return plot_results(
+            data=data,
+            laherre_full=self.curve("laherrere"),
+            hubbert_full=self.curve("hubbert"),
+            output_path=Path(output_path),
+        )
+
+    def __repr__(self):
+        fitted = ", ".join(self._params) or "none"
+        return (f"<PetroCastResult urr_key={self.urr_key!r} urr={self.urr:g} {self.unit} "
+                f"models={self.models} fitted={fitted}>")
@@ -1,99 +1,171 @@
 """
 Core module for the PetroCast application.
 
-This script loads data, fits models, calculates cumulative production,
-and visualizes results for resource analysis.
+This script loads data and the URR estimate for a configuration and returns a lazy
+`PetroCastResult`, which fits models, calculates cumulative production and
+visualizes results for resource analysis on demand. Results in further units are
+derived from the same fits by rescaling.
 """
 
 from pathlib import Path
-import numpy as np
-import pandas as pd
 import tomli
 
 from petrocast.utils.data_processing import load_data
-from petrocast.utils.curve_fitting import fit_hubbert_curve, fit_laherrere_model
-from petrocast.utils.cumulative_production import calculate_cumulative_production
-from petrocast.utils.calculate_future_prod import calculate_future_production
-from petrocast.models.hubbert_curve_model import hubbert_curve
-from petrocast.models.laherrere_model import laherrere_bell_curve
-from petrocast.visualization import plot_results
-
-print("Might take some time...")
-
-def run_petrocast(config_path, urr_key,root_path):
-    """Executes the PetroCast pipeline with given configuration."""
-    print("Wait, processing request...")
-    # Load TOML config
+from petrocast.utils.urr_catalog import load_catalog
+from petrocast.utils.units import canonical_unit, conversion_table, convert
+from petrocast.result import PetroCastResult
+
+
+def load_config(config_path, root_path):
+    """
+    Reads a TOML configuration and resolves its paths against the root folder.
+
+    Parameters:
+        config_path (Path or str): Path to the configuration TOML file.
+        root_path (Path): Folder the paths in the configuration are relative to.
+
+    Returns:
+        dict: Configuration with 'dataset', 'urr_file' and 'output_path' as Paths, and
+        defaults for 'unit' ("EJ"), 'urr_unit' (the unit of the values of an
+        ``estimate,value`` URR file, defaults to 'unit'), 'commodity' ("oil"),
+        'conversions' (the built-in conversion table updated with the configured
+        ``[conversions.<commodity>]`` tables) and 'dataset_unit' (the unit of the
+        production file, defaults to the canonical unit of the commodity, else 'unit').
+    """
+    root_path = Path(root_path)
     with open(config_path, "rb") as file:
         config = tomli.load(file)
 
-    dataset_file = Path.joinpath(root_path,config["dataset"])
-    urr_file = Path.joinpath(root_path,config["urr_file"])
-    output_path = Path.joinpath(root_path,config["output_path"])
-    unit = config.get("unit", "EJ")
+    config["dataset"] = Path.joinpath(root_path, config["dataset"])
+    config["urr_file"] = Path.joinpath(root_path, config["urr_file"])
+    config["output_path"] = Path.joinpath(root_path, config["output_path"])
+    config.setdefault("unit", "EJ")
+    config.setdefault("urr_unit", config["unit"])
+    config.setdefault("commodity", "oil")
+    config["conversions"] = conversion_table(config.get("conversions"))
+    config.setdefault("dataset_unit", canonical_unit(config["commodity"], config["conversions"])
+                      or config["unit"])
+    return config
+
+
+def load_urr_catalog(config):
+    """
+    Loads the (cached) URR estimate catalog of a configuration.
+
+    Parameters:
+        config (dict): Configuration from `load_config`.
+
+    Returns:
+        UrrCatalog: Read-only catalog of the configured URR file.
+    """
+    return load_catalog(config["urr_file"], commodity=config["commodity"],
+                        unit=config["urr_unit"])
+
+
+def urr_in_unit(entry, unit, config):
+    """
+    URR value of a catalog entry in a unit, converted if the file does not list it.
+
+    Parameters:
+        entry (Mapping): Catalog entry (see `UrrCatalog.entry`).
+        unit (str): Unit of the value.
+        config (dict): Configuration from `load_config`.
+
+    Returns:
+        float: The value given for `unit`, else the first convertible value.
+    """
+    values = entry["values"]
+    if unit in values:
+        return values[unit]
+    units = config["conversions"].get(config["commodity"], {})
+    source = next((name for name in values if name in units and unit in units), None)
+    if source is None:
+        raise ValueError(f"URR key '{entry['key']}' has no value convertible to '{unit}'. "
+                         f"Available units: {list(values)}")
+    return convert(values[source], source, unit, config["commodity"], config["conversions"])
+
+
+def load_urr_estimates(config):
+    """
+    Loads the URR estimates of a configuration in its unit.
+
+    Parameters:
+        config (dict): Configuration from `load_config`.
+
+    Returns:
+        dict: URR value keyed by estimate name.
+    """
+    estimates = {}
+    for entry in load_urr_catalog(config).entries(config["commodity"]):
+        try:
+            estimates[entry["key"]] = urr_in_unit(entry, config["unit"], config)
+        except ValueError:
+            continue  # Estimate not available in this unit
+    return estimates
+
+
+def load_production(dataset_file, unit, dataset_unit="EJ", commodity="oil",
+                    conversions=None):
+    """
+    Loads the production history in the configured unit.
+
+    Parameters:
+        dataset_file (Path or str): Path to the production CSV file.
+        unit (str): Unit of the returned production, e.g. "EJ" or "Gb".
+        dataset_unit (str): Unit of the production file.
+        commodity (str): Commodity, selects the conversion factors.
+        conversions (dict, optional): Conversion table, defaults to the built-in one.
+
+    Returns:
+        tuple: (years, production) as numpy arrays.
+    """
+    years, production = load_data(dataset_file)
+    return years, convert(production, dataset_unit, unit, commodity, conversions)
+
+
+def run_petrocast(config_path, urr_key, root_path, units=None):
+    """
+    Executes the PetroCast pipeline with given configuration.
+
+    The models are fitted once, in the configured unit; results in the other `units`
+    rescale those fits, unless the URR file lists the estimate in that unit with a
+    value other than the converted one, which is then fitted separately.
+
+    Parameters:
+        config_path (Path or str): Path to the configuration TOML file.
+        urr_key (str): Key of the URR estimate to use.
+        root_path (Path): Folder the paths in the configuration are relative to.
+        units (list, optional): Units to report, from the commodity's conversion table.
+
+    Returns:
+        PetroCastResult: Lazy result; fits and plots are computed when accessed. With
+        `units`, a dict of such results keyed by unit, all sharing one set of fits.
+    """
+    config = load_config(config_path, root_path)
+    dataset_file = config["dataset"]
+    unit = config["unit"]
 
     # Load dataset
-    years, production_ej = load_data(dataset_file)
-    production_gb = production_ej / 6.9
+    years, production = load_production(dataset_file, unit, config["dataset_unit"],
+                                         config["commodity"], config["conversions"])
 
-    # Load URR estimate
-    df = pd.read_csv(urr_file)
-    df["estimate"] = df["estimate"].str.strip()
+    # Look up the URR estimate
+    catalog = load_urr_catalog(config)
+    entry = catalog.entry(urr_key, config["commodity"])
+    urr = urr_in_unit(entry, unit, config)
 
-    if urr_key not in df["estimate"].tolist():
-        raise ValueError(
-            f"URR key '{urr_key}' not found. Available keys: {df['estimate'].tolist()}"
-        )
-
-    urr = float(df.loc[df["estimate"] == urr_key, "value"].values[0])
-
-    # Convert data based on unit
-    production = production_gb if unit == "Gb" else production_ej
-
-    # Fit models
-    laherrere_params = fit_laherrere_model(years, production, urr)
-    hubbert_params = fit_hubbert_curve(years, production, urr)
-
-    # Print results
-    print(f"\nUsing dataset: {dataset_file.stem}")
-    print(f"URR: {urr:,.1f} {unit} (Key: {urr_key})\n")
-    print(f"Laherrère Model Peak Year: {int(laherrere_params['tm'])}")
-    print(f"Hubbert Model Peak Year: {int(hubbert_params['peak_time'])}\n")
-
-    # Calculate cumulative extraction
-    hubbert_cumulative = calculate_cumulative_production(
-        years, production, hubbert_params, hubbert_curve
-    )
-    laherrere_cumulative = calculate_cumulative_production(
-        years, production, laherrere_params, laherrere_bell_curve
-    )
-
-    print(f"Hubbert Cumulative: {hubbert_cumulative:.2f} {unit}")
-    print(f"Laherrère Cumulative: {laherrere_cumulative:.2f} {unit}")
-
-    # Generate full fit
-    future_years = np.arange(years[0], 2101)
-    data = {
-        "years": years,
-        "production": production,
-        "future_years": future_years,
-        "tm": int(laherrere_params["tm"]),
-        "peak_time": int(hubbert_params["peak_time"]),
-        "urr_key": urr_key,
-        "unit": unit,
-    }
-
-    laherre_fit_full, hubbert_fit_full = calculate_future_production(
-        data=data,
-        laherrere_params=laherrere_params,
-        hubbert_params=hubbert_params,
+    result = PetroCastResult(
+        years=years,
+        production=production,
         urr=urr,
+        unit=unit,
+        urr_key=entry["key"],
+        dataset_name=dataset_file.stem,
+        output_path=config["output_path"],
+        commodity=config["commodity"],
+        conversions=config["conversions"],
     )
-
-    # Generate plots
-    plot_results(
-        data=data,
-        laherre_full=laherre_fit_full,
-        hubbert_full=hubbert_fit_full,
-        output_path=output_path,
-    )
+    if units is None:
+        return result
+    return {report_unit: result.in_unit(report_unit, entry["values"].get(report_unit))
+            for report_unit in units}
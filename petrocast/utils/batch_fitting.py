@@ -0,0 +1,378 @@
+"""
+Vectorized fitting of many production series at once.
+
+Instead of one `scipy.optimize` call per series, all series are stacked into padded
+``(n_series, n_years)`` arrays and fitted together by a bounded Levenberg–Marquardt
+iteration written with NumPy array operations. Series that have converged are masked
+out of the following iterations, so the cost per iteration shrinks as the batch settles.
+
+`fit_stream` applies the batch fitter to a stream of series (e.g. from
+`petrocast.utils.data_processing.iter_series`), parsing the next batches in a
+background thread while the current one is fitted.
+"""
+
+import queue
+import threading
+import time
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import get_model
+from petrocast.utils.fit_diagnostics import active_bounds
+
+
+def pad_series(data, series_col="series_id", year_col="Year", value_col="Production"):
+    """
+    Stacks ragged production series into padded arrays.
+
+    Parameters:
+        data (pd.DataFrame or dict): Long-format frame with a series-id column, or a
+            mapping ``{series_id: (years, production)}``.
+        series_col (str): Name of the series-id column.
+        year_col (str): Name of the year column.
+        value_col (str): Name of the production column.
+
+    Returns:
+        tuple: (series_ids, years, production, mask) where the arrays have shape
+        ``(n_series, max_length)`` and `mask` marks the observed entries.
+    """
+    if isinstance(data, pd.DataFrame):
+        frame = data[[series_col, year_col, value_col]].copy()
+        frame[year_col] = pd.to_numeric(frame[year_col], errors="coerce")
+        frame[value_col] = pd.to_numeric(frame[value_col], errors="coerce")
+        frame = frame.dropna(subset=[year_col, value_col])
+        frame = frame.sort_values([series_col, year_col], kind="stable")
+
+        codes, series_ids = pd.factorize(frame[series_col], sort=True)
+        counts = np.bincount(codes, minlength=len(series_ids))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        positions = np.arange(len(codes)) - starts[codes]
+
+        shape = (len(series_ids), int(counts.max()) if len(counts) else 0)
+        years = np.zeros(shape)
+        production = np.zeros(shape)
+        mask = np.zeros(shape, dtype=bool)
+        years[codes, positions] = frame[year_col].to_numpy(dtype=np.float64)
+        production[codes, positions] = frame[value_col].to_numpy(dtype=np.float64)
+        mask[codes, positions] = True
+        return list(series_ids), years, production, mask
+
+    if isinstance(data, dict):
+        series_ids = list(data)
+        arrays = [tuple(np.asarray(values, dtype=np.float64) for values in data[key])
+                  for key in series_ids]
+        length = max((len(series_years) for series_years, _ in arrays), default=0)
+        years = np.zeros((len(series_ids), length))
+        production = np.zeros((len(series_ids), length))
+        mask = np.zeros((len(series_ids), length), dtype=bool)
+        for row, (series_years, series_production) in enumerate(arrays):
+            if series_years.shape != series_production.shape:
+                raise ValueError(f"Series '{series_ids[row]}' has mismatched lengths.")
+            years[row, :len(series_years)] = series_years
+            production[row, :len(series_years)] = series_production
+            mask[row, :len(series_years)] = True
+        return series_ids, years, production, mask
+
+    raise TypeError("data must be a pandas DataFrame or a dict of (years, production) pairs.")
+
+
+def _resolve_urr(urr, series_ids, data, series_col):
+    """Builds one URR value per series from a scalar, mapping or column name."""
+    if urr is None:
+        return np.full(len(series_ids), np.nan)
+    if isinstance(urr, str):
+        if not isinstance(data, pd.DataFrame):
+            raise TypeError("A URR column name requires long-format DataFrame input.")
+        urr = data.groupby(series_col)[urr].first()
+    if isinstance(urr, (dict, pd.Series)):
+        missing = [key for key in series_ids if key not in urr]
+        if missing:
+            raise ValueError(f"No URR given for series: {missing[:5]}")
+        return np.array([urr[key] for key in series_ids], dtype=np.float64)
+    return np.full(len(series_ids), float(urr))
+
+
+def fit_padded(model, years, production, mask, urr=None, p0=None, bounds=None,
+               max_iter=200, ftol=1e-10, xtol=1e-10):
+    """
+    Fits a registered model to stacked series with a vectorized Levenberg–Marquardt solver.
+
+    Parameter bounds are enforced by projection: parameters at a bound whose descent
+    direction points outward are held fixed for that step, and every step is clipped
+    to the feasible box.
+
+    Parameters:
+        model (str or DeclineModel): Registered model name or instance.
+        years (np.ndarray): Years, shape ``(n_series, n_years)``.
+        production (np.ndarray): Production, same shape as `years`.
+        mask (np.ndarray): Boolean mask of observed entries, same shape as `years`.
+        urr (float or np.ndarray, optional): URR per series for the model's fixed parameters.
+        p0 (dict, optional): Starting values ``{name: scalar or (n_series,) array}``.
+            Defaults to the model's (vectorized) data-driven initial guesses.
+        bounds (dict, optional): Bounds ``{name: (lower, upper)}`` overriding the model defaults.
+        max_iter (int): Maximum number of iterations.
+        ftol (float): Relative cost decrease below which a series has converged.
+        xtol (float): Relative step size below which a series has converged.
+
+    Returns:
+        dict: ``{name: (n_series,) array}`` for all model parameters plus 'cost'
+        (half the sum of squared residuals), 'iterations', 'nfev' (residual evaluations),
+        'njev' (Jacobian evaluations), 'converged', 'at_bound' (a fitted parameter ended
+        on a bound) and 'elapsed' (wall-clock time of the whole batch, in seconds).
+    """
+    started = time.perf_counter()
+    model = get_model(model)
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
+    mask = np.asarray(mask, dtype=bool)
+    n_series = years.shape[0]
+
+    free = model.free_params
+    free_index = [model.param_names.index(name) for name in free]
+    urr = np.broadcast_to(np.asarray(np.nan if urr is None else urr, dtype=np.float64),
+                          (n_series,))
+    fixed = {name: urr[:, None] for name in model.fixed}
+
+    limits = dict(model.bounds, **(bounds or {}))
+    lower = np.array([limits[name][0] for name in free], dtype=np.float64)
+    upper = np.array([limits[name][1] for name in free], dtype=np.float64)
+
+    if p0 is None:
+        p0 = model.initial_guesses(years, production, mask, urr)
+    params = np.column_stack([np.broadcast_to(np.asarray(p0[name], dtype=np.float64), (n_series,))
+                              for name in free]) if n_series else np.zeros((0, len(free)))
+    params = np.clip(params, lower, upper)
+
+    def fixed_rows(rows):
+        return {name: value[rows] for name, value in fixed.items()}
+
+    def arguments(rows, values):
+        columns = dict(fixed_rows(rows), **{name: values[:, [i]] for i, name in enumerate(free)})
+        return model.params_to_args(columns)
+
+    def evaluate(rows, values):
+        args = arguments(rows, values)
+        return np.where(mask[rows], model.evaluate(years[rows], *args) - production[rows], 0.0)
+
+    def costs(residual):
+        return 0.5 * np.sum(residual ** 2, axis=1)
+
+    # Residuals at the current parameters are kept from the accepted candidate, so
+    # every iteration evaluates the model once (plus its Jacobian).
+    all_rows = np.arange(n_series)
+    residuals = evaluate(all_rows, params)
+    cost = costs(residuals)
+    nfev = np.ones(n_series, dtype=int)
+    damping = np.full(n_series, 1e-3)
+    iterations = np.zeros(n_series, dtype=int)
+    converged = cost == 0
+    active = ~converged
+
+    for _ in range(max_iter):
+        rows = np.flatnonzero(active)
+        if rows.size == 0:
+            break
+        iterations[rows] += 1
+        values = params[rows]
+        residual = residuals[rows]
+        jacobian = model.jacobian(years[rows], *arguments(rows, values))[..., free_index]
+        jacobian = np.where(mask[rows][..., None], jacobian, 0.0)
+
+        normal = np.einsum("smi,smj->sij", jacobian, jacobian)
+        gradient = np.einsum("smi,sm->si", jacobian, residual)
+
+        # Hold parameters that sit on a bound and would be pushed further out.
+        held = ((values <= lower) & (gradient > 0)) | ((values >= upper) & (gradient < 0))
+        gradient = np.where(held, 0.0, gradient)
+        normal = np.where(held[:, :, None] | held[:, None, :], 0.0, normal)
+
+        scale = np.diagonal(normal, axis1=1, axis2=2).copy()
+        scale = np.maximum(scale, 1e-12 * scale.max(axis=1, keepdims=True) + 1e-300)
+        scale = np.where(held, 1.0, scale)
+        system = normal.copy()
+        diagonal = np.arange(len(free))
+        system[:, diagonal, diagonal] += damping[rows, None] * scale
+        system[:, diagonal, diagonal] += np.where(held, 1.0, 0.0)
+
+        step = -np.linalg.solve(system, gradient[..., None])[..., 0]
+        candidate = np.clip(values + step, lower, upper)
+        new_residual = evaluate(rows, candidate)
+        new_cost = costs(new_residual)
+        nfev[rows] += 1
+
+        improved = np.isfinite(new_cost) & (new_cost < cost[rows])
+        accepted_rows = rows[improved]
+        decrease = cost[accepted_rows] - new_cost[improved]
+        moved = np.abs(candidate[improved] - values[improved])
+        params[accepted_rows] = candidate[improved]
+        cost[accepted_rows] = new_cost[improved]
+        residuals[accepted_rows] = new_residual[improved]
+        damping[accepted_rows] = np.maximum(damping[accepted_rows] / 10, 1e-12)
+        damping[rows[~improved]] *= 10
+
+        small_decrease = decrease <= ftol * np.maximum(cost[accepted_rows], 1e-300)
+        small_step = np.all(moved <= xtol * (np.abs(candidate[improved]) + xtol), axis=1)
+        done = np.zeros(n_series, dtype=bool)
+        done[accepted_rows] = small_decrease | small_step | (cost[accepted_rows] == 0)
+        # A stalled series cannot improve any further: treat it as converged.
+        stalled = np.zeros(n_series, dtype=bool)
+        stalled[rows] = damping[rows] > 1e12
+        converged |= done | stalled
+        active &= ~converged
+
+    result = {name: np.broadcast_to(value[:, 0], (n_series,)).copy()
+              for name, value in fixed.items()}
+    result.update({name: params[:, i] for i, name in enumerate(free)})
+    result = {name: result[name] for name in model.param_names}
+    span = np.where(np.isfinite(upper - lower), upper - lower, np.abs(params) + 1.0)
+    on_bound = (params - lower <= 1e-6 * span) | (upper - params <= 1e-6 * span)
+    result.update({
+        "cost": cost,
+        "iterations": iterations,
+        "nfev": nfev,
+        "njev": iterations.copy(),
+        "converged": converged,
+        "at_bound": on_bound.any(axis=1),
+        "elapsed": np.full(n_series, time.perf_counter() - started),
+    })
+    return result
+
+
+def evaluate_batch(model, years, params):
+    """
+    Evaluates a model for stacked parameter sets.
+
+    Parameters:
+        model (str or DeclineModel): Registered model name or instance.
+        years (np.ndarray): Years, shape ``(n_series, n_years)`` or ``(1, n_years)``.
+        params (dict or pd.DataFrame): ``{name: (n_series,) array}``, e.g. a
+            `fit_padded` result or a `fit_batch` frame.
+
+    Returns:
+        np.ndarray: Production of shape ``(n_series, n_years)``.
+    """
+    model = get_model(model)
+    args = model.params_to_args({name: np.asarray(params[name], dtype=np.float64)[:, None]
+                                 for name in model.param_names})
+    return model.evaluate(years, *args)
+
+
+def fit_batch(data, model="hubbert", urr=None, series_col="series_id", year_col="Year",
+              value_col="Production", telemetry=None, **options):
+    """
+    Fits a registered model to every series of a long-format frame or series mapping.
+
+    Parameters:
+        data (pd.DataFrame or dict): Long-format frame with a series-id column, or a
+            mapping ``{series_id: (years, production)}``.
+        model (str or DeclineModel): Registered model name or instance.
+        urr (float, dict, pd.Series or str, optional): URR for all series, per series id,
+            or the name of a URR column in `data`.
+        series_col (str): Name of the series-id column.
+        year_col (str): Name of the year column.
+        value_col (str): Name of the production column.
+        telemetry (FitTelemetry, optional): Receives one diagnostics record per series;
+            the batch time is shared equally between the series.
+        **options: Passed on to `fit_padded` (p0, bounds, max_iter, ftol, xtol).
+
+    Returns:
+        pd.DataFrame: One row per series id with the fitted parameters, 'cost',
+        'iterations', 'nfev', 'njev', 'converged', 'at_bound' and 'elapsed'.
+    """
+    model = get_model(model)
+    series_ids, years, production, mask = pad_series(data, series_col, year_col, value_col)
+    urr_values = _resolve_urr(urr, series_ids, data, series_col)
+
+    if model.fixed and np.isnan(urr_values).any():
+        raise ValueError(f"Model '{model.name}' needs a URR for every series.")
+
+    result = fit_padded(model, years, production, mask, urr_values, **options)
+    frame = pd.DataFrame(result, index=pd.Index(series_ids, name=series_col))
+
+    if telemetry is not None:
+        share = frame["elapsed"].iloc[0] / len(frame) if len(frame) else 0.0
+        free = model.free_params
+        limits = dict(model.bounds, **(options.get("bounds") or {}))
+        lower = [limits[name][0] for name in free]
+        upper = [limits[name][1] for name in free]
+        for series_id, row in frame.iterrows():
+            active = active_bounds(free, row[list(free)], lower, upper)
+            telemetry.record({
+                "model": model.name, "label": series_id, "nfev": int(row["nfev"]),
+                "cost": float(row["cost"]), "converged": bool(row["converged"]),
+                "active_bounds": active, "at_bound": bool(active), "elapsed": share,
+            })
+    return frame
+
+
+_END = object()
+
+
+def _produce_batches(series, batch_size, batches, stop):
+    """Groups a series stream into batches and puts them on a bounded queue."""
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    try:
+        batch = {}
+        for series_id, years, production in series:
+            if stop.is_set():
+                return
+            batch[series_id] = (years, production)
+            if len(batch) >= batch_size:
+                if not put(batch):
+                    return
+                batch = {}
+        if batch:
+            put(batch)
+    except Exception as error:  # pylint: disable=broad-except
+        put(error)  # Re-raised in the consuming thread
+    put(_END)
+
+
+def fit_stream(series, model="hubbert", urr=None, batch_size=1000, prefetch=2,
+               telemetry=None, **options):
+    """
+    Fits a stream of series batch by batch, overlapping parsing and fitting.
+
+    A background thread consumes `series` and fills a queue of at most `prefetch`
+    batches while the calling thread fits the previous batch, so memory stays bounded
+    by ``(prefetch + 1) * batch_size`` series regardless of the stream length.
+
+    Parameters:
+        series (iterable): ``(series_id, years, production)`` tuples, e.g. from
+            `petrocast.utils.data_processing.iter_series`.
+        model (str or DeclineModel): Registered model name or instance.
+        urr (float, dict or pd.Series, optional): URR for all series or per series id.
+        batch_size (int): Number of series fitted together.
+        prefetch (int): Number of batches parsed ahead of the fitter.
+        telemetry (FitTelemetry, optional): Receives one diagnostics record per series.
+        **options: Passed on to `fit_padded` (p0, bounds, max_iter, ftol, xtol).
+
+    Yields:
+        pd.DataFrame: `fit_batch` result of every batch, in stream order.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    batches = queue.Queue(maxsize=max(prefetch, 1))
+    stop = threading.Event()
+    producer = threading.Thread(target=_produce_batches, args=(series, batch_size, batches, stop),
+                                daemon=True)
+    producer.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _END:
+                break
+            if isinstance(batch, Exception):
+                raise batch
+            yield fit_batch(batch, model, urr=urr, telemetry=telemetry, **options)
+    finally:
+        stop.set()
+        producer.join()
@@ -1,15 +1,31 @@
 """
 This module provides calculation functionality for future production data and model fits
-using Laherrère and Hubbert curve models.
+using Laherrère and Hubbert curve models, or any model from the model registry.
 """
 
+import warnings
 import numpy as np
-from petrocast.models.laherrere_model import laherrere_bell_curve
-from petrocast.models.hubbert_curve_model import hubbert_curve
+from petrocast.models.registry import get_model
+
+
+def calculate_model_projection(full_years: np.ndarray, model, params: dict) -> np.ndarray:
+    """
+    Evaluates a registered model over a range of years.
+
+    Parameters:
+        full_years (np.ndarray): Years to evaluate, historical and future.
+        model (str or DeclineModel): Registered model name or instance.
+        params (dict): Fitted model parameters keyed by name.
+
+    Returns:
+        np.ndarray: Annual production predicted by the model.
+    """
+    model = get_model(model)
+    return model.evaluate(np.asarray(full_years, dtype=np.float64), *model.params_to_args(params))
 
 
 def calculate_future_production(
-    data: dict, laherrere_params: dict, hubbert_params: dict, urr: float
+    data: dict, laherrere_params: dict, hubbert_params: dict, urr: float | None = None
 ) -> tuple[np.ndarray, np.ndarray]:
     """
     Calculates future production based on Laherrère and Hubbert models.
@@ -18,30 +34,25 @@ def calculate_future_production(
         data (dict): Contains 'years', 'production', and 'future_years'.
         laherrere_params (dict): Parameters for the Laherrère model.
         hubbert_params (dict): Parameters for the Hubbert model.
-        urr (float): Ultimate Recoverable Resource value.
+        urr (float, optional): Deprecated and ignored; both curves are fully determined
+            by their fitted parameters (the Hubbert URR is part of `hubbert_params`).
 
     Returns:
         tuple[np.ndarray, np.ndarray]: The full production predictions for both models.
     """
+    if urr is not None:
+        warnings.warn("The 'urr' argument of calculate_future_production is ignored and "
+                      "will be removed; the fitted parameters determine both curves.",
+                      DeprecationWarning, stacklevel=2)
+
     years = data["years"]
     future_years = data["future_years"]  #
     full_years = np.arange(years[0], future_years[-1] + 1)
 
     # Compute Laherrère model fit
-    laherrere_fit_full = laherrere_bell_curve(
-        full_years,
-        peak_production=laherrere_params["peak_production"],
-        tm=laherrere_params["tm"],
-        c=laherrere_params["c"],
-        urr=urr,
-    )
+    laherrere_fit_full = calculate_model_projection(full_years, "laherrere", laherrere_params)
 
     # Compute Hubbert model fit
-    hubbert_fit_full = hubbert_curve(
-        full_years,
-        urr=hubbert_params["urr"],
-        steepness=hubbert_params["steepness"],
-        peak_time=hubbert_params["peak_time"],
-    )
+    hubbert_fit_full = calculate_model_projection(full_years, "hubbert", hubbert_params)
 
     return laherrere_fit_full, hubbert_fit_full
@@ -3,6 +3,7 @@ Module for calculating cumulative production.
 """
 
 import numpy as np
+from petrocast.models.registry import available_models, get_model
 
 
 def calculate_cumulative_production(years, production, model_params, model_func):
@@ -13,7 +14,8 @@ def calculate_cumulative_production(years, production, model_params, model_func)
     - years (array-like): Historical years.
     - production (array-like): Historical production data in Exajoules.
     - model_params (dict): Parameters for the model (Hubbert or Laherrère).
-    - model_func (callable): Model function to use for predictions.
+    - model_func (callable, str or DeclineModel): Model function to use for predictions,
+      or a registered model (name or instance). Parameters are passed by name.
 
     Returns:
     - float: Total cumulative production in Exajoules.
@@ -25,14 +27,16 @@ def calculate_cumulative_production(years, production, model_params, model_func)
         raise TypeError("production must be a list or numpy array.")
     if not isinstance(model_params, dict):
         raise TypeError("model_params must be a dictionary.")
+    if isinstance(model_func, str) and model_func.lower() in available_models():
+        model_func = get_model(model_func)
     if not callable(model_func):
-        raise TypeError("model_func must be callable.")
+        raise TypeError("model_func must be callable or a registered model name.")
 
     # Generate future years starting from the last historical year
     future_years = np.arange(years[-1] + 1, 2101)
 
-    # Unpack the model parameters before passing them to the model function.
-    projected_production = model_func(future_years, *model_params.values())
+    # Pass the parameters by name so the result does not depend on the dict order.
+    projected_production = model_func(future_years, **model_params)
 
     # Calculate cumulative production
     historical_cumulative = np.sum(production)
@@ -2,73 +2,101 @@
 Curve fitting utilities for Laherrère and Hubbert models.
 
 This module provides functions for fitting historical production data
-using the Laherrère and Hubbert models.
+using the Laherrère and Hubbert models, or any model from the model registry.
 """
 
+import time
 import numpy as np
-from scipy.optimize import curve_fit
-from petrocast.models.laherrere_model import laherrere_bell_curve
-from petrocast.models.hubbert_curve_model import hubbert_curve
+from scipy.optimize import least_squares
+from petrocast.models.registry import get_model
+from petrocast.utils.fit_diagnostics import fit_diagnostics
 
 
-def fit_hubbert_curve(years, production, ultimate_recoverable_resources):
+def fit_model(model, years, production, ultimate_recoverable_resources, p0=None, bounds=None,
+              full_output=False, telemetry=None, label=None):
     """
-    Fit the Hubbert curve to historical production data.
+    Fit a registered model to historical production data.
+
+    The model's fixed parameters are set from the URR, the remaining parameters are
+    estimated by bounded least squares using the model's analytic Jacobian.
 
     Parameters:
+        model (str or DeclineModel): Registered model name or instance.
         years (array-like): Array of years (time).
         production (array-like): Array of historical production data.
         ultimate_recoverable_resources (float): Ultimate Recoverable Resources (URR).
+        p0 (dict, optional): Starting values of the free parameters. Defaults to the
+            model's initial-guess heuristic.
+        bounds (dict, optional): Bounds ``{name: (lower, upper)}`` overriding the
+            model defaults.
+        full_output (bool): Also return the diagnostics record of the fit.
+        telemetry (FitTelemetry, optional): Receives the diagnostics record.
+        label (str, optional): Identifies the series in the diagnostics record.
 
     Returns:
-        dict: Fitted parameters {'urr', 'steepness', 'peak_time'}.
+        dict: Fitted values of all model parameters, keyed by name. With `full_output`,
+        a tuple (params, diagnostics), see `fit_diagnostics`.
     """
-    # Validate inputs
-    if not isinstance(years, (np.ndarray, list)) or not all(
-        isinstance(val, (int, float)) for val in years
-    ):
-        raise TypeError("Parameter 'years' must be a list or NumPy array of numeric values.")
+    model = get_model(model)
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
 
-    if not isinstance(production, (np.ndarray, list)) or not all(
-        isinstance(val, (int, float)) for val in production
-    ):
-        raise TypeError("Parameter 'production' must be a list or NumPy array of numeric values.")
+    if years.shape != production.shape:
+        raise ValueError("Parameters 'years' and 'production' must have the same length.")
 
-    def hubbert_function(t, steepness, peak_time):
-        return hubbert_curve(t, ultimate_recoverable_resources, steepness, peak_time)
+    free = model.free_params
+    fixed = model.fixed_values(ultimate_recoverable_resources)
+    free_index = [model.param_names.index(name) for name in free]
 
-    # Initial guess and bounds hubbert_curve
-    initial_guess = [0.02, 2040]  # Conservative peak assumption
-    bounds = ([0.01, 2030], [0.05, 2040])  # Restrict peak time between 2030-2040
+    guess = model.initial_guess(years, production, ultimate_recoverable_resources)
+    guess.update(p0 or {})
+    limits = dict(model.bounds, **(bounds or {}))
+    lower = np.array([limits[name][0] for name in free], dtype=np.float64)
+    upper = np.array([limits[name][1] for name in free], dtype=np.float64)
+    start = np.clip(np.array([guess[name] for name in free], dtype=np.float64), lower, upper)
 
-    # Perform curve fitting
+    def full_args(values):
+        params = dict(fixed, **dict(zip(free, values)))
+        return model.params_to_args(params)
 
-    result = curve_fit(
-        hubbert_function, years, production, p0=initial_guess, bounds=bounds
-    )
+    def residuals(values):
+        return model.evaluate(years, *full_args(values)) - production
 
-    # Unpack correctly, handling unexpected extra values
-    if len(result) >= 2:
-        params, _ = result[:2]  # Only take first two values
-        steepness, peak_time = params
-    else:
-        raise ValueError(f"Unexpected number of parameters returned: {len(result)}")
+    def jacobian(values):
+        return model.jacobian(years, *full_args(values))[:, free_index]
 
+    started = time.perf_counter()
+    result = least_squares(residuals, start, jac=jacobian, bounds=(lower, upper), method="trf")
+    elapsed = time.perf_counter() - started
 
-    return {"urr": ultimate_recoverable_resources, "steepness": steepness, "peak_time": peak_time}
+    params = dict(zip(model.param_names, (float(value) for value in full_args(result.x))))
+    if not full_output and telemetry is None:
+        return params
+
+    diagnostics = fit_diagnostics(
+        model, free, result.x, result.fun, result.jac, lower, upper, result.nfev, elapsed,
+        status=result.status, message=result.message, label=label,
+    )
+    if telemetry is not None:
+        telemetry.record(diagnostics)
+    return (params, diagnostics) if full_output else params
 
 
-def fit_laherrere_model(years, production, ultimate_recoverable_resources):
+def fit_hubbert_curve(years, production, ultimate_recoverable_resources, full_output=False,
+                      telemetry=None):
     """
-    Fit the Laherrère bell curve model to historical production data.
+    Fit the Hubbert curve to historical production data.
 
     Parameters:
         years (array-like): Array of years (time).
         production (array-like): Array of historical production data.
         ultimate_recoverable_resources (float): Ultimate Recoverable Resources (URR).
+        full_output (bool): Also return the diagnostics record of the fit.
+        telemetry (FitTelemetry, optional): Receives the diagnostics record.
 
     Returns:
-        dict: Fitted parameters {'peak_production', 'tm', 'c'}.
+        dict: Fitted parameters {'urr', 'steepness', 'peak_time'}. With `full_output`,
+        a tuple (params, diagnostics).
     """
     # Validate inputs
     if not isinstance(years, (np.ndarray, list)) or not all(
@@ -81,26 +109,36 @@ def fit_laherrere_model(years, production, ultimate_recoverable_resources):
     ):
         raise TypeError("Parameter 'production' must be a list or NumPy array of numeric values.")
 
-    def laherrere_function(t, peak_production, peak_time, width):
-        return laherrere_bell_curve(
-            t, peak_production, peak_time, width, ultimate_recoverable_resources
-        )
+    return fit_model("hubbert", years, production, ultimate_recoverable_resources,
+                     full_output=full_output, telemetry=telemetry)
 
-    # Initial guess and bounds laherrere model
-    initial_guess = [max(production), 2040, 100]  # Peak at 2040 with reasonable width
-    bounds = ([0, 2030, 10], [np.inf, 2040, 300])  # Adjusted for peak time limits
 
-    # Perform curve fitting
+def fit_laherrere_model(years, production, ultimate_recoverable_resources, full_output=False,
+                        telemetry=None):
+    """
+    Fit the Laherrère bell curve model to historical production data.
 
-    result = curve_fit(
-        laherrere_function, years, production, p0=initial_guess, bounds=bounds
-    )
+    Parameters:
+        years (array-like): Array of years (time).
+        production (array-like): Array of historical production data.
+        ultimate_recoverable_resources (float): Ultimate Recoverable Resources (URR).
+        full_output (bool): Also return the diagnostics record of the fit.
+        telemetry (FitTelemetry, optional): Receives the diagnostics record.
 
-    # Unpack correctly, handling unexpected extra values
-    if len(result) >= 2:
-        params, _ = result[:2]  # Only take first two values
-        peak_production, peak_time, c = params
-    else:
-        raise ValueError(f"Unexpected number of parameters returned: {len(result)}")
+    Returns:
+        dict: Fitted parameters {'peak_production', 'tm', 'c'}. With `full_output`,
+        a tuple (params, diagnostics).
+    """
+    # Validate inputs
+    if not isinstance(years, (np.ndarray, list)) or not all(
+        isinstance(val, (int, float)) for val in years
+    ):
+        raise TypeError("Parameter 'years' must be a list or NumPy array of numeric values.")
+
+    if not isinstance(production, (np.ndarray, list)) or not all(
+        isinstance(val, (int, float)) for val in production
+    ):
+        raise TypeError("Parameter 'production' must be a list or NumPy array of numeric values.")
 
-    return {"peak_production": peak_production, "tm": peak_time, "c": c}
+    return fit_model("laherrere", years, production, ultimate_recoverable_resources,
+                     full_output=full_output, telemetry=telemetry)
@@ -2,7 +2,8 @@
 Utility functions for data processing.
 
 This module provides functions to load and preprocess historical production
-data from CSV files.
+data from CSV files, either whole (`load_data`) or streamed series by series from
+long-format files too large to hold in memory (`iter_series`).
 """
 
 import pandas as pd
@@ -35,3 +36,81 @@ def load_data(filepath):
     production = data["Production"].to_numpy(dtype=np.float64)
 
     return years, production
+
+
+def _segments(ids):
+    """Start and end positions of the runs of equal ids in a chunk."""
+    changes = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+    starts = np.concatenate(([0], changes))
+    ends = np.concatenate((changes, [len(ids)]))
+    return starts, ends
+
+
+def iter_series(filepath, series_col="series_id", year_col="Year", value_col="Production",
+                chunksize=100_000, check_contiguous=True, **read_csv_kwargs):
+    """
+    Streams a long-format production file series by series.
+
+    The file is read in chunks of `chunksize` rows, so memory use is bounded by one chunk
+    plus the series being assembled, whatever the file size. Rows must be grouped by
+    series (all rows of a series contiguous, as in database exports); a series is yielded
+    as soon as the next series starts. Checking that grouping keeps the ids of all
+    finished series, which grows with the number of series (not rows); pass
+    ``check_contiguous=False`` for strictly flat memory on files known to be grouped. Series ids are read as strings, so an id such as
+    ``007`` does not change type between chunks; rows without an id are dropped.
+
+    Parameters:
+        filepath (Path or str): Path to the CSV file.
+        series_col (str): Name of the series-id column.
+        year_col (str): Name of the year column.
+        value_col (str): Name of the production column.
+        chunksize (int): Number of rows parsed at a time.
+        check_contiguous (bool): Raise if a series reappears after another one started.
+        **read_csv_kwargs: Passed on to `pd.read_csv` (e.g. sep, encoding, or a `dtype`
+            overriding the string ids).
+
+    Yields:
+        tuple: (series_id, years, production) with the arrays sorted by year.
+
+    Raises:
+        ValueError: If `check_contiguous` and a series reappears after another series
+            started.
+    """
+    read_csv_kwargs.setdefault("dtype", {series_col: str})
+    reader = pd.read_csv(filepath, usecols=[series_col, year_col, value_col],
+                         chunksize=chunksize, **read_csv_kwargs)
+    finished = set()
+    pending_id, pending = None, []
+
+    def complete(series_id, parts):
+        if check_contiguous:
+            if series_id in finished:
+                raise ValueError(f"Series '{series_id}' is not contiguous in {filepath}; "
+                                 f"group the rows by '{series_col}'.")
+            finished.add(series_id)
+        years = np.concatenate([part[0] for part in parts])
+        production = np.concatenate([part[1] for part in parts])
+        order = np.argsort(years, kind="stable")
+        return series_id, years[order], production[order]
+
+    for chunk in reader:
+        # Same cleaning as load_data: numeric years, no missing values
+        chunk[year_col] = pd.to_numeric(chunk[year_col], errors="coerce")
+        chunk[value_col] = pd.to_numeric(chunk[value_col], errors="coerce")
+        chunk = chunk.dropna(subset=[series_col, year_col, value_col])
+        if chunk.empty:
+            continue
+
+        ids = chunk[series_col].to_numpy()
+        years = chunk[year_col].to_numpy(dtype=np.float64)
+        production = chunk[value_col].to_numpy(dtype=np.float64)
+        for start, end in zip(*_segments(ids)):
+            series_id = ids[start]
+            if series_id != pending_id:
+                if pending:
+                    yield complete(pending_id, pending)
+                pending_id, pending = series_id, []
+            pending.append((years[start:end], production[start:end]))
+
+    if pending:
+        yield complete(pending_id, pending)
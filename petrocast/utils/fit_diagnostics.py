@@ -0,0 +1,225 @@
+"""
+Optimizer diagnostics and convergence telemetry for model fits.
+
+`fit_diagnostics` turns an optimizer result into a diagnostics record (function
+evaluations, final cost, active bounds, residuals, covariance, condition number and
+timing). `FitTelemetry` aggregates records across a batch of fits (fits per second,
+mean function evaluations, share of fits that ended on a bound) and optionally forwards
+every record to a log sink, which makes slow or degenerate fits easy to find.
+"""
+
+import logging
+import numpy as np
+
+
+def active_bounds(free, values, lower, upper, rtol=1e-6):
+    """
+    Finds the parameters that ended on one of their bounds.
+
+    Parameters:
+        free (tuple): Names of the fitted parameters.
+        values (array-like): Fitted values.
+        lower (array-like): Lower bounds.
+        upper (array-like): Upper bounds.
+        rtol (float): Tolerance relative to the bound interval (or the value for
+            unbounded parameters).
+
+    Returns:
+        dict: {name: 'lower' or 'upper'} for every parameter on a bound.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    lower = np.asarray(lower, dtype=np.float64)
+    upper = np.asarray(upper, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        span = np.where(np.isfinite(upper - lower), upper - lower, np.abs(values) + 1.0)
+    tolerance = rtol * span
+    active = {}
+    for name, value, low, high, tol in zip(free, values, lower, upper, tolerance):
+        if value - low <= tol:
+            active[name] = "lower"
+        elif high - value <= tol:
+            active[name] = "upper"
+    return active
+
+
+def fit_diagnostics(model, free, values, residuals, jacobian, lower, upper, nfev, elapsed,
+                    status=None, message=None, label=None):
+    """
+    Builds the diagnostics record of a single fit.
+
+    Parameters:
+        model (DeclineModel): The fitted model.
+        free (tuple): Names of the fitted parameters.
+        values (np.ndarray): Fitted values of the free parameters.
+        residuals (np.ndarray): Residuals (model minus data) at the solution.
+        jacobian (np.ndarray): Jacobian of the residuals w.r.t. the free parameters.
+        lower (np.ndarray): Lower bounds of the free parameters.
+        upper (np.ndarray): Upper bounds of the free parameters.
+        nfev (int): Number of function evaluations.
+        elapsed (float): Wall-clock fitting time in seconds.
+        status (int, optional): Optimizer status code.
+        message (str, optional): Optimizer message.
+        label (str, optional): Identifies the fitted series in telemetry.
+
+    Returns:
+        dict: Diagnostics record.
+    """
+    residuals = np.asarray(residuals, dtype=np.float64)
+    jacobian = np.asarray(jacobian, dtype=np.float64)
+    n_obs, n_free = len(residuals), len(free)
+    sse = float(np.sum(residuals ** 2))
+
+    bounds_hit = active_bounds(free, values, lower, upper)
+
+    singular_values = np.linalg.svd(jacobian, compute_uv=False) if jacobian.size else np.zeros(0)
+    if singular_values.size and singular_values[-1] > 0:
+        condition_number = float(singular_values[0] / singular_values[-1])
+    else:
+        condition_number = float("inf")
+
+    dof = max(n_obs - n_free, 1)
+    try:
+        covariance = np.linalg.inv(jacobian.T @ jacobian) * sse / dof
+    except np.linalg.LinAlgError:
+        covariance = np.full((n_free, n_free), np.inf)
+
+    return {
+        "model": model.name,
+        "label": label,
+        "nfev": int(nfev),
+        "cost": 0.5 * sse,
+        "sse": sse,
+        "rmse": float(np.sqrt(sse / max(n_obs, 1))),
+        "status": status,
+        "message": message,
+        "active_bounds": bounds_hit,
+        "at_bound": bool(bounds_hit),
+        "residuals": residuals,
+        "covariance": covariance,
+        "std_errors": dict(zip(free, np.sqrt(np.abs(np.diagonal(covariance))))),
+        "condition_number": condition_number,
+        "elapsed": float(elapsed),
+    }
+
+
+def rescale_diagnostics(model, diagnostics, factor):
+    """
+    Diagnostics of the same fit with production in another unit.
+
+    Residuals and RMSE scale with `factor` and cost and SSE with ``factor ** 2``. The
+    Jacobian columns of the shape parameters scale with `factor` while the column of
+    `scale_param` does not, so the covariance entries of `scale_param` scale with
+    `factor` (its variance with ``factor ** 2``) and the other entries are unchanged.
+    The condition number of the Jacobian changes with those columns and is recomputed
+    from the rescaled covariance.
+
+    Parameters:
+        model (DeclineModel): The fitted model.
+        diagnostics (dict): Diagnostics record from `fit_diagnostics`.
+        factor (float): Unit conversion factor, see `petrocast.utils.units.unit_factor`.
+
+    Returns:
+        dict: Rescaled copy of the record; the other entries are unchanged.
+    """
+    rescaled = dict(diagnostics)
+    rescaled["cost"] = diagnostics["cost"] * factor ** 2
+    rescaled["sse"] = diagnostics["sse"] * factor ** 2
+    rescaled["rmse"] = diagnostics["rmse"] * factor
+    rescaled["residuals"] = np.asarray(diagnostics["residuals"]) * factor
+
+    std_errors = dict(diagnostics["std_errors"])
+    scale = np.array([factor if name == model.scale_param else 1.0 for name in std_errors])
+    rescaled["covariance"] = np.asarray(diagnostics["covariance"]) * np.outer(scale, scale)
+    rescaled["std_errors"] = {name: error * weight
+                              for (name, error), weight in zip(std_errors.items(), scale)}
+
+    # The covariance is proportional to the inverse of J^T J, so its eigenvalue ratio is
+    # the squared condition number of the rescaled Jacobian
+    covariance = rescaled["covariance"]
+    rescaled["condition_number"] = float("inf")
+    if covariance.size and np.all(np.isfinite(covariance)):
+        eigenvalues = np.linalg.eigvalsh(covariance)
+        if eigenvalues[0] > 0:
+            rescaled["condition_number"] = float(np.sqrt(eigenvalues[-1] / eigenvalues[0]))
+    return rescaled
+
+
+class FitTelemetry:
+    """
+    Aggregates fit diagnostics across a batch of fits.
+
+    Parameters:
+        sink (callable or logging.Logger, optional): Receives every recorded diagnostics
+            record. Loggers get one line per fit, at WARNING level for fits that ended on
+            a bound and INFO level otherwise.
+        keep_records (bool): Keep the records for `slowest` and `records`.
+    """
+
+    def __init__(self, sink=None, keep_records=True):
+        self.sink = sink
+        self.keep_records = keep_records
+        self.records = []
+        self.fits = 0
+        self.total_nfev = 0
+        self.total_elapsed = 0.0
+        self.bound_hits = 0
+        self.bound_hits_by_param = {}
+
+    def record(self, diagnostics):
+        """
+        Adds one diagnostics record.
+
+        Parameters:
+            diagnostics (dict): Record from `fit_diagnostics` or the batch fitter.
+        """
+        self.fits += 1
+        self.total_nfev += diagnostics["nfev"]
+        self.total_elapsed += diagnostics["elapsed"]
+        if diagnostics["at_bound"]:
+            self.bound_hits += 1
+            for name in diagnostics.get("active_bounds", {}):
+                self.bound_hits_by_param[name] = self.bound_hits_by_param.get(name, 0) + 1
+        if self.keep_records:
+            self.records.append(diagnostics)
+
+        if isinstance(self.sink, logging.Logger):
+            level = logging.WARNING if diagnostics["at_bound"] else logging.INFO
+            self.sink.log(
+                level, "fit %s[%s]: nfev=%d cost=%.6g cond=%.3g bounds=%s %.2f ms",
+                diagnostics["model"], diagnostics.get("label"), diagnostics["nfev"],
+                diagnostics["cost"], diagnostics.get("condition_number", float("nan")),
+                diagnostics.get("active_bounds", {}), 1e3 * diagnostics["elapsed"],
+            )
+        elif self.sink is not None:
+            self.sink(diagnostics)
+
+    def summary(self):
+        """
+        Aggregate counters of all recorded fits.
+
+        Returns:
+            dict: {'fits', 'fits_per_second', 'mean_nfev', 'bound_share',
+            'bound_hits_by_param', 'total_elapsed'}.
+        """
+        fits_per_second = self.fits / self.total_elapsed if self.total_elapsed > 0 else 0.0
+        return {
+            "fits": self.fits,
+            "fits_per_second": fits_per_second,
+            "mean_nfev": self.total_nfev / self.fits if self.fits else 0.0,
+            "bound_share": self.bound_hits / self.fits if self.fits else 0.0,
+            "bound_hits_by_param": dict(self.bound_hits_by_param),
+            "total_elapsed": self.total_elapsed,
+        }
+
+    def slowest(self, count=10, key="nfev"):
+        """
+        The recorded fits that cost the most.
+
+        Parameters:
+            count (int): Number of records to return.
+            key (str): Record field to rank by, e.g. 'nfev' or 'elapsed'.
+
+        Returns:
+            list: Diagnostics records, most expensive first.
+        """
+        return sorted(self.records, key=lambda record: record[key], reverse=True)[:count]
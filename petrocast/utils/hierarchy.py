@@ -0,0 +1,238 @@
+"""
+Hierarchical (regional) fitting with consistent aggregation to totals.
+
+A region tree is turned into an indicator matrix ``S`` of shape ``(n_nodes, n_leaves)``
+(``S[i, j] == 1`` if leaf ``j`` lies below or is node ``i``). The leaves are fitted
+together with the vectorized batch fitter and every per-leaf quantity stacked on a
+leading leaf axis (projections, cumulative totals, ensembles) is aggregated to all nodes
+at once with a single matrix product ``S @ values``, so totals are consistent with
+their parts by construction. Internal nodes can additionally be fitted directly on
+their aggregated history to compare the sum of the parts with a fit of the whole.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from petrocast.models.registry import get_model
+from petrocast.utils.batch_fitting import (_resolve_urr, evaluate_batch, fit_padded,
+                                           pad_series)
+
+
+def _parent_map(tree):
+    """Converts a nested ``{node: {child: ...}}`` tree or a ``{node: parent}`` map."""
+    if all(value is None or isinstance(value, str) for value in tree.values()):
+        return dict(tree)
+
+    parents = {}
+
+    def walk(children, parent):
+        for node, grandchildren in children.items():
+            if node in parents:
+                raise ValueError(f"Node '{node}' appears more than once in the tree.")
+            parents[node] = parent
+            if grandchildren:
+                walk(grandchildren, node)
+
+    walk(tree, None)
+    return parents
+
+
+class Hierarchy:
+    """
+    Region tree with its leaf-indicator matrix.
+
+    Parameters:
+        tree (dict): Nested ``{node: {child: {...}, leaf: None}}`` mapping, or a
+            ``{node: parent}`` mapping with None for the roots.
+
+    Attributes:
+        nodes (list): All nodes, parents before their children.
+        leaves (list): Nodes without children, in `nodes` order.
+        indicator (scipy.sparse.csr_matrix): ``(n_nodes, n_leaves)`` matrix with 1 where
+            the leaf belongs to the node. It is sparse, so deep trees with many fields
+            stay cheap to store and to multiply.
+    """
+
+    def __init__(self, tree):
+        if not isinstance(tree, dict) or not tree:
+            raise TypeError("tree must be a non-empty dict.")
+        parents = _parent_map(tree)
+        for parent in [parent for parent in dict.fromkeys(parents.values())
+                       if parent is not None and parent not in parents]:
+            parents[parent] = None  # Roots only named as parents
+        self.parents = parents
+
+        children = {node: [] for node in parents}
+        for node, parent in parents.items():
+            if parent is not None:
+                children[parent].append(node)
+
+        self.nodes = []
+        stack = [node for node, parent in reversed(parents.items()) if parent is None]
+        while stack:
+            node = stack.pop()
+            self.nodes.append(node)
+            stack.extend(reversed(children[node]))
+        if len(self.nodes) != len(parents):
+            raise ValueError("The region tree contains a cycle.")
+        self.leaves = [node for node in self.nodes if not children[node]]
+
+        row = {node: index for index, node in enumerate(self.nodes)}
+        rows, columns = [], []
+        for column, leaf in enumerate(self.leaves):
+            node = leaf
+            while node is not None:
+                rows.append(row[node])
+                columns.append(column)
+                node = parents[node]
+        self.indicator = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, columns)), shape=(len(self.nodes), len(self.leaves))
+        )
+
+    @property
+    def internal_nodes(self):
+        """list: Nodes with at least one child."""
+        leaves = set(self.leaves)
+        return [node for node in self.nodes if node not in leaves]
+
+    def aggregate(self, values):
+        """
+        Sums per-leaf values up to every node in one matrix product.
+
+        Parameters:
+            values (array-like): Array whose first axis is the leaf axis (in `leaves`
+                order), e.g. ``(n_leaves,)`` totals, ``(n_leaves, n_years)`` curves or
+                ``(n_leaves, n_members, n_years)`` ensembles.
+
+        Returns:
+            np.ndarray: Array with the leaf axis replaced by the node axis.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] != len(self.leaves):
+            raise ValueError(f"Expected {len(self.leaves)} leaf rows, got {values.shape[0]}.")
+        flat = values.reshape(len(self.leaves), -1)
+        return np.asarray(self.indicator @ flat).reshape((len(self.nodes),) + values.shape[1:])
+
+    def __repr__(self):
+        return f"<Hierarchy nodes={len(self.nodes)} leaves={len(self.leaves)}>"
+
+
+def _on_grid(years, values, mask, grid):
+    """Places padded series on a common year grid (0 where not observed)."""
+    columns = np.searchsorted(grid, years)
+    placed = np.zeros((years.shape[0], len(grid)))
+    observed = np.zeros(placed.shape, dtype=bool)
+    rows = np.nonzero(mask)
+    placed[rows[0], columns[rows]] = values[rows]
+    observed[rows[0], columns[rows]] = True
+    return placed, observed
+
+
+def _history_and_projection(grid, history, observed, curves):
+    """History up to the last observed year, the model curve afterwards."""
+    last = np.max(np.where(observed, grid, -np.inf), axis=1, keepdims=True)
+    return np.where(grid <= last, history, curves)
+
+
+def fit_hierarchy(tree, data, model="hubbert", urr=None, end_year=2100, ensemble=None,
+                  compare=True, series_col="series_id", year_col="Year",
+                  value_col="Production", **options):
+    """
+    Fits the leaves of a region tree and aggregates the results to every node.
+
+    Parameters:
+        tree (dict or Hierarchy): Region tree (see `Hierarchy`).
+        data (pd.DataFrame or dict): Leaf histories, long format with the leaf name in
+            `series_col`, or a mapping ``{leaf: (years, production)}``.
+        model (str or DeclineModel): Registered model name or instance.
+        urr (float, dict, pd.Series or str, optional): URR per leaf (see `fit_batch`).
+            Internal nodes get the sum of their leaves' URRs.
+        end_year (int): Last year of the projection.
+        ensemble (array-like or dict, optional): Per-leaf ensembles of shape
+            ``(n_members, n_years)`` on the projection grid, as an array with a leading
+            leaf axis or a mapping ``{leaf: array}``; aggregated like the projections.
+        compare (bool): Also fit every internal node directly on its aggregated history.
+        series_col (str): Name of the series-id column.
+        year_col (str): Name of the year column.
+        value_col (str): Name of the production column.
+        **options: Passed on to `fit_padded` (bounds, max_iter, ftol, xtol).
+
+    Returns:
+        dict: {'hierarchy', 'years' (projection grid), 'leaf_params' (pd.DataFrame),
+        'projection' (model curves), 'production' (history followed by the projection)
+        as pd.DataFrames of nodes x years, 'cumulative' and 'peak_year' (pd.Series by
+        node), 'ensemble' (aggregated array or None) and 'comparison' (pd.DataFrame of
+        the direct fits of the internal nodes, or None)}.
+    """
+    hierarchy = tree if isinstance(tree, Hierarchy) else Hierarchy(tree)
+    model = get_model(model)
+
+    series_ids, years, production, mask = pad_series(data, series_col, year_col, value_col)
+    position = {series_id: index for index, series_id in enumerate(series_ids)}
+    missing = [leaf for leaf in hierarchy.leaves if leaf not in position]
+    if missing:
+        raise ValueError(f"No production data for leaves: {missing[:5]}")
+    order = [position[leaf] for leaf in hierarchy.leaves]
+    years, production, mask = years[order], production[order], mask[order]
+    urr_values = _resolve_urr(urr, series_ids, data, series_col)[order]
+    if model.fixed and np.isnan(urr_values).any():
+        raise ValueError(f"Model '{model.name}' needs a URR for every leaf.")
+
+    fit = fit_padded(model, years, production, mask, urr_values, **options)
+    leaf_params = pd.DataFrame(fit, index=pd.Index(hierarchy.leaves, name=series_col))
+
+    grid = np.arange(years[mask].min(), end_year + 1)
+    history, observed = _on_grid(years, production, mask, grid)
+    curves = evaluate_batch(model, grid[None, :], fit)
+    combined = _history_and_projection(grid, history, observed, curves)
+
+    # One matrix product per quantity aggregates every node at once
+    node_index = pd.Index(hierarchy.nodes, name="node")
+    projection = hierarchy.aggregate(curves)
+    node_production = hierarchy.aggregate(combined)
+    cumulative = node_production.sum(axis=1)
+
+    aggregated_ensemble = None
+    if ensemble is not None:
+        if isinstance(ensemble, dict):
+            ensemble = np.stack([np.asarray(ensemble[leaf]) for leaf in hierarchy.leaves])
+        aggregated_ensemble = hierarchy.aggregate(ensemble)
+
+    comparison = None
+    leaves = set(hierarchy.leaves)
+    rows = [index for index, node in enumerate(hierarchy.nodes) if node not in leaves]
+    if compare and rows:
+        internal = [hierarchy.nodes[index] for index in rows]
+        node_history = hierarchy.aggregate(history)[rows]
+        node_observed = hierarchy.aggregate(observed)[rows] > 0
+        node_urr = hierarchy.aggregate(np.nan_to_num(urr_values))[rows]
+        direct = fit_padded(model, np.broadcast_to(grid, node_history.shape), node_history,
+                            node_observed, node_urr if model.fixed else None, **options)
+        direct_curves = evaluate_batch(model, grid[None, :], direct)
+        direct_cumulative = _history_and_projection(grid, node_history, node_observed,
+                                                    direct_curves).sum(axis=1)
+        summed = projection[rows]
+        comparison = pd.DataFrame(
+            {name: direct[name] for name in model.param_names},
+            index=pd.Index(internal, name="node"),
+        )
+        comparison["cumulative_sum"] = cumulative[rows]
+        comparison["cumulative_direct"] = direct_cumulative
+        comparison["relative_difference"] = direct_cumulative / cumulative[rows] - 1
+        comparison["curve_rmse"] = np.sqrt(np.mean((direct_curves - summed) ** 2, axis=1))
+        comparison["peak_year_sum"] = grid[np.argmax(summed, axis=1)]
+        comparison["peak_year_direct"] = grid[np.argmax(direct_curves, axis=1)]
+        comparison["converged"] = direct["converged"]
+
+    return {
+        "hierarchy": hierarchy,
+        "years": grid,
+        "leaf_params": leaf_params,
+        "projection": pd.DataFrame(projection, index=node_index, columns=grid),
+        "production": pd.DataFrame(node_production, index=node_index, columns=grid),
+        "cumulative": pd.Series(cumulative, index=node_index, name="cumulative"),
+        "peak_year": pd.Series(grid[np.argmax(projection, axis=1)], index=node_index,
+                               name="peak_year"),
+        "ensemble": aggregated_ensemble,
+        "comparison": comparison,
+    }
@@ -0,0 +1,160 @@
+"""
+Depletion-milestone queries for fitted production models.
+
+Answers planning questions such as "in which year does cumulative production reach
+50%, 80% or 95% of the URR?" and "when does annual output fall below X?". Models with
+an analytic inverse (Hubbert, Laherrère, Gompertz) are inverted directly; other models
+fall back to a vectorized bisection on their cumulative or production curve.
+
+All queries broadcast over parameter sets and thresholds: ``n`` parameter sets and
+``k`` thresholds give an ``(n, k)`` array of years, so milestone distributions over
+a whole ensemble of fits are computed in one call.
+"""
+
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import get_model
+
+# Number of bisection steps of the numerical fallback (resolves far below one day).
+_BISECTION_STEPS = 80
+
+
+def _parameter_arrays(model, params):
+    """
+    Converts one parameter set or an ensemble to arrays shaped to broadcast against
+    a trailing axis of thresholds.
+    """
+    if isinstance(params, pd.DataFrame):
+        params = {name: params[name].to_numpy(dtype=np.float64) for name in model.param_names}
+    elif isinstance(params, (list, tuple)):
+        params = {name: np.array([entry[name] for entry in params], dtype=np.float64)
+                  for name in model.param_names}
+    elif not isinstance(params, dict):
+        raise TypeError("params must be a dict, a list of dicts or a DataFrame.")
+
+    args = model.params_to_args(params)
+    ensemble = any(np.ndim(value) > 0 for value in args)
+    return tuple(np.asarray(value, dtype=np.float64)[..., None] if ensemble
+                 else np.float64(value) for value in args)
+
+
+def _bracket(function, target, start, direction, rising):
+    """
+    Steps from `start` in `direction` (+1 or -1) with doubling step sizes until
+    `function` crosses `target`. `rising` tells whether `function` increases along
+    `direction`. Returns the first point beyond the crossing.
+    """
+    sign = 1 if rising else -1
+    step = np.full_like(start, 10.0)
+    outside = start + direction * step
+    for _ in range(60):
+        crossed = ((function(outside) - target) * sign >= 0) | np.isnan(target)
+        if np.all(crossed):
+            break
+        step = np.where(crossed, step, step * 2)
+        outside = np.where(crossed, outside, outside + direction * step)
+    return outside
+
+
+def _bisect(function, target, low, high, increasing):
+    """Vectorized bisection for ``function(t) == target`` on ``[low, high]``."""
+    for _ in range(_BISECTION_STEPS):
+        middle = (low + high) / 2
+        above = function(middle) >= target
+        if increasing:
+            high, low = np.where(above, middle, high), np.where(above, low, middle)
+        else:
+            high, low = np.where(above, high, middle), np.where(above, middle, low)
+    return (low + high) / 2
+
+
+def year_reaching_fraction(model, params, fractions, urr=None):
+    """
+    Years at which cumulative production reaches given fractions of the URR.
+
+    Parameters:
+        model (str or DeclineModel): Registered model name or instance.
+        params (dict, list of dict or pd.DataFrame): One parameter set (scalars), an
+            ensemble as arrays, a list of parameter dicts, or a frame of fits.
+        fractions (float or array-like): Fractions of the URR between 0 and 1.
+        urr (float or array-like, optional): URR the fractions refer to. Defaults to the
+            ultimate production implied by the parameters. Fractions of a URR the model
+            never reaches give NaN.
+
+    Returns:
+        np.ndarray: Years (fractional), shape ``(n_sets, n_fractions)`` for an ensemble,
+        or the shape of `fractions` for a single parameter set.
+    """
+    model = get_model(model)
+    args = _parameter_arrays(model, params)
+    fractions = np.asarray(fractions, dtype=np.float64)
+
+    if np.any((fractions <= 0) | (fractions >= 1)):
+        raise ValueError("fractions must lie strictly between 0 and 1.")
+
+    total = model.total(*args)
+    if urr is not None:
+        urr = np.asarray(urr, dtype=np.float64)
+        urr = urr[..., None] if urr.ndim > 0 else urr
+        fractions = fractions * urr / total
+    fractions = np.where(fractions < 1, fractions, np.nan)
+
+    try:
+        return np.asarray(model.inverse_cumulative(fractions, *args), dtype=np.float64)
+    except NotImplementedError:
+        pass
+
+    target = np.broadcast_to(fractions * total, np.broadcast_shapes(
+        np.shape(fractions), *(np.shape(arg) for arg in args))).astype(np.float64)
+    peak = np.broadcast_to(args[model.param_names.index(model.peak_param)],
+                           target.shape).astype(np.float64)
+
+    def cumulative(t):
+        return model.cumulative(t, *args)
+
+    low = _bracket(cumulative, target, peak, -1, rising=False)
+    high = _bracket(cumulative, target, peak, 1, rising=True)
+    years = _bisect(cumulative, target, low, high, increasing=True)
+    return np.where(np.isnan(target), np.nan, years)
+
+
+def year_production_below(model, params, thresholds):
+    """
+    First years after the peak at which annual production has fallen to given levels.
+
+    Thresholds at or above the peak production give the peak year; non-positive
+    thresholds are never reached and give NaN.
+
+    Parameters:
+        model (str or DeclineModel): Registered model name or instance.
+        params (dict, list of dict or pd.DataFrame): One parameter set (scalars), an
+            ensemble as arrays, a list of parameter dicts, or a frame of fits.
+        thresholds (float or array-like): Annual production levels.
+
+    Returns:
+        np.ndarray: Years (fractional), shape ``(n_sets, n_thresholds)`` for an ensemble,
+        or the shape of `thresholds` for a single parameter set.
+    """
+    model = get_model(model)
+    args = _parameter_arrays(model, params)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    try:
+        return np.asarray(model.inverse_rate(thresholds, *args), dtype=np.float64)
+    except NotImplementedError:
+        pass
+
+    peak_arg = args[model.param_names.index(model.peak_param)]
+    shape = np.broadcast_shapes(np.shape(thresholds), *(np.shape(arg) for arg in args))
+    target = np.broadcast_to(thresholds, shape).astype(np.float64)
+    peak = np.broadcast_to(peak_arg, shape).astype(np.float64)
+    target = np.where(target > 0, target, np.nan)
+
+    def rate(t):
+        return model.evaluate(t, *args)
+
+    below_at_peak = rate(peak) <= target
+    high = _bracket(rate, target, peak, 1, rising=False)
+    years = _bisect(rate, target, peak, high, increasing=False)
+    years = np.where(below_at_peak, peak, years)
+    return np.where(np.isnan(target), np.nan, years)
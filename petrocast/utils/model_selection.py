@@ -0,0 +1,293 @@
+"""
+Automatic selection between registered production models.
+
+Every candidate model is fitted to every series with the vectorized batch fitter, the
+candidates of a stage running concurrently in a thread pool. Candidates are scored by
+AIC/BIC on the full history and by the error of forward-chaining cross-validation
+(fit on the first years, forecast the next `horizon` years, move the cut forward).
+
+Cross-validation is the expensive stage, so candidates that are clearly worse are pruned
+before it (information-criterion difference above `prune_delta`) and between its folds
+(running forecast error above `prune_ratio` times the best candidate's). The surviving
+candidates get Akaike weights, which also define a model-averaged projection.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import available_models, get_model
+from petrocast.utils.batch_fitting import (_resolve_urr, evaluate_batch, fit_padded,
+                                           pad_series)
+
+CRITERIA = ("aic", "bic", "cv")
+
+
+def information_criteria(sse, n_obs, n_params):
+    """
+    Gaussian AIC and BIC of least-squares fits.
+
+    Parameters:
+        sse (float or np.ndarray): Sum of squared residuals.
+        n_obs (int or np.ndarray): Number of observations.
+        n_params (int or np.ndarray): Number of fitted parameters (the noise variance
+            is added).
+
+    Returns:
+        tuple: (aic, bic) with the shape of the broadcast inputs.
+    """
+    sse = np.asarray(sse, dtype=np.float64)
+    n_obs = np.asarray(n_obs, dtype=np.float64)
+    k = n_params + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_likelihood = n_obs * np.log(np.maximum(sse, 1e-300) / n_obs)
+        return log_likelihood + 2 * k, log_likelihood + k * np.log(n_obs)
+
+
+def akaike_weights(scores, axis=-1):
+    """
+    Akaike weights ``exp(-delta / 2)`` of information-criterion scores.
+
+    Parameters:
+        scores (np.ndarray): Scores; non-finite entries get weight 0.
+        axis (int): Axis holding the candidates.
+
+    Returns:
+        np.ndarray: Weights summing to 1 along `axis` (NaN where no score is finite).
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    finite = np.isfinite(scores)
+    best = np.min(np.where(finite, scores, np.inf), axis=axis, keepdims=True)
+    with np.errstate(invalid="ignore", over="ignore"):
+        relative = np.where(finite, np.exp(-(scores - best) / 2), 0.0)
+        return relative / np.sum(relative, axis=axis, keepdims=True)
+
+
+def forward_folds(mask, folds=3, horizon=5, min_train=10):
+    """
+    Forward-chaining train/test masks for padded series.
+
+    Fold ``k`` trains on all but the last ``(folds - k) * horizon`` observed years and
+    tests on the `horizon` years after the training window.
+
+    Parameters:
+        mask (np.ndarray): Boolean mask of observed entries, shape ``(n_series, n_years)``.
+        folds (int): Number of folds.
+        horizon (int): Forecast horizon (observations) of every fold.
+        min_train (int): Minimum training length; shorter folds are left out.
+
+    Returns:
+        list: ``(train, test)`` masks; series without a valid fold have empty masks.
+    """
+    position = np.cumsum(mask, axis=1) - 1
+    length = mask.sum(axis=1, keepdims=True)
+    splits = []
+    for fold in range(folds):
+        train_end = length - (folds - fold) * horizon
+        valid = train_end >= min_train
+        train = mask & (position < train_end) & valid
+        test = mask & (position >= train_end) & (position < train_end + horizon) & valid
+        splits.append((train, test))
+    return splits
+
+
+def _row_min(values):
+    """Row-wise minimum of the finite entries (inf for rows without one)."""
+    return np.min(np.where(np.isfinite(values), values, np.inf), axis=1, keepdims=True)
+
+
+def _given_fit(model, fit, n_series):
+    """Broadcasts a precomputed fit to one array per parameter and the cost."""
+    arrays = {}
+    for name in (*model.param_names, "cost"):
+        if name not in fit:
+            raise ValueError(f"Fit of model '{model.name}' has no value for '{name}'.")
+        values = np.atleast_1d(np.asarray(fit[name], dtype=np.float64))
+        if values.shape != (n_series,):
+            raise ValueError(f"Fit of model '{model.name}' has {values.size} values for "
+                             f"'{name}', expected {n_series}.")
+        arrays[name] = values
+    return arrays
+
+
+def select_models(data, models=None, urr=None, criterion="aic", folds=3, horizon=5,
+                  min_train=10, prune_delta=10.0, prune_ratio=3.0, n_jobs=None, fits=None,
+                  series_col="series_id", year_col="Year", value_col="Production"):
+    """
+    Scores candidate models for every series and selects the best one.
+
+    Parameters:
+        data (pd.DataFrame or dict): Long-format frame with a series-id column, or a
+            mapping ``{series_id: (years, production)}``.
+        models (list, optional): Candidate model names. Defaults to all registered models.
+        urr (float, dict, pd.Series or str, optional): URR for the models that take it
+            from the inputs (see `fit_batch`).
+        criterion (str): 'aic', 'bic' or 'cv' (lowest cross-validated forecast RMSE).
+        folds (int): Number of forward-chaining folds; 0 skips cross-validation.
+        horizon (int): Forecast horizon of every fold, in observations.
+        min_train (int): Minimum training length of a fold.
+        prune_delta (float): Candidates whose AIC (BIC for criterion 'bic') exceeds the
+            best by more than this are not cross-validated.
+        prune_ratio (float): Candidates whose running forecast RMSE exceeds the best by
+            this factor are dropped from the remaining folds.
+        n_jobs (int, optional): Threads fitting candidates concurrently. Defaults to one
+            per candidate.
+        fits (dict, optional): Full-history fits done elsewhere, ``{model: {param:
+            values, 'cost': values}}`` with one value per series (in series order). They
+            are used as they are instead of refitting those candidates, so callers that
+            already fitted the history score and average exactly their own parameters.
+        series_col (str): Name of the series-id column.
+        year_col (str): Name of the year column.
+        value_col (str): Name of the production column.
+
+    Returns:
+        dict: {'winner': pd.Series of model names, 'weights': pd.DataFrame of Akaike
+        weights (series x model, pruned candidates 0), 'scores': pd.DataFrame indexed by
+        (series, model) with 'aic', 'bic', 'delta', 'cv_rmse', 'pruned', 'cost' and
+        'n_obs',
+        'params': {model: pd.DataFrame of fitted parameters}, 'criterion', 'cv_fits'
+        (series fits done in cross-validation) and 'cv_fits_skipped' (saved by pruning)}.
+    """
+    if criterion not in CRITERIA:
+        raise ValueError(f"criterion must be one of {CRITERIA}.")
+    candidates = [get_model(name) for name in (models or available_models())]
+    if not candidates:
+        raise ValueError("At least one candidate model is required.")
+
+    series_ids, years, production, mask = pad_series(data, series_col, year_col, value_col)
+    urr_values = _resolve_urr(urr, series_ids, data, series_col)
+    if any(model.fixed for model in candidates) and np.isnan(urr_values).any():
+        raise ValueError("Candidates with a fixed URR need a URR for every series.")
+    index = pd.Index(series_ids, name=series_col)
+
+    fits = fits or {}
+    with ThreadPoolExecutor(max_workers=n_jobs or len(candidates)) as pool:
+        # Stage 1: full-history fits (unless given) and information criteria
+        missing = [model for model in candidates if model.name not in fits]
+        fitted = dict(zip([model.name for model in missing], pool.map(
+            lambda model: fit_padded(model, years, production, mask, urr_values), missing
+        )))
+        full = [_given_fit(model, fits[model.name], len(series_ids)) if model.name in fits
+                else fitted[model.name] for model in candidates]
+        sse = np.column_stack([2 * fit["cost"] for fit in full])
+        n_params = np.array([len(model.free_params) for model in candidates])
+        aic, bic = information_criteria(sse, mask.sum(axis=1, keepdims=True), n_params)
+        ranking = bic if criterion == "bic" else aic
+        delta = ranking - _row_min(ranking)
+        pruned = np.where(delta > prune_delta, "ic", "").astype(object)
+
+        # Stage 2: forward-chaining cross-validation of the remaining candidates
+        squared_error = np.zeros(sse.shape)
+        tested = np.zeros(sse.shape)
+        cv_fits = cv_skipped = 0
+        for train, test in forward_folds(mask, folds, horizon, min_train):
+            has_fold = test.any(axis=1)
+            jobs = []
+            for column, model in enumerate(candidates):
+                rows = np.flatnonzero(has_fold & (pruned[:, column] == ""))
+                cv_skipped += int(np.sum(has_fold)) - rows.size
+                if rows.size:
+                    jobs.append((column, model, rows))
+            cv_fits += sum(rows.size for _, _, rows in jobs)
+
+            def run(job, train=train):
+                column, model, rows = job
+                start = {name: full[column][name][rows] for name in model.free_params}
+                fit = fit_padded(model, years[rows], production[rows], train[rows],
+                                 urr_values[rows], p0=start)
+                return column, rows, evaluate_batch(model, years[rows], fit)
+
+            for column, rows, forecast in pool.map(run, jobs):
+                errors = np.where(test[rows], forecast - production[rows], 0.0)
+                squared_error[rows, column] += np.sum(errors ** 2, axis=1)
+                tested[rows, column] += np.sum(test[rows], axis=1)
+
+            with np.errstate(invalid="ignore", divide="ignore"):
+                running = np.sqrt(squared_error / tested)
+            running = np.where(pruned == "", running, np.nan)
+            best = _row_min(running)
+            pruned = np.where((pruned == "") & (running > prune_ratio * best), "cv", pruned)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cv_rmse = np.sqrt(squared_error / tested)
+    surviving = pruned == ""
+    cv_rmse = np.where(surviving, cv_rmse, np.nan)
+
+    weight_scores = bic if criterion == "bic" else aic
+    weights = akaike_weights(np.where(surviving, weight_scores, np.nan), axis=1)
+    if criterion == "cv":
+        # Series without a cross-validation fold fall back to the AIC
+        ranking = np.where(np.isfinite(cv_rmse).any(axis=1, keepdims=True), cv_rmse,
+                           np.where(surviving, aic, np.nan))
+    else:
+        ranking = np.where(surviving, ranking, np.nan)
+    names = [model.name for model in candidates]
+    winner_column = np.argmin(np.where(np.isfinite(ranking), ranking, np.inf), axis=1)
+
+    scores = pd.DataFrame({
+        "aic": aic.ravel(), "bic": bic.ravel(), "delta": delta.ravel(),
+        "cv_rmse": cv_rmse.ravel(), "pruned": pruned.ravel(),
+        "cost": np.column_stack([fit["cost"] for fit in full]).ravel(),
+        "n_obs": np.repeat(mask.sum(axis=1), len(candidates)),
+    }, index=pd.MultiIndex.from_product([series_ids, names], names=[series_col, "model"]))
+
+    return {
+        "winner": pd.Series(np.array(names, dtype=object)[winner_column], index=index,
+                            name="winner"),
+        "weights": pd.DataFrame(weights, index=index, columns=names),
+        "scores": scores,
+        "params": {model.name: pd.DataFrame({name: fit[name] for name in model.param_names},
+                                            index=index)
+                   for model, fit in zip(candidates, full)},
+        "criterion": criterion,
+        "cv_fits": cv_fits,
+        "cv_fits_skipped": cv_skipped,
+    }
+
+
+def rescale_selection(selection, factor):
+    """
+    Model selection of the same series with production in another unit.
+
+    Scaling the production scales every fit's scale parameter, its cost by
+    ``factor ** 2`` and its forecast errors by ``factor``. The information criteria all
+    shift by ``n_obs * log(factor ** 2)``, so differences, weights, pruning and winners
+    are unit-invariant and nothing is refitted.
+
+    Parameters:
+        selection (dict): Result of `select_models`.
+        factor (float): Unit conversion factor, see `petrocast.utils.units.unit_factor`.
+
+    Returns:
+        dict: Selection with rescaled 'params' and 'scores'.
+    """
+    scores = selection["scores"].copy()
+    shift = scores["n_obs"] * np.log(factor ** 2)
+    scores["aic"] += shift
+    scores["bic"] += shift
+    scores["cost"] *= factor ** 2
+    scores["cv_rmse"] *= factor
+    params = {name: pd.DataFrame(get_model(name).rescale(frame, factor))
+              for name, frame in selection["params"].items()}
+    return dict(selection, scores=scores, params=params)
+
+
+def averaged_projection(selection, years):
+    """
+    Model-averaged production curves of a model selection.
+
+    Parameters:
+        selection (dict): Result of `select_models`.
+        years (array-like): Years to evaluate.
+
+    Returns:
+        pd.DataFrame: One row per series and one column per year, the weighted sum of
+        the candidates' curves.
+    """
+    years = np.asarray(years, dtype=np.float64)
+    weights = selection["weights"]
+    total = np.zeros((len(weights), len(years)))
+    for name, params in selection["params"].items():
+        weight = weights[name].to_numpy()
+        curves = evaluate_batch(get_model(name), years[None, :], params)
+        total += np.where(weight[:, None] > 0, weight[:, None] * curves, 0.0)
+    return pd.DataFrame(total, index=weights.index, columns=years)
@@ -0,0 +1,111 @@
+"""
+Unit conversion of production data, URR estimates and fitted models.
+
+Every commodity has a table with the size of each of its units in the commodity's
+canonical unit (the unit of size 1), e.g. 1 Gb of oil is 6.9 EJ. The tables can be
+extended or overridden from the ``[conversions.<commodity>]`` tables of a configuration.
+
+All production models are linear in their scale parameter (URR or peak production),
+so a fit in one unit converts exactly to any other unit by rescaling that parameter
+(see `DeclineModel.rescale`); results in several units therefore need only one fit.
+"""
+
+import numpy as np
+
+# Size of one unit in the canonical unit of the commodity.
+DEFAULT_CONVERSIONS = {
+    "oil": {"EJ": 1.0, "Gb": 6.9},
+    "copper": {"Mt": 1.0, "kt": 0.001},
+}
+
+
+def conversion_table(overrides=None):
+    """
+    Default conversion table updated with user-supplied units.
+
+    Parameters:
+        overrides (dict, optional): ``{commodity: {unit: size}}`` with the size of each
+            unit in the canonical unit of the commodity.
+
+    Returns:
+        dict: Conversion table of every commodity.
+    """
+    table = {commodity: dict(units) for commodity, units in DEFAULT_CONVERSIONS.items()}
+    for commodity, units in (overrides or {}).items():
+        if not isinstance(units, dict):
+            raise TypeError(f"Conversions of '{commodity}' must be a table of unit sizes.")
+        for unit, size in units.items():
+            if isinstance(size, bool) or not isinstance(size, (int, float)) or size <= 0:
+                raise ValueError(f"Size of unit '{unit}' of '{commodity}' must be a "
+                                 f"positive number, got {size!r}.")
+        table.setdefault(commodity, {}).update({unit: float(size)
+                                                for unit, size in units.items()})
+    return table
+
+
+def canonical_unit(commodity="oil", table=None):
+    """
+    Canonical unit of a commodity (the first unit of size 1).
+
+    Parameters:
+        commodity (str): Commodity name.
+        table (dict, optional): Conversion table, defaults to `DEFAULT_CONVERSIONS`.
+
+    Returns:
+        str or None: The canonical unit, or None if the commodity has no table.
+    """
+    units = (table or DEFAULT_CONVERSIONS).get(commodity, {})
+    return next((unit for unit, size in units.items() if size == 1.0), None)
+
+
+def _unit_sizes(from_unit, to_unit, commodity, table):
+    """Sizes of two units of a commodity in its canonical unit."""
+    units = (table or DEFAULT_CONVERSIONS).get(commodity)
+    if units is None:
+        raise ValueError(f"No unit conversions for commodity '{commodity}'.")
+    missing = [unit for unit in (from_unit, to_unit) if unit not in units]
+    if missing:
+        raise ValueError(f"Unknown unit(s) {missing} for '{commodity}'. "
+                         f"Available units: {list(units)}")
+    return units[from_unit], units[to_unit]
+
+
+def unit_factor(from_unit, to_unit, commodity="oil", table=None):
+    """
+    Factor converting values from one unit to another.
+
+    Parameters:
+        from_unit (str): Unit of the values.
+        to_unit (str): Target unit.
+        commodity (str): Commodity of the values.
+        table (dict, optional): Conversion table, defaults to `DEFAULT_CONVERSIONS`.
+
+    Returns:
+        float: Multiply values in `from_unit` by this factor to get `to_unit`.
+    """
+    if from_unit == to_unit:
+        return 1.0
+    from_size, to_size = _unit_sizes(from_unit, to_unit, commodity, table)
+    return from_size / to_size
+
+
+def convert(values, from_unit, to_unit, commodity="oil", table=None):
+    """
+    Converts production or URR values between units.
+
+    Parameters:
+        values (float or array-like): Values in `from_unit`.
+        from_unit (str): Unit of the values.
+        to_unit (str): Target unit.
+        commodity (str): Commodity of the values.
+        table (dict, optional): Conversion table, defaults to `DEFAULT_CONVERSIONS`.
+
+    Returns:
+        float or np.ndarray: Values in `to_unit`.
+    """
+    if from_unit == to_unit:
+        return values
+    from_size, to_size = _unit_sizes(from_unit, to_unit, commodity, table)
+    if np.ndim(values):
+        return np.asarray(values, dtype=np.float64) * from_size / to_size
+    return float(values) * from_size / to_size
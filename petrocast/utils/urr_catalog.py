@@ -0,0 +1,258 @@
+"""
+Indexed catalog of URR estimates.
+
+Estimate files are parsed once and indexed by commodity and estimate key, so repeated
+lookups (one per scenario, batch worker or watch refresh) are dictionary lookups instead
+of CSV reads. Two layouts are understood:
+
+- ``estimate,value``: one value per estimate, in a unit given when loading.
+- ``Estimations,<description>,Gb,EJ,...``: one column per unit plus a source
+  description, as in ``sorted_oil_endowments_with_estimations.csv``.
+
+Keys are normalized by removing whitespace, so "Estimate 1" and "Estimate1" refer to
+the same estimate. Loaded catalogs are cached per file contents and are read-only, so a
+single catalog can be shared by all scenarios and (pickled) worker processes.
+"""
+
+from pathlib import Path
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+
+# Columns that never hold values in a unit.
+_KEY_COLUMNS = ("estimate", "estimations", "key")
+
+# Latest (signature, catalog) per set of files, commodity and unit.
+_CACHE = {}
+
+
+def normalize_key(key):
+    """Normalizes an estimate key: 'Estimate 1' -> 'Estimate1'."""
+    return "".join(str(key).split())
+
+
+def _read_only(entry):
+    """Read-only view of an index entry."""
+    return MappingProxyType(dict(entry, values=MappingProxyType(entry["values"])))
+
+
+class UrrCatalog:
+    """
+    Read-only index of URR estimates.
+
+    The index holds plain dicts, so catalogs pickle; accessors return read-only views.
+
+    Parameters:
+        entries (iterable): Entries as dicts with 'key', 'commodity', 'values'
+            ({unit: value}) and optionally 'source' and 'file'. Entries with the same
+            commodity and key are merged.
+    """
+
+    def __init__(self, entries=()):
+        index = {}
+        for entry in entries:
+            slot = (entry["commodity"], normalize_key(entry["key"]))
+            merged = index.setdefault(slot, {
+                "key": slot[1], "commodity": slot[0], "values": {}, "source": None,
+                "files": (),
+            })
+            merged["values"].update(entry["values"])
+            merged["source"] = merged["source"] or entry.get("source")
+            if entry.get("file") is not None:
+                merged["files"] += (str(entry["file"]),)
+
+        self._index = index
+        self._by_key = {}
+        self._by_source = {}
+        for slot, entry in index.items():
+            self._by_key.setdefault(slot[1], []).append(slot)
+            if entry["source"]:
+                self._by_source.setdefault(entry["source"], []).append(slot)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return normalize_key(key) in self._by_key
+
+    def commodities(self):
+        """list: Commodities with at least one estimate."""
+        return sorted({commodity for commodity, _ in self._index})
+
+    def keys(self, commodity=None):
+        """
+        Estimate keys, in file order.
+
+        Parameters:
+            commodity (str, optional): Only keys of this commodity.
+
+        Returns:
+            list: Normalized estimate keys.
+        """
+        return [key for slot_commodity, key in self._index
+                if commodity is None or slot_commodity == commodity]
+
+    def entries(self, commodity=None):
+        """
+        All entries, in file order.
+
+        Parameters:
+            commodity (str, optional): Only entries of this commodity.
+
+        Returns:
+            list: Read-only entries (see `entry`).
+        """
+        return [_read_only(entry) for (slot_commodity, _), entry in self._index.items()
+                if commodity is None or slot_commodity == commodity]
+
+    def entry(self, key, commodity=None):
+        """
+        Full catalog entry of an estimate.
+
+        Parameters:
+            key (str): Estimate key (whitespace is ignored).
+            commodity (str, optional): Commodity; may be omitted if the key is unique.
+
+        Returns:
+            Mapping: Read-only entry with 'key', 'commodity', 'values', 'source' and 'files'.
+        """
+        key = normalize_key(key)
+        matches = [self._index[slot] for slot in self._by_key.get(key, ())
+                   if commodity is None or slot[0] == commodity]
+        if not matches:
+            raise ValueError(
+                f"URR key '{key}' not found. Available keys: {self.keys(commodity)}"
+            )
+        if len(matches) > 1:
+            raise ValueError(f"URR key '{key}' exists for several commodities: "
+                             f"{[entry['commodity'] for entry in matches]}")
+        return _read_only(matches[0])
+
+    def lookup(self, key, unit, commodity=None):
+        """
+        URR value of an estimate in a unit.
+
+        Parameters:
+            key (str): Estimate key (whitespace is ignored).
+            unit (str): Unit of the value, e.g. "EJ" or "Gb".
+            commodity (str, optional): Commodity; may be omitted if the key is unique.
+
+        Returns:
+            float: The URR value as given in the estimate file.
+        """
+        entry = self.entry(key, commodity)
+        if unit not in entry["values"]:
+            raise ValueError(f"URR key '{entry['key']}' has no value in '{unit}'. "
+                             f"Available units: {list(entry['values'])}")
+        return entry["values"][unit]
+
+    def estimates(self, unit, commodity=None):
+        """
+        All estimates available in a unit.
+
+        Parameters:
+            unit (str): Unit of the values.
+            commodity (str, optional): Only estimates of this commodity.
+
+        Returns:
+            dict: URR value keyed by estimate key.
+        """
+        return {key: entry["values"][unit]
+                for (slot_commodity, key), entry in self._index.items()
+                if unit in entry["values"] and (commodity is None or slot_commodity == commodity)}
+
+    def values(self, unit, commodity=None):
+        """
+        Estimates in a unit as arrays, for vectorized sweeps.
+
+        Parameters:
+            unit (str): Unit of the values.
+            commodity (str, optional): Only estimates of this commodity.
+
+        Returns:
+            tuple: (keys, values) as a list and a float array.
+        """
+        estimates = self.estimates(unit, commodity)
+        return list(estimates), np.fromiter(estimates.values(), dtype=np.float64,
+                                            count=len(estimates))
+
+    def by_source(self, source):
+        """
+        Estimates with a given source description.
+
+        Parameters:
+            source (str): Source description, e.g. "IEA Reserves + Cumulative Extraction".
+
+        Returns:
+            list: Entries from that source.
+        """
+        return [_read_only(self._index[slot]) for slot in self._by_source.get(source, ())]
+
+
+def read_estimate_file(path, commodity="oil", unit="EJ"):
+    """
+    Parses one URR estimate file into catalog entries.
+
+    Parameters:
+        path (Path or str): CSV file in one of the supported layouts.
+        commodity (str): Commodity of the estimates.
+        unit (str): Unit of the 'value' column of ``estimate,value`` files.
+
+    Returns:
+        list: Entries for `UrrCatalog`.
+    """
+    df = pd.read_csv(path)
+    df.columns = [str(column).strip() for column in df.columns]
+    key_column = next((column for column in df.columns if column.lower() in _KEY_COLUMNS),
+                      None)
+    if key_column is None:
+        raise ValueError(f"No estimate key column found in {path}. "
+                         f"Expected one of {list(_KEY_COLUMNS)}.")
+
+    if "value" in df.columns:
+        unit_columns = {"value": unit}
+        source_column = None
+    else:
+        numeric = [column for column in df.columns if column != key_column
+                   and pd.api.types.is_numeric_dtype(df[column])]
+        unit_columns = {column: column for column in numeric}
+        source_column = next((column for column in df.columns if column != key_column
+                              and column not in numeric), None)
+
+    entries = []
+    for row in df.itertuples(index=False):
+        row = dict(zip(df.columns, row))
+        values = {unit_name: float(row[column]) for column, unit_name in unit_columns.items()
+                  if pd.notna(row[column])}
+        source = str(row[source_column]).strip() if source_column else None
+        entries.append({"key": str(row[key_column]).strip(), "commodity": commodity,
+                        "values": values, "source": source, "file": Path(path)})
+    return entries
+
+
+def load_catalog(*paths, commodity="oil", unit="EJ"):
+    """
+    Loads (or returns the cached) catalog of one or more estimate files.
+
+    The cache is keyed by the files' paths, sizes and modification times, so edited
+    files are re-read and unchanged files are parsed only once per process.
+
+    Parameters:
+        *paths (Path or str): Estimate files.
+        commodity (str): Commodity of the estimates.
+        unit (str): Unit of the 'value' column of ``estimate,value`` files.
+
+    Returns:
+        UrrCatalog: Read-only catalog of all files.
+    """
+    resolved = [Path(path).resolve() for path in paths]
+    signature = tuple((str(path), path.stat().st_mtime_ns, path.stat().st_size)
+                      for path in resolved)
+    cache_key = (tuple(str(path) for path in resolved), commodity, unit)
+    cached = _CACHE.get(cache_key)
+    if cached is None or cached[0] != signature:
+        # Replaces the catalog of earlier file versions, so rewrites do not accumulate
+        entries = [entry for path in resolved
+                   for entry in read_estimate_file(path, commodity, unit)]
+        cached = _CACHE[cache_key] = (signature, UrrCatalog(entries))
+    return cached[1]
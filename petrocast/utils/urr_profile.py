@@ -0,0 +1,208 @@
+"""
+URR estimation from the production history by profile likelihood.
+
+Instead of taking the URR from the estimate file, the fit objective is profiled over a
+grid of URR values: at every grid point the remaining parameters are refitted with the
+total production constrained to that URR. The grid is split into contiguous chunks
+that are evaluated in parallel worker processes; inside a chunk every point is
+warm-started from the fit at its neighbour. The best URR is refined by parabolic
+interpolation and confidence bounds follow from the likelihood-ratio test.
+
+Models whose URR is a fixed input (Hubbert, Gompertz, Richards) are profiled by fixing
+it; models with an implied URR (Laherrère) are profiled by solving their scale
+parameter from the URR constraint.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+from scipy.stats import chi2
+from petrocast.models.registry import get_model
+
+# Minimum number of consecutive grid points handled by one worker.
+_MIN_CHUNK = 8
+
+
+def _profile_free_params(model):
+    """Parameters fitted at a fixed URR: everything except the URR-determined scale."""
+    return tuple(name for name in model.param_names
+                 if name != model.scale_param and name not in model.fixed)
+
+
+def fit_at_urr(model, years, production, urr, p0=None, bounds=None):
+    """
+    Fits a model with its total production constrained to a given URR.
+
+    Parameters:
+        model (str or DeclineModel): Registered model name or instance.
+        years (array-like): Array of years (time).
+        production (array-like): Array of historical production data.
+        urr (float): URR the model's total production is constrained to.
+        p0 (dict, optional): Starting values of the free parameters.
+        bounds (dict, optional): Bounds ``{name: (lower, upper)}`` overriding the model defaults.
+
+    Returns:
+        tuple: (params, sse) with all model parameters keyed by name and the sum of
+        squared residuals.
+    """
+    model = get_model(model)
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
+    free = _profile_free_params(model)
+    scale_index = model.param_names.index(model.scale_param)
+    free_index = [model.param_names.index(name) for name in free]
+
+    guess = model.initial_guess(years, production, urr)
+    guess.update(p0 or {})
+    limits = dict(model.bounds, **(bounds or {}))
+    lower = np.array([limits[name][0] for name in free], dtype=np.float64)
+    upper = np.array([limits[name][1] for name in free], dtype=np.float64)
+    start = np.clip(np.array([guess[name] for name in free], dtype=np.float64), lower, upper)
+
+    def full_args(values, scale=1.0):
+        params = dict(zip(free, values))
+        params.update({name: urr for name in model.fixed})
+        params[model.scale_param] = scale
+        return np.array(model.params_to_args(params), dtype=np.float64)
+
+    def scale_for(values):
+        # The curve is linear in its scale parameter, so is its total production.
+        return urr / model.total(*full_args(values))
+
+    def residuals(values):
+        return model.evaluate(years, *full_args(values, scale_for(values))) - production
+
+    def jacobian(values):
+        scale = scale_for(values)
+        args = full_args(values, scale)
+        full = model.jacobian(years, *args)
+        if model.scale_param in model.fixed:
+            return full[:, free_index]
+        # Chain rule through the scale, which depends on the free parameters via the total.
+        d_scale = np.empty(len(free))
+        for i, index in enumerate(free_index):
+            step = 1e-6 * max(abs(args[index]), 1.0)
+            shifted = args.copy()
+            shifted[scale_index] = 1.0
+            shifted[index] += step
+            total_up = model.total(*shifted)
+            shifted[index] -= 2 * step
+            total_down = model.total(*shifted)
+            d_scale[i] = -urr * (total_up - total_down) / (2 * step) * (scale / urr) ** 2
+        return full[:, free_index] + full[:, [scale_index]] * d_scale
+
+    # Tight tolerances: profile deviances are differences of nearly equal SSE values.
+    result = least_squares(residuals, start, jac=jacobian, bounds=(lower, upper), method="trf",
+                           ftol=1e-12, xtol=1e-12)
+    args = full_args(result.x, scale_for(result.x))
+    params = dict(zip(model.param_names, (float(value) for value in args)))
+    return params, float(2 * result.cost)
+
+
+def _profile_chunk(model, years, production, urr_values, p0, bounds):
+    """Fits consecutive grid points, warm-starting every point from the previous one."""
+    free = _profile_free_params(model)
+    rows = []
+    for urr in urr_values:
+        params, sse = fit_at_urr(model, years, production, urr, p0=p0, bounds=bounds)
+        p0 = {name: params[name] for name in free}
+        rows.append(dict(params, urr=float(urr), sse=sse))
+    return rows
+
+
+def profile_urr(years, production, model="hubbert", urr_grid=None, confidence=0.95,
+                n_jobs=None, bounds=None):
+    """
+    Estimates the URR supported by the production history with a profile-likelihood scan.
+
+    Parameters:
+        years (array-like): Array of years (time).
+        production (array-like): Array of historical production data.
+        model (str or DeclineModel): Registered model name or model instance; instances
+            need not be registered and are sent to the workers as they are.
+        urr_grid (array-like, optional): URR values to profile. Defaults to 60 values
+            spaced geometrically between 1.1 and 10 times the historical cumulative
+            production.
+        confidence (float): Confidence level of the URR bounds.
+        n_jobs (int, optional): Number of worker processes. Defaults to the CPU count,
+            1 evaluates the grid in the calling process. Each worker gets at least
+            eight consecutive grid points.
+        bounds (dict, optional): Bounds ``{name: (lower, upper)}`` overriding the model defaults.
+
+    Returns:
+        dict: {'urr', 'lower', 'upper', 'confidence', 'params', 'profile'} with the
+        best-fit URR, its confidence bounds (NaN when the bound lies outside the grid),
+        the parameters fitted at the best URR and a DataFrame of the profile.
+    """
+    model = get_model(model)
+    years = np.asarray(years, dtype=np.float64)
+    production = np.asarray(production, dtype=np.float64)
+
+    if urr_grid is None:
+        history = float(np.sum(production))
+        urr_grid = np.geomspace(1.1 * history, 10 * history, 60)
+    urr_grid = np.sort(np.asarray(urr_grid, dtype=np.float64))
+    if urr_grid.size < 3:
+        raise ValueError("urr_grid must contain at least three values.")
+
+    # Keep chunks long enough for warm starts to pay off
+    n_jobs = n_jobs or os.cpu_count() or 1
+    n_chunks = max(1, min(n_jobs, urr_grid.size // _MIN_CHUNK))
+    chunks = np.array_split(urr_grid, n_chunks)
+
+    if n_chunks == 1:
+        rows = [row for chunk in chunks
+                for row in _profile_chunk(model, years, production, chunk, None, bounds)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(chunks)) as executor:
+            futures = [executor.submit(_profile_chunk, model, years, production, chunk,
+                                       None, bounds) for chunk in chunks]
+            rows = [row for future in futures for row in future.result()]
+
+    profile = pd.DataFrame(rows)
+    sse = profile["sse"].to_numpy()
+    n_obs = len(production)
+
+    # Parabolic refinement of the minimum in log(URR)
+    best = int(np.argmin(sse))
+    best_urr = urr_grid[best]
+    if 0 < best < len(urr_grid) - 1:
+        x = np.log(urr_grid[best - 1:best + 2])
+        coefficients = np.polyfit(x, sse[best - 1:best + 2], 2)
+        if coefficients[0] > 0:
+            best_urr = float(np.exp(np.clip(-coefficients[1] / (2 * coefficients[0]),
+                                            x[0], x[2])))
+
+    warm = {name: profile.loc[best, name] for name in _profile_free_params(model)}
+    params, best_sse = fit_at_urr(model, years, production, best_urr, p0=warm, bounds=bounds)
+    if best_sse > sse[best]:
+        best_urr, best_sse = urr_grid[best], sse[best]
+        params = {name: float(profile.loc[best, name]) for name in model.param_names}
+
+    # Likelihood-ratio statistic for Gaussian residuals with unknown variance
+    deviance = n_obs * np.log(np.maximum(sse, 1e-300) / max(best_sse, 1e-300))
+    profile["deviance"] = deviance
+    critical = chi2.ppf(confidence, df=1)
+
+    return {
+        "urr": float(best_urr),
+        "lower": _crossing(urr_grid, deviance, critical, best, -1),
+        "upper": _crossing(urr_grid, deviance, critical, best, 1),
+        "confidence": confidence,
+        "params": params,
+        "profile": profile,
+    }
+
+
+def _crossing(grid, deviance, critical, start, direction):
+    """Interpolates where the profile deviance first exceeds the critical value."""
+    index = start
+    while 0 <= index + direction < len(grid):
+        following = index + direction
+        if deviance[following] > critical:
+            fraction = (critical - deviance[index]) / (deviance[following] - deviance[index])
+            return float(grid[index] + fraction * (grid[following] - grid[index]))
+        index = following
+    return float("nan")
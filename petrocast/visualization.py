@@ -1,33 +1,143 @@
 """
 This module provides visualization functionality for plotting production data and model fits
 using Laherrère and Hubbert curve models.
+
+Plot files are content-addressed: the file name is derived from a hash of the plotted
+data and the plot settings, so re-running an unchanged scenario reuses the existing image
+instead of rendering it again. A ``manifest.json`` in the output folder maps each
+scenario to its current image; an image no scenario refers to any more is deleted, so
+repeated runs do not fill the folder. Manifest updates are serialized with a lock file,
+so parallel writers do not lose each other's entries.
 """
-import uuid
+from contextlib import contextmanager
+import hashlib
+import json
+import os
 from pathlib import Path  # Standard library import first
+import tempfile
 import matplotlib.pyplot as plt
 import numpy as np
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
+# Bump when the figure layout changes so that cached images are re-rendered.
+PLOT_STYLE_VERSION = 1
 
-def plot_results(data: dict, laherre_full: np.ndarray, hubbert_full: np.ndarray,
-                 output_path: Path | str):
+MANIFEST_NAME = "manifest.json"
+
+LOCK_NAME = f".{MANIFEST_NAME}.lock"
+
+PLOT_SETTINGS = {
+    "figsize": (14, 7),
+    "title": "Production and Model Fits (Full Curve)",
+    "style_version": PLOT_STYLE_VERSION,
+}
+
+
+def plot_fingerprint(data: dict, laherre_full: np.ndarray, hubbert_full: np.ndarray,
+                     settings: dict = None) -> str:
     """
-    Plots historical production data along with Laherrère and Hubbert model fits.
+    Computes a content hash of everything that ends up in the plot.
 
     Parameters:
-        data (dict): Dictionary containing 'years', 'production', and 'future_years'.
+        data (dict): Dictionary containing 'years', 'production', 'future_years',
+            'tm', 'peak_time' and optionally 'unit'.
         laherre_full (np.ndarray): Laherrère model output.
         hubbert_full (np.ndarray): Hubbert model output.
-        output_path (Path or str): Path where the plot will be saved.
+        settings (dict, optional): Plot settings, defaults to ``PLOT_SETTINGS``.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
     """
-    output_path = Path(output_path)  # Ensure it's a Path object
-    output_path.parent.mkdir(parents=True, exist_ok=True)  # Create directory if needed
+    settings = PLOT_SETTINGS if settings is None else settings
+    digest = hashlib.sha256()
+
+    for array in (data["years"], data["production"], data["future_years"],
+                  laherre_full, hubbert_full):
+        array = np.ascontiguousarray(array, dtype=np.float64)
+        digest.update(str(array.shape).encode())
+        digest.update(array.tobytes())
+
+    labels = {
+        "tm": float(data["tm"]),
+        "peak_time": float(data["peak_time"]),
+        "unit": data.get("unit", "EJ"),
+        "settings": settings,
+    }
+    digest.update(json.dumps(labels, sort_keys=True, default=str).encode())
+
+    return digest.hexdigest()
+
+
+@contextmanager
+def _manifest_lock(output_path: Path):
+    """Holds an exclusive lock on the manifest of an output folder."""
+    with open(output_path / LOCK_NAME, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _write_atomically(target: Path, write):
+    """Writes through a uniquely named temporary file, then renames it to `target`."""
+    with tempfile.NamedTemporaryFile(dir=target.parent, prefix=f".{target.name}.",
+                                     suffix=".tmp", delete=False) as handle:
+        tmp_file = Path(handle.name)
+    try:
+        write(tmp_file)
+        os.replace(tmp_file, target)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+
+def _record_scenario(output_path: Path, scenario: str, filename: str, fingerprint: str):
+    """Records the image of a scenario and deletes the one it replaces (lock held)."""
+    manifest_file = output_path / MANIFEST_NAME
+    manifest = {}
+    if manifest_file.exists():
+        try:
+            manifest = json.loads(manifest_file.read_text(encoding="utf-8"))
+        except (json.JSONDecodeError, OSError):
+            manifest = {}
+
+    previous = manifest.get(scenario, {}).get("file")
+    manifest[scenario] = {"file": filename, "hash": fingerprint}
+    _write_atomically(manifest_file, lambda path: path.write_text(
+        json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8"))
 
+    referenced = {entry.get("file") for entry in manifest.values()}
+    if previous and previous not in referenced:
+        (output_path / previous).unlink(missing_ok=True)
+
+
+def _update_manifest(output_path: Path, scenario: str, filename: str, fingerprint: str):
+    """Records the image used for a scenario and deletes the image it replaces."""
+    with _manifest_lock(output_path):
+        _record_scenario(output_path, scenario, filename, fingerprint)
+
+
+def _render_plot(data: dict, laherre_full: np.ndarray, hubbert_full: np.ndarray,
+                 output_file: Path):
+    """Renders the figure and writes it atomically to `output_file`."""
     years = data["years"]
     production = data["production"]
     future_years = data["future_years"]
 
-    fig, _ = plt.subplots(figsize=(14, 7))
+    fig, _ = plt.subplots(figsize=PLOT_SETTINGS["figsize"])
     full_years = np.arange(years[0], future_years[-1] + 1)
 
     plt.plot(full_years, laherre_full, color="orange", label="Laherrère Model Fit")
@@ -40,14 +150,57 @@ def plot_results(data: dict, laherre_full: np.ndarray, hubbert_full: np.ndarray,
     plt.xlabel("Year")
     unit = data.get("unit", "EJ")  # either unit or EJ as default
     plt.ylabel(f"Production ({unit}/year)")  # Unit defined by TOML
-    plt.title("Production and Model Fits (Full Curve)")
+    plt.title(PLOT_SETTINGS["title"])
     plt.legend()
     plt.grid()
 
-    # Save the figure and close it to avoid file lock issues
-    output_filename = f"results_{data['urr_key']}_{str(uuid.uuid4())[-4:]}.png"
-    fig.savefig(output_path / output_filename)
-    plt.close(fig)
-    plt.close("all")  # Extra safety to close any lingering figures
+    # Render to a unique temporary name first so an interrupted run never leaves a
+    # truncated image under a content-addressed name, even with parallel writers.
+    try:
+        _write_atomically(output_file, lambda path: fig.savefig(path, format="png"))
+    finally:
+        plt.close(fig)
+        plt.close("all")  # Extra safety to close any lingering figures
+
+
+def plot_results(data: dict, laherre_full: np.ndarray, hubbert_full: np.ndarray,
+                 output_path: Path | str, reuse_existing: bool = True) -> Path:
+    """
+    Plots historical production data along with Laherrère and Hubbert model fits.
+
+    Parameters:
+        data (dict): Dictionary containing 'years', 'production', and 'future_years'.
+            An optional 'scenario' entry names the manifest entry (defaults to 'urr_key').
+        laherre_full (np.ndarray): Laherrère model output.
+        hubbert_full (np.ndarray): Hubbert model output.
+        output_path (Path or str): Path where the plot will be saved.
+        reuse_existing (bool): Skip rendering if an image with the same content hash exists.
+
+    Returns:
+        Path: Path to the image for this scenario.
+    """
+    output_path = Path(output_path)  # Ensure it's a Path object
+    output_path.mkdir(parents=True, exist_ok=True)  # Create directory if needed
+
+    fingerprint = plot_fingerprint(data, laherre_full, hubbert_full)
+    output_filename = f"results_{data['urr_key']}_{fingerprint[:16]}.png"
+    output_file = output_path / output_filename
+    scenario = str(data.get("scenario", data["urr_key"]))
+
+    rendered = False
+    while True:
+        # Check and record under one lock: another writer may delete this image when its
+        # own scenario gives it up, so it is rendered again if it disappeared meanwhile.
+        with _manifest_lock(output_path):
+            present = output_file.exists() and output_file.stat().st_size > 0
+            if present and (rendered or reuse_existing):
+                _record_scenario(output_path, scenario, output_filename, fingerprint)
+                break
+        _render_plot(data, laherre_full, hubbert_full, output_file)
+        rendered = True
 
-    print(f"Plot saved to: {output_path}")
+    if rendered:
+        print(f"Plot saved to: {output_file}")
+    else:
+        print(f"Plot unchanged, reusing: {output_file}")
+    return output_file
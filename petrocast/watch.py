@@ -0,0 +1,244 @@
+"""
+Watch mode for the PetroCast application.
+
+Monitors the configuration file, the production dataset and the URR estimate file.
+Bursts of writes are debounced; once the files are quiet, only the scenarios
+(URR estimates) affected by the change are refitted, warm-started from their previous
+fits, and published. Unchanged scenarios keep their cached results.
+"""
+
+import time
+from pathlib import Path
+import numpy as np
+
+from petrocast.result import PetroCastResult
+from petrocast.run import load_config, load_production, load_urr_estimates
+from petrocast.utils.urr_catalog import normalize_key
+
+
+def _file_state(path):
+    """Modification time and size of a file, or None if it does not exist."""
+    try:
+        stat = Path(path).stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def publish_result(result):
+    """Default publisher: prints the summary and writes the (content-addressed) plot."""
+    print(result.summary())
+    result.plot()
+
+
+class PetroCastWatcher:
+    """
+    Refits PetroCast scenarios when their input files change.
+
+    Parameters:
+        config_path (Path or str): Path to the configuration TOML file.
+        urr_keys (list or None): URR estimates to keep up to date; None tracks every
+            estimate in the URR file.
+        root_path (Path): Folder the paths in the configuration are relative to.
+        debounce (float): Seconds the files must be unchanged before a refresh.
+        publish (callable, optional): Called with every refreshed `PetroCastResult`.
+            Defaults to `publish_result`.
+    """
+
+    def __init__(self, config_path, urr_keys, root_path, debounce=0.25, publish=None):
+        self.config_path = Path(config_path)
+        self.urr_keys = (None if urr_keys is None
+                         else [normalize_key(key) for key in urr_keys])
+        self.root_path = Path(root_path)
+        self.debounce = debounce
+        self.publish = publish or publish_result
+
+        self.config = None
+        self.years = None
+        self.production = None
+        self.estimates = {}
+        self.results = {}
+
+        self._states = {}
+        self._pending = set()
+        self._failed = set()
+        self._candidate_paths = []
+        self._last_change = None
+
+    @property
+    def watched_paths(self):
+        """list: Files whose changes trigger a refresh."""
+        paths = [self.config_path]
+        if self.config is not None:
+            paths += [self.config["dataset"], self.config["urr_file"]]
+        # Inputs of a configuration that failed to load are watched for the retry
+        return list(dict.fromkeys(paths + self._candidate_paths))
+
+    def _referenced_paths(self):
+        """Files the configuration on disk refers to (the current one if unreadable)."""
+        if self.config_path not in self._pending:
+            return set(self.watched_paths)
+        try:
+            config = load_config(self.config_path, self.root_path)
+        except (OSError, ValueError, KeyError):
+            return {self.config_path}
+        return {self.config_path, config["dataset"], config["urr_file"]}
+
+    def _scenario_keys(self, estimates=None):
+        """URR keys of the scenarios to keep up to date."""
+        estimates = self.estimates if estimates is None else estimates
+        if self.urr_keys is None:
+            return list(estimates)
+        missing = [key for key in self.urr_keys if key not in estimates]
+        if missing:
+            raise ValueError(
+                f"URR key(s) {missing} not found. Available keys: {list(estimates)}"
+            )
+        return self.urr_keys
+
+    def poll(self, now=None):
+        """
+        Checks the watched files once.
+
+        Parameters:
+            now (float, optional): Current time, defaults to `time.monotonic()`.
+
+        Returns:
+            set: Paths that changed and have been quiet for `debounce` seconds, plus the
+            paths of an earlier failed refresh; empty while nothing changed or a burst
+            of writes is still in progress.
+        """
+        now = time.monotonic() if now is None else now
+        for path in self.watched_paths:
+            state = _file_state(path)
+            if self._states.get(path) != state:
+                self._states[path] = state
+                self._pending.add(path)
+                self._last_change = now
+
+        if not self._pending or now - self._last_change < self.debounce:
+            return set()
+        missing = {path for path in self._pending if self._states.get(path) is None}
+        if missing & self._referenced_paths():
+            return set()  # An input is being replaced; wait until it exists again
+        changed = self._pending | self._failed
+        self._pending, self._failed = set(), set()
+        return changed
+
+    def refresh(self, changed=None):
+        """
+        Reloads changed inputs and refits the affected scenarios.
+
+        All inputs are loaded before any state is replaced, so a failed refresh keeps
+        the previous configuration, data and results. Its changed paths are retried
+        together with the next change of a watched file (including the inputs of the
+        configuration that failed), not repeatedly while the inputs stay broken.
+
+        Parameters:
+            changed (set, optional): Paths that changed. None reloads everything.
+
+        Returns:
+            dict: Refreshed results keyed by URR key.
+        """
+        try:
+            return self._refresh(changed)
+        except Exception:
+            if changed:
+                self._failed |= set(changed)
+            raise
+
+    def _refresh(self, changed):
+        """Loads the inputs into locals and commits them once everything loaded."""
+        reload_all = changed is None or self.config is None or self.config_path in changed
+        previous_config = self.config
+        config = load_config(self.config_path, self.root_path) if reload_all else self.config
+        self._candidate_paths = [config["dataset"], config["urr_file"]]
+        for path in self._candidate_paths:
+            self._states.setdefault(path, _file_state(path))
+
+        years, production = self.years, self.production
+        data_changed = reload_all and (
+            previous_config is None
+            or any(previous_config.get(key) != config.get(key)
+                   for key in ("dataset", "unit", "dataset_unit", "commodity", "conversions"))
+        )
+        data_changed |= not reload_all and config["dataset"] in changed
+        if data_changed:
+            years, production = load_production(config["dataset"], config["unit"],
+                                                config["dataset_unit"], config["commodity"],
+                                                config["conversions"])
+            data_changed = (self.years is None
+                            or not np.array_equal(years, self.years)
+                            or not np.array_equal(production, self.production))
+
+        estimates = self.estimates
+        if reload_all or config["urr_file"] in changed:
+            estimates = load_urr_estimates(config)
+
+        output_changed = previous_config is not None and (
+            previous_config["output_path"] != config["output_path"]
+        )
+
+        results = {}
+        refreshed = {}
+        for key in self._scenario_keys(estimates):
+            current = self.results.get(key)
+            stale = (current is None or data_changed or current.urr != estimates[key]
+                     or current.unit != config["unit"])
+            if stale:
+                warm_start = current.fitted_params if current is not None else None
+                current = PetroCastResult(
+                    years=years,
+                    production=production,
+                    urr=estimates[key],
+                    unit=config["unit"],
+                    urr_key=key,
+                    dataset_name=Path(config["dataset"]).stem,
+                    output_path=config["output_path"],
+                    warm_start=warm_start,
+                    commodity=config["commodity"],
+                    conversions=config["conversions"],
+                )
+            results[key] = current
+            if stale or output_changed:
+                refreshed[key] = current
+
+        # Everything loaded: commit the new state
+        self.config, self.years, self.production = config, years, production
+        self.estimates, self.results = estimates, results
+        for path in self.watched_paths:
+            self._states.setdefault(path, _file_state(path))
+        for result in refreshed.values():
+            result.output_path = config["output_path"]
+            self.publish(result)
+        return refreshed
+
+    def run(self, interval=0.1, max_refreshes=None):
+        """
+        Runs the initial fit and then polls the inputs until interrupted.
+
+        Parameters:
+            interval (float): Seconds between polls.
+            max_refreshes (int, optional): Stop after this many refreshes (mainly for tests).
+        """
+        self.refresh()
+        self.poll()  # Record the initial file states
+        refreshes = 0
+        print(f"Watching {', '.join(str(path) for path in self.watched_paths)} "
+              "(Ctrl+C to stop)")
+        try:
+            while max_refreshes is None or refreshes < max_refreshes:
+                time.sleep(interval)
+                changed = self.poll()
+                if not changed:
+                    continue
+                try:
+                    refreshed = self.refresh(changed)
+                except (OSError, ValueError, KeyError) as error:
+                    # Typically a half-written file; the next write triggers another poll.
+                    print(f"Skipping refresh, could not read inputs: {error}")
+                    continue
+                refreshes += 1
+                print(f"Refreshed {len(refreshed)} scenario(s): {sorted(refreshed)}")
+        except KeyboardInterrupt:
+            print("Stopped watching.")
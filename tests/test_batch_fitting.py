@@ -0,0 +1,135 @@
+"""
+Unit tests for the vectorized batch fitter.
+
+This script checks that series are stacked correctly, that fitting many
+series at once agrees with fitting them one by one, and that streamed batches
+give the same results.
+"""
+
+import itertools
+import unittest
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import HubbertModel, get_model
+from petrocast.utils.batch_fitting import fit_batch, fit_stream, pad_series
+from petrocast.utils.curve_fitting import fit_model
+
+
+class CountingHubbert(HubbertModel):
+    """Hubbert model counting the series it is evaluated for."""
+
+    name = "counting_hubbert"
+
+    def __init__(self):
+        self.evaluated_rows = 0
+
+    def evaluate(self, t, *params):
+        self.evaluated_rows += np.shape(t)[0]
+        return super().evaluate(t, *params)
+
+
+class TestBatchFitting(unittest.TestCase):
+    """Unit tests for `pad_series`, `fit_batch` and `fit_stream`."""
+
+    def setUp(self):
+        """Set up a long-format frame with noisy synthetic series of different lengths."""
+        rng = np.random.default_rng(42)
+        self.truth = {}
+        frames = []
+        for series_id in range(12):
+            years = np.arange(1960 + series_id, 2020, dtype=float)
+            params = {"urr": 1000.0 + 100 * series_id, "steepness": 0.03,
+                      "peak_time": 2031.0 + series_id % 8}
+            production = get_model("hubbert")(years, **params)
+            production *= 1 + 0.02 * rng.standard_normal(len(years))
+            self.truth[f"S{series_id:02d}"] = params
+            frames.append(pd.DataFrame({
+                "series_id": f"S{series_id:02d}", "Year": years,
+                "Production": production, "urr": params["urr"],
+            }))
+        # Shuffle rows so that the stacking has to regroup them
+        self.frame = pd.concat(frames).sample(frac=1, random_state=0)
+
+    def test_pad_series(self):
+        """Test that ragged series are stacked in order with a matching mask."""
+        series_ids, years, production, mask = pad_series(self.frame)
+
+        self.assertEqual(series_ids, sorted(self.truth))
+        self.assertEqual(years.shape, (12, 60))
+        np.testing.assert_array_equal(mask.sum(axis=1), np.arange(60, 48, -1))
+        first = self.frame[self.frame["series_id"] == "S03"].sort_values("Year")
+        np.testing.assert_array_equal(years[3][mask[3]], first["Year"].to_numpy())
+        np.testing.assert_array_equal(production[3][mask[3]], first["Production"].to_numpy())
+
+    def test_pad_series_from_dict(self):
+        """Test stacking from a mapping of (years, production) pairs."""
+        series_ids, years, _, mask = pad_series({"a": ([1, 2, 3], [4, 5, 6]), "b": ([1], [2])})
+        self.assertEqual(series_ids, ["a", "b"])
+        self.assertEqual(years.shape, (2, 3))
+        np.testing.assert_array_equal(mask, [[True, True, True], [True, False, False]])
+
+    def test_fit_batch_matches_single_fits(self):
+        """Test that the batch fitter agrees with fitting each series separately."""
+        result = fit_batch(self.frame, "hubbert", urr="urr")
+
+        self.assertTrue(result["converged"].all())
+        for series_id, params in self.truth.items():
+            series = self.frame[self.frame["series_id"] == series_id].sort_values("Year")
+            single = fit_model("hubbert", series["Year"].to_numpy(),
+                               series["Production"].to_numpy(), params["urr"])
+            for name in ("urr", "steepness", "peak_time"):
+                with self.subTest(series=series_id, param=name):
+                    self.assertAlmostEqual(result.loc[series_id, name], single[name],
+                                           delta=1e-4 * abs(single[name]))
+
+    def test_evaluation_count(self):
+        """Test that every iteration evaluates each active series once and is counted."""
+        model = CountingHubbert()
+        result = fit_batch(self.frame, model, urr="urr")
+        self.assertEqual(model.evaluated_rows, result["nfev"].sum())
+        np.testing.assert_array_equal(result["nfev"], result["iterations"] + 1)
+        np.testing.assert_array_equal(result["njev"], result["iterations"])
+
+    def test_fit_batch_laherrere_without_urr(self):
+        """Test that models without fixed parameters do not need a URR."""
+        result = fit_batch(self.frame, "laherrere")
+        self.assertEqual(len(result), 12)
+        self.assertTrue(np.isfinite(result[["peak_production", "tm", "c"]].to_numpy()).all())
+
+    def test_missing_urr(self):
+        """Test that models with a fixed URR require one for every series."""
+        with self.assertRaises(ValueError):
+            fit_batch(self.frame, "hubbert")
+        with self.assertRaises(ValueError):
+            fit_batch(self.frame, "hubbert", urr={"S00": 1000.0})
+
+    def test_fit_stream_matches_fit_batch(self):
+        """Test that fitting a stream in batches gives the whole-frame results."""
+        series_ids, years, production, mask = pad_series(self.frame)
+        stream = ((series_id, years[row][mask[row]], production[row][mask[row]])
+                  for row, series_id in enumerate(series_ids))
+        urr = {series_id: params["urr"] for series_id, params in self.truth.items()}
+
+        frames = list(fit_stream(stream, "hubbert", urr=urr, batch_size=5))
+        self.assertEqual([len(frame) for frame in frames], [5, 5, 2])
+        streamed = pd.concat(frames)
+        expected = fit_batch(self.frame, "hubbert", urr="urr")
+        np.testing.assert_allclose(streamed["peak_time"], expected.loc[streamed.index, "peak_time"])
+
+    def test_fit_stream_errors(self):
+        """Test that errors of the stream are raised in the consumer and that it can stop early."""
+        def broken():
+            yield "a", np.arange(1950.0, 2000.0), np.ones(50)
+            raise OSError("truncated file")
+
+        with self.assertRaises(OSError):
+            list(fit_stream(broken(), "laherrere", batch_size=1))
+
+        endless = ((index, np.arange(1950.0, 2000.0), np.ones(50)) for index in itertools.count())
+        results = fit_stream(endless, "laherrere", batch_size=2, prefetch=1)
+        self.assertEqual(len(next(results)), 2)
+        results.close()  # Stops the parsing thread
+
+
+if __name__ == '__main__':
+    unittest.main()
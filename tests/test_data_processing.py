@@ -1,22 +1,22 @@
 """
 Unit tests for the data processing script.
 
-This module contains tests for the `load_data` function
-in the data processing utility.
+This module contains tests for the `load_data` and `iter_series`
+functions in the data processing utility.
 """
 
 import os
 import unittest
 import pandas as pd
 import numpy as np
-from petrocast.utils.data_processing import load_data
+from petrocast.utils.data_processing import iter_series, load_data
 
 
 class TestDataProcessing(unittest.TestCase):
     """Unit tests for the data processing functionality."""
 
     def setUp(self):
-        """Set up a temporary CSV file with sample data for testing."""
+        """Set up temporary CSV files with sample data for testing."""
         self.test_csv = 'temp_test_data.csv'
         data = {
             'Year': [2000, 2001, 2002, 2003, 2004, 2005],
@@ -25,10 +25,19 @@ class TestDataProcessing(unittest.TestCase):
         df = pd.DataFrame(data)
         df.to_csv(self.test_csv, index=False)
 
+        self.long_csv = 'temp_test_long_data.csv'
+        long_format = pd.DataFrame({
+            'series_id': ['a', 'a', 'a', 'b', 'b', 'c', 'c', 'c', 'c'],
+            'Year': [2001, 2000, 2002, 2000, 'n/a', 2000, 2001, 2002, 2003],
+            'Production': [2, 1, 3, 10, 11, 5, 6, None, 8],
+        })
+        long_format.to_csv(self.long_csv, index=False)
+
     def tearDown(self):
-        """Remove the temporary CSV file after tests."""
-        if os.path.exists(self.test_csv):
-            os.remove(self.test_csv)
+        """Remove the temporary CSV files after tests."""
+        for path in (self.test_csv, self.long_csv):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_load_data(self):
         """Test loading data from a valid CSV file."""
@@ -41,6 +50,39 @@ class TestDataProcessing(unittest.TestCase):
         np.testing.assert_array_equal(years, expected_years)
         np.testing.assert_array_equal(production, expected_production)
 
+    def test_iter_series(self):
+        """Test that series are assembled across chunk boundaries and cleaned."""
+        for chunksize in (1, 2, 4, 100):
+            series = list(iter_series(self.long_csv, chunksize=chunksize))
+            with self.subTest(chunksize=chunksize):
+                self.assertEqual([series_id for series_id, _, _ in series], ['a', 'b', 'c'])
+                np.testing.assert_array_equal(series[0][1], [2000, 2001, 2002])
+                np.testing.assert_array_equal(series[0][2], [1, 2, 3])
+                np.testing.assert_array_equal(series[1][2], [10])
+                np.testing.assert_array_equal(series[2][1], [2000, 2001, 2003])
+
+    def test_iter_series_ids_across_chunks(self):
+        """Test that ids are parsed the same way in every chunk and missing ids dropped."""
+        with open(self.long_csv, 'w', encoding='utf-8') as file:
+            file.write('series_id,Year,Production\n007,2000,1\n007,2001,2\n007,2002,3\n'
+                       'A1,2000,4\n,2001,5\n')
+        for chunksize in (1, 2, 100):
+            series = list(iter_series(self.long_csv, chunksize=chunksize))
+            with self.subTest(chunksize=chunksize):
+                self.assertEqual([series_id for series_id, _, _ in series], ['007', 'A1'])
+                np.testing.assert_array_equal(series[0][1], [2000, 2001, 2002])
+                np.testing.assert_array_equal(series[1][2], [4])
+
+    def test_iter_series_requires_grouped_rows(self):
+        """Test that a series split by another series raises a ValueError."""
+        pd.DataFrame({
+            'series_id': ['a', 'b', 'a'], 'Year': [2000, 2000, 2001], 'Production': [1, 2, 3],
+        }).to_csv(self.long_csv, index=False)
+        with self.assertRaises(ValueError):
+            list(iter_series(self.long_csv, chunksize=2))
+        unchecked = list(iter_series(self.long_csv, chunksize=2, check_contiguous=False))
+        self.assertEqual([series_id for series_id, _, _ in unchecked], ['a', 'b', 'a'])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+"""
+Unit tests for the fit diagnostics and telemetry.
+
+This script checks the diagnostics records of single and batch fits, and the
+aggregate counters and log sink of `FitTelemetry`.
+"""
+
+import logging
+import unittest
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import get_model
+from petrocast.result import PetroCastResult
+from petrocast.utils.batch_fitting import fit_batch
+from petrocast.utils.curve_fitting import fit_hubbert_curve, fit_model
+from petrocast.utils.fit_diagnostics import FitTelemetry, active_bounds
+
+
+class TestFitDiagnostics(unittest.TestCase):
+    """Unit tests for fit diagnostics records and `FitTelemetry`."""
+
+    def setUp(self):
+        """Set up one history peaking inside and one peaking outside the peak bounds."""
+        self.years = np.arange(1950, 2020, dtype=float)
+        hubbert = get_model("hubbert")
+        self.inside = hubbert(self.years, urr=1000.0, steepness=0.03, peak_time=2035.0)
+        self.outside = hubbert(self.years, urr=1000.0, steepness=0.03, peak_time=2060.0)
+
+    def test_full_output(self):
+        """Test the fields of the diagnostics record of a converged fit."""
+        params, diagnostics = fit_hubbert_curve(self.years, self.inside, 1000.0,
+                                                full_output=True)
+        self.assertAlmostEqual(params["peak_time"], 2035.0, places=3)
+        self.assertEqual(diagnostics["model"], "hubbert")
+        self.assertGreater(diagnostics["nfev"], 0)
+        self.assertLess(diagnostics["cost"], 1e-10)
+        self.assertFalse(diagnostics["at_bound"])
+        self.assertEqual(diagnostics["residuals"].shape, self.years.shape)
+        self.assertEqual(diagnostics["covariance"].shape, (2, 2))
+        self.assertGreaterEqual(diagnostics["condition_number"], 1.0)
+        self.assertGreaterEqual(diagnostics["elapsed"], 0.0)
+
+    def test_pinned_bound_is_reported(self):
+        """Test that a peak pinned at the 2040 bound is flagged."""
+        _, diagnostics = fit_model("hubbert", self.years, self.outside, 1000.0,
+                                   full_output=True)
+        self.assertTrue(diagnostics["at_bound"])
+        self.assertEqual(diagnostics["active_bounds"]["peak_time"], "upper")
+
+    def test_active_bounds(self):
+        """Test bound detection, including unbounded parameters."""
+        active = active_bounds(("a", "b", "c"), [0.0, 5.0, 1e9], [0.0, 0.0, 0.0],
+                               [1.0, 10.0, np.inf])
+        self.assertEqual(active, {"a": "lower"})
+
+    def test_telemetry_summary_and_log_sink(self):
+        """Test the aggregate counters and the logger sink."""
+        logger = logging.getLogger("petrocast.test_telemetry")
+        telemetry = FitTelemetry(sink=logger)
+        with self.assertLogs(logger, level="INFO") as logs:
+            fit_model("hubbert", self.years, self.inside, 1000.0, telemetry=telemetry,
+                      label="inside")
+            fit_model("hubbert", self.years, self.outside, 1000.0, telemetry=telemetry,
+                      label="outside")
+
+        summary = telemetry.summary()
+        self.assertEqual(summary["fits"], 2)
+        self.assertEqual(summary["bound_share"], 0.5)
+        self.assertEqual(summary["bound_hits_by_param"], {"peak_time": 1})
+        self.assertGreater(summary["fits_per_second"], 0)
+        self.assertGreater(summary["mean_nfev"], 0)
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(logs.records[1].levelname, "WARNING")
+        self.assertEqual(len(telemetry.slowest(1)), 1)
+
+    def test_batch_telemetry(self):
+        """Test that the batch fitter records one diagnostics record per series."""
+        frame = pd.concat([
+            pd.DataFrame({"series_id": name, "Year": self.years, "Production": production})
+            for name, production in (("inside", self.inside), ("outside", self.outside))
+        ])
+        records = []
+        telemetry = FitTelemetry(sink=records.append)
+        result = fit_batch(frame, "hubbert", urr=1000.0, telemetry=telemetry)
+
+        self.assertEqual([record["label"] for record in records], ["inside", "outside"])
+        self.assertEqual(result["at_bound"].tolist(), [False, True])
+        self.assertEqual(telemetry.summary()["bound_share"], 0.5)
+
+    def test_result_keeps_diagnostics(self):
+        """Test that PetroCastResult keeps the diagnostics of its fits."""
+        telemetry = FitTelemetry()
+        result = PetroCastResult(self.years, self.inside, 1000.0, telemetry=telemetry)
+        result.peaks  # pylint: disable=pointless-statement
+        self.assertEqual(sorted(result.diagnostics), ["hubbert", "laherrere"])
+        self.assertEqual(telemetry.summary()["fits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for the hierarchical fitting.
+
+This script checks the region tree and its indicator matrix, that aggregated totals
+equal the sums of their parts, the aggregation of ensembles and the comparison with
+direct fits of the aggregated histories.
+"""
+
+import unittest
+import numpy as np
+from petrocast.models.registry import get_model
+from petrocast.utils.hierarchy import Hierarchy, fit_hierarchy
+
+TREE = {"World": {"Europe": {"Norway": None, "UK": None}, "Asia": {"China": None}}}
+
+
+class TestHierarchy(unittest.TestCase):
+    """Unit tests for `Hierarchy` and `fit_hierarchy`."""
+
+    def setUp(self):
+        """Set up Hubbert histories for the leaves of `TREE`."""
+        self.years = np.arange(1950, 2021, dtype=float)
+        self.urr = {"Norway": 300.0, "UK": 200.0, "China": 500.0}
+        hubbert = get_model("hubbert")
+        self.data = {leaf: (self.years, hubbert(self.years, urr=urr, steepness=0.03,
+                                                peak_time=2035.0))
+                     for leaf, urr in self.urr.items()}
+
+    def test_tree(self):
+        """Test node order, leaves and the indicator matrix."""
+        hierarchy = Hierarchy(TREE)
+        self.assertEqual(hierarchy.nodes, ["World", "Europe", "Norway", "UK", "Asia", "China"])
+        self.assertEqual(hierarchy.leaves, ["Norway", "UK", "China"])
+        self.assertEqual(hierarchy.internal_nodes, ["World", "Europe", "Asia"])
+        np.testing.assert_array_equal(hierarchy.indicator.toarray(), [
+            [1, 1, 1], [1, 1, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1], [0, 0, 1],
+        ])
+
+    def test_parent_map(self):
+        """Test that a {node: parent} mapping gives the same hierarchy."""
+        parents = {"Europe": "World", "Norway": "Europe", "UK": "Europe",
+                   "Asia": "World", "China": "Asia"}
+        hierarchy = Hierarchy(parents)
+        self.assertEqual(sorted(hierarchy.nodes), sorted(Hierarchy(TREE).nodes))
+        self.assertEqual(hierarchy.indicator.sum(), 9)
+
+    def test_invalid_trees(self):
+        """Test that cycles and non-dict trees are rejected."""
+        with self.assertRaises(ValueError):
+            Hierarchy({"A": "B", "B": "A"})
+        with self.assertRaises(TypeError):
+            Hierarchy(["World"])
+
+    def test_totals_are_consistent(self):
+        """Test that every node equals the sum of its children."""
+        result = fit_hierarchy(TREE, self.data, urr=self.urr)
+        projection, cumulative = result["projection"], result["cumulative"]
+        np.testing.assert_allclose(projection.loc["World"],
+                                   projection.loc["Europe"] + projection.loc["Asia"])
+        self.assertAlmostEqual(cumulative["Europe"],
+                               cumulative["Norway"] + cumulative["UK"])
+        self.assertEqual(result["leaf_params"].index.tolist(), ["Norway", "UK", "China"])
+        self.assertEqual(result["peak_year"]["World"], 2035)
+
+    def test_ensemble(self):
+        """Test that ensembles are aggregated member by member."""
+        rng = np.random.default_rng(0)
+        ensemble = {leaf: rng.random((4, 151)) for leaf in self.urr}
+        result = fit_hierarchy(TREE, self.data, urr=self.urr, compare=False,
+                               ensemble=ensemble)
+        nodes = result["hierarchy"].nodes
+        self.assertEqual(result["ensemble"].shape, (6, 4, 151))
+        self.assertIsNone(result["comparison"])
+        np.testing.assert_allclose(result["ensemble"][nodes.index("World")],
+                                   sum(ensemble.values()))
+        np.testing.assert_allclose(result["ensemble"][nodes.index("Asia")], ensemble["China"])
+
+    def test_direct_comparison(self):
+        """Test that identical curve shapes give a direct fit equal to the sum."""
+        comparison = fit_hierarchy(TREE, self.data, urr=self.urr)["comparison"]
+        self.assertEqual(comparison.index.tolist(), ["World", "Europe", "Asia"])
+        self.assertAlmostEqual(comparison.loc["World", "urr"], 1000.0)
+        np.testing.assert_allclose(comparison["relative_difference"], 0.0, atol=1e-6)
+
+    def test_missing_leaf(self):
+        """Test that a leaf without data raises a ValueError."""
+        del self.data["UK"]
+        with self.assertRaises(ValueError):
+            fit_hierarchy(TREE, self.data, urr=self.urr)
+
+
+if __name__ == '__main__':
+    unittest.main()
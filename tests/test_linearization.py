@@ -0,0 +1,87 @@
+"""
+Unit tests for the linearized initial guesses.
+
+This script checks that the Hubbert and Gompertz linearizations recover the
+parameters of noise-free histories, work on padded batches, and that the registered
+models fall back to their default guesses where the data do not determine one.
+"""
+
+import unittest
+import numpy as np
+from petrocast.models.linearization import gompertz_linearization, logistic_linearization
+from petrocast.models.registry import get_model
+
+
+class TestLinearization(unittest.TestCase):
+    """Unit tests for `petrocast.models.linearization` and the models' initial guesses."""
+
+    def setUp(self):
+        """Set up noise-free histories peaking after the observed period."""
+        self.years = np.arange(1950, 2020, dtype=float)
+        self.hubbert = get_model("hubbert")(self.years, urr=1000.0, steepness=0.03,
+                                            peak_time=2035.0)
+        self.gompertz = get_model("gompertz")(self.years, urr=1000.0, steepness=0.03,
+                                              peak_time=2035.0)
+        self.mask = np.ones((1, len(self.years)), dtype=bool)
+
+    def test_logistic_known_urr(self):
+        """Test that steepness and peak year are recovered for a known URR."""
+        guess = logistic_linearization(self.years[None], self.hubbert[None], self.mask, 1000.0)
+        self.assertAlmostEqual(guess["steepness"][0], 0.03, places=4)
+        self.assertAlmostEqual(guess["peak_time"][0], 2035.0, delta=0.1)
+
+    def test_logistic_free_urr(self):
+        """Test that the URR is recovered from the history alone."""
+        guess = logistic_linearization(self.years[None], self.hubbert[None], self.mask)
+        self.assertAlmostEqual(guess["urr"][0], 1000.0, delta=1.0)
+
+    def test_gompertz(self):
+        """Test the Gompertz linearization."""
+        guess = gompertz_linearization(self.years[None], self.gompertz[None], self.mask, 1000.0)
+        self.assertAlmostEqual(guess["steepness"][0], 0.03, places=4)
+        self.assertAlmostEqual(guess["peak_time"][0], 2035.0, delta=0.1)
+
+    def test_padded_batch(self):
+        """Test that padded rows give the same guesses as separate rows."""
+        years = np.zeros((2, len(self.years)))
+        production = np.zeros((2, len(self.years)))
+        mask = np.zeros((2, len(self.years)), dtype=bool)
+        years[0], production[0], mask[0] = self.years, self.hubbert, True
+        years[1, :50], production[1, :50], mask[1, :50] = self.years[:50], self.hubbert[:50], True
+
+        batch = logistic_linearization(years, production, mask, np.array([1000.0, 1000.0]))
+        single = logistic_linearization(self.years[None, :50], self.hubbert[None, :50],
+                                        self.mask[:, :50], 1000.0)
+        self.assertAlmostEqual(batch["steepness"][0], 0.03, places=4)
+        self.assertAlmostEqual(batch["steepness"][1], single["steepness"][0])
+
+    def test_model_guesses_within_bounds(self):
+        """Test that every model's initial guess is finite and within its bounds."""
+        for name in ("hubbert", "laherrere", "gompertz", "richards"):
+            model = get_model(name)
+            guess = model.initial_guess(self.years, self.hubbert, 1000.0)
+            with self.subTest(model=name):
+                self.assertEqual(set(guess), set(model.free_params))
+                for param, value in guess.items():
+                    lower, upper = model.bounds[param]
+                    self.assertTrue(lower <= value <= upper)
+
+    def test_laherrere_guess(self):
+        """Test the mapping of the logistic estimate to Laherrère parameters."""
+        production = get_model("laherrere")(self.years, peak_production=12.0, tm=2033.0,
+                                            c=150.0)
+        guess = get_model("laherrere").initial_guess(self.years, production, None)
+        self.assertAlmostEqual(guess["peak_production"], 12.0, delta=0.1)
+        self.assertAlmostEqual(guess["tm"], 2033.0, delta=0.5)
+        self.assertAlmostEqual(guess["c"], 150.0, delta=1.0)
+
+    def test_degenerate_history(self):
+        """Test that histories without information fall back to the default guesses."""
+        production = np.zeros(len(self.years))
+        model = get_model("hubbert")
+        self.assertEqual(model.initial_guess(self.years, production, 1000.0),
+                         model.default_guess)
+
+
+if __name__ == '__main__':
+    unittest.main()
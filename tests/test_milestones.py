@@ -0,0 +1,107 @@
+"""
+Unit tests for the depletion-milestone queries.
+
+This script checks the analytic inverses against the cumulative and production
+curves, and the numerical fallback against the analytic inverses.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import HubbertModel, get_model
+from petrocast.utils.milestones import year_production_below, year_reaching_fraction
+
+
+PARAMS = {
+    "hubbert": {"urr": 1000.0, "steepness": 0.03, "peak_time": 2030.0},
+    "laherrere": {"peak_production": 50.0, "tm": 2035.0, "c": 150.0},
+    "gompertz": {"urr": 1000.0, "steepness": 0.04, "peak_time": 2032.0},
+    "richards": {"urr": 1000.0, "steepness": 0.05, "peak_time": 2034.0, "shape": 2.5},
+}
+
+
+class NumericalHubbert(HubbertModel):
+    """Hubbert model without analytic inverses, to exercise the numerical fallback."""
+
+    name = "numerical_hubbert"
+
+    def inverse_cumulative(self, fraction, *params):
+        raise NotImplementedError
+
+    def inverse_rate(self, rate, *params):
+        raise NotImplementedError
+
+
+class TestMilestones(unittest.TestCase):
+    """Unit tests for `year_reaching_fraction` and `year_production_below`."""
+
+    def test_fraction_years(self):
+        """Test that cumulative production reaches the requested fractions."""
+        fractions = np.array([0.1, 0.5, 0.8, 0.95])
+        for name, params in PARAMS.items():
+            model = get_model(name)
+            args = model.params_to_args(params)
+            years = year_reaching_fraction(name, params, fractions)
+            with self.subTest(model=name):
+                np.testing.assert_allclose(model.cumulative(years, *args) / model.total(*args),
+                                           fractions, rtol=1e-9)
+
+    def test_production_below(self):
+        """Test that production has declined to the thresholds after the peak."""
+        thresholds = np.array([0.5, 2.0, 5.0])
+        for name, params in PARAMS.items():
+            model = get_model(name)
+            args = model.params_to_args(params)
+            years = year_production_below(name, params, thresholds)
+            with self.subTest(model=name):
+                self.assertTrue(np.all(years > params[model.peak_param]))
+                np.testing.assert_allclose(model.evaluate(years, *args), thresholds, rtol=1e-8)
+
+    def test_threshold_edge_cases(self):
+        """Test thresholds above the peak rate and non-positive thresholds."""
+        years = year_production_below("hubbert", PARAMS["hubbert"], [1e6, 0.0])
+        self.assertEqual(years[0], PARAMS["hubbert"]["peak_time"])
+        self.assertTrue(np.isnan(years[1]))
+
+    def test_fraction_of_external_urr(self):
+        """Test fractions of a URR that differs from the model's implied total."""
+        # The Laherrère parameters imply a total of 4 * 50 * 150 / 5 = 6000
+        years = year_reaching_fraction("laherrere", PARAMS["laherrere"], [0.25, 0.75],
+                                       urr=12000.0)
+        self.assertAlmostEqual(years[0], PARAMS["laherrere"]["tm"])
+        self.assertTrue(np.isnan(years[1]))
+
+    def test_numerical_fallback_matches_analytic(self):
+        """Test that root finding agrees with the analytic inverses."""
+        numerical = NumericalHubbert()
+        np.testing.assert_allclose(
+            year_reaching_fraction(numerical, PARAMS["hubbert"], [0.05, 0.5, 0.99]),
+            year_reaching_fraction("hubbert", PARAMS["hubbert"], [0.05, 0.5, 0.99]),
+            atol=1e-6,
+        )
+        np.testing.assert_allclose(
+            year_production_below(numerical, PARAMS["hubbert"], [0.1, 1.0, 1e6, 0.0]),
+            year_production_below("hubbert", PARAMS["hubbert"], [0.1, 1.0, 1e6, 0.0]),
+            atol=1e-6,
+        )
+
+    def test_ensemble_shape(self):
+        """Test that an ensemble of fits gives one row of years per parameter set."""
+        ensemble = pd.DataFrame({"urr": [1000.0, 2000.0, 3000.0],
+                                 "steepness": [0.02, 0.03, 0.04],
+                                 "peak_time": [2030.0, 2031.0, 2032.0]})
+        years = year_reaching_fraction("hubbert", ensemble, [0.5, 0.8])
+        self.assertEqual(years.shape, (3, 2))
+        np.testing.assert_allclose(years[:, 0], ensemble["peak_time"])
+
+        numerical = year_reaching_fraction(NumericalHubbert(), ensemble, [0.5, 0.8])
+        np.testing.assert_allclose(numerical, years, atol=1e-6)
+
+    def test_invalid_fraction(self):
+        """Test that fractions outside (0, 1) raise a ValueError."""
+        with self.assertRaises(ValueError):
+            year_reaching_fraction("hubbert", PARAMS["hubbert"], [0.5, 1.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
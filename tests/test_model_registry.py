@@ -0,0 +1,124 @@
+"""
+Unit tests for the model registry.
+
+This script checks that the Hubbert and Laherrère models agree with their reference
+functions, that the analytic Jacobians and cumulative curves of every model are
+consistent with its production curve, and that the generic fitter recovers known
+parameters.
+"""
+
+import unittest
+import numpy as np
+from petrocast.models.hubbert_curve_model import hubbert_curve
+from petrocast.models.laherrere_model import laherrere_bell_curve
+from petrocast.models.registry import available_models, get_model
+from petrocast.utils.curve_fitting import fit_model
+from petrocast.utils.cumulative_production import calculate_cumulative_production
+
+
+PARAMS = {
+    "hubbert": {"urr": 1000.0, "steepness": 0.03, "peak_time": 2030.0},
+    "laherrere": {"peak_production": 50.0, "tm": 2035.0, "c": 150.0},
+    "gompertz": {"urr": 1000.0, "steepness": 0.04, "peak_time": 2032.0},
+    "richards": {"urr": 1000.0, "steepness": 0.05, "peak_time": 2034.0, "shape": 2.5},
+}
+
+
+class TestModelRegistry(unittest.TestCase):
+    """Unit tests for the registered decline-curve models."""
+
+    def setUp(self):
+        """Set up the evaluation grid."""
+        self.years = np.arange(1950, 2101, dtype=float)
+
+    def test_available_models(self):
+        """Test that the built-in models are registered."""
+        self.assertEqual(available_models(), sorted(PARAMS))
+
+    def test_unknown_model(self):
+        """Test that an unknown model name raises a ValueError."""
+        with self.assertRaises(ValueError):
+            get_model("unknown")
+
+    def test_matches_reference_functions(self):
+        """Test the vectorized evaluation against the reference model functions."""
+        references = {
+            "hubbert": hubbert_curve,
+            "laherrere": laherrere_bell_curve,
+        }
+        for name, reference in references.items():
+            with self.subTest(model=name):
+                expected = reference(self.years, **PARAMS[name])
+                np.testing.assert_allclose(get_model(name)(self.years, **PARAMS[name]), expected)
+
+    def test_richards_reduces_to_hubbert(self):
+        """Test that a shape of one reproduces the Hubbert curve."""
+        richards = get_model("richards")(self.years, **dict(PARAMS["hubbert"], shape=1.0))
+        np.testing.assert_allclose(richards, get_model("hubbert")(self.years, **PARAMS["hubbert"]))
+
+    def test_jacobian_matches_finite_differences(self):
+        """Test the analytic Jacobians against central finite differences."""
+        for name, params in PARAMS.items():
+            model = get_model(name)
+            args = np.array(model.params_to_args(params))
+            jacobian = model.jacobian(self.years, *args)
+            for index in range(len(args)):
+                step = np.zeros_like(args)
+                step[index] = 1e-6 * max(abs(args[index]), 1.0)
+                numeric = (model.evaluate(self.years, *(args + step))
+                           - model.evaluate(self.years, *(args - step))) / (2 * step[index])
+                with self.subTest(model=name, param=model.param_names[index]):
+                    np.testing.assert_allclose(jacobian[:, index], numeric,
+                                               rtol=1e-4, atol=1e-6)
+
+    def test_cumulative_is_integral(self):
+        """Test that the analytic cumulative curve integrates the production curve."""
+        fine_years = np.linspace(1900, 2200, 300001)
+        for name, params in PARAMS.items():
+            model = get_model(name)
+            args = model.params_to_args(params)
+            rate = model.evaluate(fine_years, *args)
+            integral = np.sum((rate[1:] + rate[:-1]) / 2 * np.diff(fine_years))
+            with self.subTest(model=name):
+                self.assertAlmostEqual(
+                    model.cumulative(2200.0, *args) - model.cumulative(1900.0, *args),
+                    integral, delta=1e-4
+                )
+                self.assertAlmostEqual(model.total(*args), model.cumulative(1e6, *args))
+
+    def test_broadcast_over_parameter_sets(self):
+        """Test that parameter arrays evaluate several parameter sets at once."""
+        model = get_model("hubbert")
+        steepness = np.array([[0.02], [0.03]])
+        result = model.evaluate(self.years, 1000.0, steepness, 2030.0)
+        self.assertEqual(result.shape, (2, len(self.years)))
+        np.testing.assert_allclose(result[1], model(self.years, **PARAMS["hubbert"]))
+
+    def test_fit_new_models(self):
+        """Test that the generic fitter recovers the parameters of the new model families."""
+        years = np.arange(1960, 2020, dtype=float)
+        for name in ("gompertz", "richards"):
+            model = get_model(name)
+            production = model(years, **PARAMS[name])
+            fitted = fit_model(name, years, production, PARAMS[name]["urr"])
+            with self.subTest(model=name):
+                self.assertEqual(tuple(fitted), model.param_names)
+                self.assertAlmostEqual(fitted["peak_time"], PARAMS[name]["peak_time"], delta=0.5)
+
+    def test_cumulative_production_ignores_param_order(self):
+        """Test that cumulative production does not depend on parameter order."""
+        years = np.arange(2000, 2020, dtype=float)
+        production = get_model("hubbert")(years, **PARAMS["hubbert"])
+        reordered = dict(reversed(list(PARAMS["hubbert"].items())))
+        expected = calculate_cumulative_production(years, production, PARAMS["hubbert"],
+                                                   hubbert_curve)
+        self.assertAlmostEqual(
+            calculate_cumulative_production(years, production, reordered, hubbert_curve), expected
+        )
+        self.assertAlmostEqual(
+            calculate_cumulative_production(years, production, reordered, "hubbert"), expected
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Unit tests for the model selection.
+
+This script checks the information criteria and Akaike weights, the forward-chaining
+folds, that the generating model is selected for synthetic series, that clearly worse
+candidates are pruned and that the model-averaged projection uses the weights.
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+from petrocast.models.registry import get_model
+from petrocast.result import PetroCastResult
+from petrocast.utils import model_selection
+from petrocast.utils.model_selection import (akaike_weights, averaged_projection,
+                                             forward_folds, information_criteria,
+                                             select_models)
+
+
+class TestModelSelection(unittest.TestCase):
+    """Unit tests for `petrocast.utils.model_selection`."""
+
+    def setUp(self):
+        """Set up noisy Hubbert and Gompertz histories with a known URR."""
+        rng = np.random.default_rng(3)
+        self.years = np.arange(1950, 2021, dtype=float)
+        self.data = {}
+        for index in range(4):
+            for name in ("hubbert", "gompertz"):
+                production = get_model(name)(self.years, urr=1000.0, steepness=0.035,
+                                             peak_time=2032.0 + index)
+                production *= 1 + 0.01 * rng.standard_normal(len(self.years))
+                self.data[f"{name}{index}"] = (self.years, production)
+
+    def test_information_criteria(self):
+        """Test that BIC penalizes parameters more than AIC for n > 7."""
+        aic, bic = information_criteria(np.array([10.0, 10.0]), 50, np.array([2, 3]))
+        self.assertAlmostEqual(aic[1] - aic[0], 2.0)
+        self.assertAlmostEqual(bic[1] - bic[0], np.log(50))
+
+    def test_akaike_weights(self):
+        """Test the weights of two candidates and of a missing score."""
+        weights = akaike_weights(np.array([[0.0, 2.0, np.nan]]))
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertAlmostEqual(weights[0, 0] / weights[0, 1], np.e)
+        self.assertEqual(weights[0, 2], 0.0)
+
+    def test_forward_folds(self):
+        """Test that every fold tests the years right after its training window."""
+        mask = np.ones((1, 30), dtype=bool)
+        folds = forward_folds(mask, folds=2, horizon=5, min_train=10)
+        (train1, test1), (train2, test2) = folds
+        self.assertEqual((train1.sum(), test1.sum()), (20, 5))
+        self.assertEqual((train2.sum(), test2.sum()), (25, 5))
+        self.assertEqual(np.flatnonzero(test1)[0], 20)
+        self.assertFalse(forward_folds(mask, folds=3, horizon=10, min_train=10)[0][1].any())
+
+    def test_selects_generating_model(self):
+        """Test that the generating model wins and that hopeless candidates are pruned."""
+        selection = select_models(self.data, models=["hubbert", "gompertz"], urr=1000.0)
+        truth = [key.rstrip("0123456789") for key in selection["winner"].index]
+        self.assertEqual(selection["winner"].tolist(), truth)
+        np.testing.assert_allclose(selection["weights"].sum(axis=1), 1.0)
+
+        scores = selection["scores"]
+        self.assertEqual(scores.loc[("gompertz0", "hubbert"), "pruned"], "ic")
+        self.assertGreater(selection["cv_fits_skipped"], 0)
+        self.assertEqual(selection["weights"].loc["gompertz0", "hubbert"], 0.0)
+
+    def test_cv_criterion(self):
+        """Test selection by cross-validated forecast error."""
+        selection = select_models(self.data, models=["hubbert", "gompertz"], urr=1000.0,
+                                  criterion="cv", prune_delta=np.inf, prune_ratio=np.inf)
+        self.assertEqual(selection["cv_fits_skipped"], 0)
+        self.assertFalse(selection["scores"]["cv_rmse"].isna().any())
+        self.assertEqual(selection["winner"]["hubbert0"], "hubbert")
+
+    def test_averaged_projection(self):
+        """Test that the averaged projection is the weighted sum of the model curves."""
+        selection = select_models(self.data, models=["hubbert", "gompertz"], urr=1000.0,
+                                  prune_delta=np.inf, folds=0)
+        years = np.arange(2020, 2031, dtype=float)
+        averaged = averaged_projection(selection, years).loc["hubbert1"].to_numpy()
+
+        expected = np.zeros(len(years))
+        for name in ("hubbert", "gompertz"):
+            params = selection["params"][name].loc["hubbert1"].to_dict()
+            expected += selection["weights"].loc["hubbert1", name] * get_model(name)(years,
+                                                                                    **params)
+        np.testing.assert_allclose(averaged, expected)
+
+    def test_errors(self):
+        """Test invalid criteria and missing URRs."""
+        with self.assertRaises(ValueError):
+            select_models(self.data, criterion="rmse", urr=1000.0)
+        with self.assertRaises(ValueError):
+            select_models(self.data, models=["hubbert"])
+
+    def test_result_reports_preferred_model(self):
+        """Test that PetroCastResult reports the preferred model in its summary."""
+        years, production = self.data["hubbert0"]
+        result = PetroCastResult(years, production, 1000.0, urr_key="Estimate1",
+                                 models=("hubbert", "gompertz"))
+        self.assertEqual(result.preferred_model, "hubbert")
+        self.assertIn("Preferred model: Hubbert", result.summary())
+        self.assertEqual(result.averaged_curve().shape, result.full_years.shape)
+
+    def test_result_selection_reuses_fits(self):
+        """Test that the result scores its own fits and only refits cross-validation folds."""
+        years, production = self.data["gompertz1"]
+        result = PetroCastResult(years, production, 1000.0, urr_key="Estimate1",
+                                 models=("hubbert", "gompertz"))
+        with mock.patch.object(model_selection, "fit_padded",
+                               wraps=model_selection.fit_padded) as fit:
+            selection = result.selection
+        self.assertTrue(all("p0" in call.kwargs for call in fit.call_args_list))
+        for name in result.models:
+            with self.subTest(model=name):
+                self.assertEqual(selection["params"][name].iloc[0].to_dict(), result.fit(name))
+                self.assertAlmostEqual(selection["scores"].loc[("Estimate1", name), "cost"],
+                                       result.diagnostics[name]["cost"])
+        weights = result.model_weights
+        np.testing.assert_allclose(result.averaged_curve(),
+                                   sum(weights[name] * result.curve(name)
+                                       for name in result.models))
+
+
+if __name__ == '__main__':
+    unittest.main()
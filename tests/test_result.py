@@ -0,0 +1,85 @@
+"""
+Unit tests for the lazy PetroCastResult object.
+
+This script checks that fits are only computed when read, that model evaluations are
+shared between consumers, and that the results agree with the utility functions.
+"""
+
+import unittest
+from unittest import mock
+import numpy as np
+from petrocast.models.registry import get_model
+from petrocast.result import PetroCastResult
+from petrocast.utils.calculate_future_prod import calculate_future_production
+from petrocast.utils.curve_fitting import fit_model
+from petrocast.utils.cumulative_production import calculate_cumulative_production
+from petrocast.models.hubbert_curve_model import hubbert_curve
+
+
+class TestPetroCastResult(unittest.TestCase):
+    """Unit tests for `PetroCastResult`."""
+
+    def setUp(self):
+        """Set up a synthetic Hubbert history."""
+        self.years = np.arange(1950, 2020, dtype=float)
+        self.urr = 1000.0
+        self.production = get_model("hubbert")(self.years, urr=self.urr, steepness=0.03,
+                                               peak_time=2032.0)
+        self.result = PetroCastResult(self.years, self.production, self.urr, urr_key="Test")
+
+    def test_fits_are_lazy(self):
+        """Test that nothing is fitted until a value is read, and only once."""
+        with mock.patch("petrocast.result.fit_model", wraps=fit_model) as fit:
+            result = PetroCastResult(self.years, self.production, self.urr)
+            fit.assert_not_called()
+
+            result.peak("hubbert")
+            self.assertEqual(fit.call_count, 1)
+
+            result.cumulative("hubbert")
+            result.curves  # pylint: disable=pointless-statement
+            result.peaks  # pylint: disable=pointless-statement
+            self.assertEqual(fit.call_count, 2)
+
+    def test_curves_are_shared(self):
+        """Test that each model is evaluated once for cumulative totals and curves."""
+        with mock.patch("petrocast.result.calculate_model_projection",
+                        side_effect=lambda years, name, params:
+                        get_model(name).evaluate(years, *get_model(name).params_to_args(params))
+                        ) as projection:
+            self.result.cumulative_totals  # pylint: disable=pointless-statement
+            self.result.curves  # pylint: disable=pointless-statement
+            self.assertEqual(projection.call_count, 2)
+
+    def test_matches_utility_functions(self):
+        """Test agreement with the standalone cumulative and projection utilities."""
+        hubbert_params = self.result.fit("hubbert")
+        expected = calculate_cumulative_production(self.years, self.production,
+                                                   hubbert_params, hubbert_curve)
+        self.assertAlmostEqual(self.result.cumulative("hubbert"), expected, places=6)
+
+        data = {"years": self.years, "future_years": self.result.future_years}
+        laherrere_full, hubbert_full = calculate_future_production(
+            data, self.result.fit("laherrere"), hubbert_params
+        )
+        np.testing.assert_allclose(self.result.curve("laherrere"), laherrere_full)
+        np.testing.assert_allclose(self.result.curve("hubbert"), hubbert_full)
+
+        with self.assertWarns(DeprecationWarning):
+            calculate_future_production(data, self.result.fit("laherrere"), hubbert_params,
+                                        self.urr)
+
+    def test_summary(self):
+        """Test that the summary reports the peaks and cumulative totals."""
+        summary = self.result.summary()
+        self.assertIn("Hubbert Model Peak Year", summary)
+        self.assertIn("Laherrère Cumulative", summary)
+
+    def test_plot_requires_output_path(self):
+        """Test that plotting without an output folder raises a ValueError."""
+        with self.assertRaises(ValueError):
+            self.result.plot()
+
+
+if __name__ == '__main__':
+    unittest.main()
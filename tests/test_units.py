@@ -0,0 +1,150 @@
+"""
+Unit tests for the unit conversions.
+
+This script checks the conversion tables and factors, that rescaled fits equal fits in
+the target unit, and that results in several units share a single set of fits.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import get_model
+from petrocast.result import PetroCastResult
+from petrocast.run import run_petrocast
+from petrocast.utils.curve_fitting import fit_model
+from petrocast.utils.units import canonical_unit, conversion_table, convert, unit_factor
+
+
+class TestUnits(unittest.TestCase):
+    """Unit tests for `petrocast.utils.units` and `PetroCastResult.in_unit`."""
+
+    def setUp(self):
+        """Set up a noisy Hubbert history in EJ."""
+        rng = np.random.default_rng(5)
+        self.years = np.arange(1950, 2020, dtype=float)
+        self.production = get_model("hubbert")(self.years, urr=14000.0, steepness=0.03,
+                                               peak_time=2032.0)
+        self.production *= 1 + 0.02 * rng.standard_normal(len(self.years))
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.root)
+
+    def test_factors(self):
+        """Test oil and copper factors and the canonical units."""
+        self.assertAlmostEqual(unit_factor("Gb", "EJ"), 6.9)
+        self.assertAlmostEqual(unit_factor("EJ", "Gb"), 1 / 6.9)
+        self.assertAlmostEqual(convert(2.0, "Mt", "kt", "copper"), 2000.0)
+        self.assertEqual(canonical_unit("copper"), "Mt")
+        self.assertEqual(convert(np.array([6.9]), "EJ", "Gb")[0], 1.0)
+
+    def test_configured_table(self):
+        """Test that configured units extend the defaults and are validated."""
+        table = conversion_table({"oil": {"Mtoe": 0.041868}, "gas": {"EJ": 1.0}})
+        self.assertEqual(set(table["oil"]), {"EJ", "Gb", "Mtoe"})
+        self.assertEqual(canonical_unit("gas", table), "EJ")
+        with self.assertRaises(ValueError):
+            conversion_table({"oil": {"Gb": 0}})
+        with self.assertRaises(TypeError):
+            conversion_table({"oil": 6.9})
+        with self.assertRaises(ValueError):
+            unit_factor("EJ", "Mt")
+
+    def test_rescaled_fit_equals_refit(self):
+        """Test that rescaling a fit gives the fit of the converted data."""
+        factor = unit_factor("EJ", "Gb")
+        for name in ("laherrere", "hubbert"):
+            model = get_model(name)
+            fitted = fit_model(name, self.years, self.production, 14000.0)
+            refit = fit_model(name, self.years, self.production * factor, 14000.0 * factor)
+            rescaled = model.rescale(fitted, factor)
+            with self.subTest(model=name):
+                for param in model.param_names:
+                    self.assertAlmostEqual(rescaled[param], refit[param],
+                                           delta=1e-6 * abs(refit[param]))
+
+    def test_in_unit_shares_fits(self):
+        """Test that results in other units reuse the fits of the original result."""
+        with mock.patch("petrocast.result.fit_model", wraps=fit_model) as fit:
+            result = PetroCastResult(self.years, self.production, 14000.0, urr_key="Test")
+            gb = result.in_unit("Gb")
+            self.assertIs(result.in_unit("Gb"), gb)
+            self.assertIs(gb.in_unit("EJ"), result)
+            fit.assert_not_called()
+
+            self.assertAlmostEqual(gb.cumulative("hubbert"),
+                                   result.cumulative("hubbert") / 6.9)
+            self.assertAlmostEqual(gb.urr, 14000.0 / 6.9)
+            self.assertEqual(gb.peaks, result.peaks)
+            self.assertEqual(fit.call_count, 2)
+
+    def test_in_unit_diagnostics(self):
+        """Test that derived results report diagnostics in their own unit."""
+        result = PetroCastResult(self.years, self.production, 14000.0, urr_key="Test")
+        gb = result.in_unit("Gb")
+        for name in ("laherrere", "hubbert"):
+            _, refit = fit_model(name, self.years, gb.production, gb.urr, full_output=True)
+            gb.fit(name)
+            with self.subTest(model=name):
+                diagnostics = gb.diagnostics[name]
+                self.assertAlmostEqual(diagnostics["sse"], refit["sse"],
+                                       delta=1e-5 * refit["sse"])
+                np.testing.assert_allclose(diagnostics["residuals"], refit["residuals"],
+                                           rtol=1e-3, atol=1e-6 * gb.production.max())
+                for param, error in refit["std_errors"].items():
+                    self.assertAlmostEqual(diagnostics["std_errors"][param], error,
+                                           delta=1e-3 * error)
+                self.assertAlmostEqual(diagnostics["condition_number"],
+                                       refit["condition_number"],
+                                       delta=1e-3 * refit["condition_number"])
+
+    def test_plots_per_unit(self):
+        """Test that every unit gets its own manifest entry."""
+        result = PetroCastResult(self.years, self.production, 14000.0, urr_key="Test",
+                                 dataset_name="data", output_path=self.root)
+        result.plot()
+        result.in_unit("Gb").plot()
+        manifest = json.loads((self.root / "manifest.json").read_text(encoding="utf-8"))
+        self.assertEqual(sorted(manifest), ["data_Test_EJ", "data_Test_Gb"])
+
+    def test_in_unit_selection(self):
+        """Test that the model selection converts without changing the winner."""
+        result = PetroCastResult(self.years, self.production, 14000.0, urr_key="Test",
+                                 models=("hubbert", "gompertz"))
+        gb = result.in_unit("Gb")
+        self.assertEqual(gb.preferred_model, result.preferred_model)
+        self.assertEqual(gb.model_weights, result.model_weights)
+
+        direct = PetroCastResult(self.years, gb.production, gb.urr, urr_key="Test",
+                                 models=("hubbert", "gompertz")).selection["scores"]
+        scores = gb.selection["scores"]
+        np.testing.assert_allclose(scores["aic"], direct["aic"], rtol=1e-6)
+        np.testing.assert_allclose(scores["cost"], direct["cost"], rtol=1e-5)
+
+    def test_run_petrocast_units(self):
+        """Test that a multi-unit run converts the URR and uses a configured unit."""
+        pd.DataFrame({"Year": self.years, "Production": self.production}).to_csv(
+            self.root / "data.csv", index=False
+        )
+        (self.root / "urr.csv").write_text("estimate,value\nEstimate1,14000\n",
+                                           encoding="utf-8")
+        (self.root / "config.toml").write_text(
+            'dataset = "data.csv"\nurr_file = "urr.csv"\noutput_path = "out/"\n'
+            'unit = "EJ"\n\n[conversions.oil]\nMtoe = 0.041868\n',
+            encoding="utf-8",
+        )
+        results = run_petrocast(self.root / "config.toml", "Estimate1", self.root,
+                                units=["EJ", "Gb", "Mtoe"])
+        self.assertEqual(list(results), ["EJ", "Gb", "Mtoe"])
+        self.assertAlmostEqual(results["Mtoe"].urr, 14000.0 / 0.041868)
+        self.assertIs(results["Gb"].in_unit("EJ"), results["EJ"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+Unit tests for the URR estimate catalog.
+
+This script checks that both estimate file layouts are indexed, that keys are
+normalized, that lookups are unit-aware and that loaded catalogs are cached.
+"""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from petrocast.run import run_petrocast
+from petrocast.utils import urr_catalog
+from petrocast.utils.urr_catalog import UrrCatalog, load_catalog, normalize_key
+
+ROOT = Path(__file__).resolve().parents[1]
+ENDOWMENTS = ROOT / "data" / "raw" / "sorted_oil_endowments_with_estimations.csv"
+ESTIMATES = ROOT / "data" / "raw" / "Oil_estimate_sorted.csv"
+
+
+class TestUrrCatalog(unittest.TestCase):
+    """Unit tests for `UrrCatalog` and `load_catalog`."""
+
+    def setUp(self):
+        """Create a temporary folder for generated files."""
+        self.root = Path(tempfile.mkdtemp())
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.root)
+
+    def test_normalize_key(self):
+        """Test that whitespace is removed from keys."""
+        self.assertEqual(normalize_key(" Estimate 1 "), "Estimate1")
+
+    def test_unit_columns(self):
+        """Test lookups in both units of the endowments file."""
+        catalog = load_catalog(ENDOWMENTS)
+        self.assertEqual(catalog.lookup("Estimate 1", "Gb"), 2350.0)
+        self.assertEqual(catalog.lookup("Estimate1", "EJ"), 13423.2)
+        self.assertEqual(catalog.entry("Estimate2")["source"],
+                         "IEA Reserves + Cumulative Extraction")
+        self.assertEqual(catalog.commodities(), ["oil"])
+
+    def test_merged_files(self):
+        """Test that estimates of several files are merged by key."""
+        catalog = load_catalog(ESTIMATES, ENDOWMENTS)
+        self.assertEqual(len(catalog), len(load_catalog(ESTIMATES)))
+        self.assertEqual(set(catalog.entry("Estimate3")["values"]), {"EJ", "Gb"})
+        keys, values = catalog.values("Gb")
+        self.assertEqual(keys[0], "Estimate1")
+        self.assertEqual(values.shape, (len(keys),))
+
+    def test_errors(self):
+        """Test unknown keys and units."""
+        catalog = load_catalog(ESTIMATES)
+        with self.assertRaises(ValueError):
+            catalog.lookup("Estimate99", "EJ")
+        with self.assertRaises(ValueError):
+            catalog.lookup("Estimate1", "Gb")
+
+    def test_read_only(self):
+        """Test that entries cannot be modified."""
+        entry = load_catalog(ENDOWMENTS).entry("Estimate1")
+        with self.assertRaises(TypeError):
+            entry["values"]["EJ"] = 0.0
+
+    def test_pickle(self):
+        """Test that catalogs survive a pickle round trip, e.g. to pool workers."""
+        catalog = load_catalog(ENDOWMENTS)
+        restored = pickle.loads(pickle.dumps(catalog))
+        self.assertEqual(restored.estimates("EJ"), catalog.estimates("EJ"))
+        self.assertIn("Estimate 1", restored)
+        self.assertNotIn("Estimate99", restored)
+
+    def test_commodity_index(self):
+        """Test that equal keys of different commodities are kept apart."""
+        catalog = UrrCatalog([
+            {"key": "Estimate1", "commodity": "oil", "values": {"EJ": 1.0}},
+            {"key": "Estimate1", "commodity": "copper", "values": {"Mt": 2.0}},
+        ])
+        self.assertEqual(catalog.lookup("Estimate1", "Mt", "copper"), 2.0)
+        with self.assertRaises(ValueError):
+            catalog.lookup("Estimate1", "EJ")
+
+    def test_cache(self):
+        """Test that unchanged files are parsed once and edited files again."""
+        path = self.root / "urr.csv"
+        path.write_text("estimate,value\nEstimate1,100\n", encoding="utf-8")
+        first = load_catalog(path)
+        self.assertIs(load_catalog(path), first)
+
+        path.write_text("estimate,value\nEstimate1,200\n", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(load_catalog(path).lookup("Estimate1", "EJ"), 200.0)
+        cached = [key for key in urr_catalog._CACHE  # pylint: disable=protected-access
+                  if key[0] == (str(path.resolve()),)]
+        self.assertEqual(len(cached), 1)
+
+    def test_run_petrocast_in_gb(self):
+        """Test that a configuration in Gb takes the Gb column of the estimate file."""
+        config = self.root / "config.toml"
+        config.write_text(
+            f'dataset = "{(ROOT / "data" / "raw" / "data1_oil_his_havard.csv").as_posix()}"\n'
+            f'urr_file = "{ENDOWMENTS.as_posix()}"\n'
+            f'output_path = "{self.root.as_posix()}"\nunit = "Gb"\n',
+            encoding="utf-8",
+        )
+        result = run_petrocast(config, "Estimate 1", self.root)
+        self.assertEqual(result.urr, 2350.0)
+        self.assertEqual(result.urr_key, "Estimate1")
+
+    def test_run_petrocast_units_listed_in_file(self):
+        """Test that a report unit listed in the estimate file uses the listed value."""
+        dataset = (ROOT / "data" / "raw" / "data1_oil_his_havard.csv").as_posix()
+        results = {}
+        for unit in ("EJ", "Gb"):
+            config = self.root / f"config_{unit}.toml"
+            config.write_text(
+                f'dataset = "{dataset}"\nurr_file = "{ENDOWMENTS.as_posix()}"\n'
+                f'output_path = "{self.root.as_posix()}"\nunit = "{unit}"\n',
+                encoding="utf-8",
+            )
+            results[unit] = run_petrocast(config, "Estimate1", self.root, units=["EJ", "Gb"])
+
+        # 2350 Gb is not 13423.2 EJ converted, so the Gb result is fitted on its own
+        gb = results["EJ"]["Gb"]
+        self.assertEqual(gb.urr, 2350.0)
+        self.assertIsNone(gb._source)  # pylint: disable=protected-access
+        self.assertAlmostEqual(gb.cumulative("hubbert"),
+                               results["Gb"]["Gb"].cumulative("hubbert"), places=6)
+        self.assertEqual(results["Gb"]["EJ"].urr, 13423.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
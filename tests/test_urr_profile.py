@@ -0,0 +1,85 @@
+"""
+Unit tests for the URR profile-likelihood scan.
+
+This script checks that the scan recovers the URR of synthetic histories and that
+the parallel and sequential scans agree.
+"""
+
+import unittest
+import numpy as np
+from petrocast.models.registry import HubbertModel, get_model
+from petrocast.utils.urr_profile import fit_at_urr, profile_urr
+
+
+class UnregisteredHubbert(HubbertModel):
+    """Hubbert model that is not in the registry."""
+
+    name = "unregistered_hubbert"
+
+
+class TestUrrProfile(unittest.TestCase):
+    """Unit tests for `fit_at_urr` and `profile_urr`."""
+
+    def setUp(self):
+        """Set up noisy synthetic Hubbert and Laherrère histories."""
+        rng = np.random.default_rng(1)
+        self.years = np.arange(1950, 2021, dtype=float)
+        self.hubbert = get_model("hubbert")(self.years, urr=1500.0, steepness=0.03,
+                                            peak_time=2035.0)
+        self.hubbert *= 1 + 0.02 * rng.standard_normal(len(self.years))
+        # Implied URR: 4 * 12 * 150 / 5 = 1440
+        self.laherrere = get_model("laherrere")(self.years, peak_production=12.0, tm=2033.0,
+                                                c=150.0)
+        self.laherrere *= 1 + 0.02 * rng.standard_normal(len(self.years))
+
+    def test_fit_at_urr_constrains_total(self):
+        """Test that the constrained fit reproduces the requested URR."""
+        for name, production in (("hubbert", self.hubbert), ("laherrere", self.laherrere)):
+            model = get_model(name)
+            params, sse = fit_at_urr(name, self.years, production, 1800.0)
+            with self.subTest(model=name):
+                self.assertAlmostEqual(model.total(*model.params_to_args(params)), 1800.0,
+                                       places=6)
+                self.assertGreater(sse, 0)
+
+    def test_profile_recovers_urr(self):
+        """Test that the confidence interval contains the true URR."""
+        for name, production, true_urr in (("hubbert", self.hubbert, 1500.0),
+                                           ("laherrere", self.laherrere, 1440.0)):
+            result = profile_urr(self.years, production, name, n_jobs=1)
+            with self.subTest(model=name):
+                self.assertLess(result["lower"], true_urr)
+                self.assertGreater(result["upper"], true_urr)
+                self.assertLess(result["lower"], result["urr"])
+                self.assertGreater(result["upper"], result["urr"])
+                self.assertAlmostEqual(result["urr"], true_urr, delta=0.05 * true_urr)
+                self.assertEqual(len(result["profile"]), 60)
+
+    def test_parallel_matches_sequential(self):
+        """Test that the parallel scan gives the same profile as the sequential one."""
+        grid = np.linspace(1200, 2400, 16)
+        sequential = profile_urr(self.years, self.hubbert, "hubbert", urr_grid=grid, n_jobs=1)
+        parallel = profile_urr(self.years, self.hubbert, "hubbert", urr_grid=grid, n_jobs=2)
+        np.testing.assert_allclose(parallel["profile"]["sse"], sequential["profile"]["sse"],
+                                   rtol=1e-6)
+        self.assertAlmostEqual(parallel["urr"], sequential["urr"], places=3)
+
+    def test_unregistered_model(self):
+        """Test that model instances are used as given, also in worker processes."""
+        grid = np.linspace(1200, 2400, 16)
+        expected = profile_urr(self.years, self.hubbert, "hubbert", urr_grid=grid, n_jobs=1)
+        for n_jobs in (1, 2):
+            result = profile_urr(self.years, self.hubbert, UnregisteredHubbert(),
+                                 urr_grid=grid, n_jobs=n_jobs)
+            with self.subTest(n_jobs=n_jobs):
+                np.testing.assert_allclose(result["profile"]["sse"],
+                                           expected["profile"]["sse"], rtol=1e-6)
+
+    def test_short_grid(self):
+        """Test that a grid with fewer than three values raises a ValueError."""
+        with self.assertRaises(ValueError):
+            profile_urr(self.years, self.hubbert, urr_grid=[1000.0, 2000.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,15 @@ This script tests the functionality of the `plot_results` function, ensuring tha
 creates a plot and saves it as an image file.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+import json
 import unittest
 from pathlib import Path
+from unittest import mock
 import numpy as np
-from petrocast.visualization import plot_results
+from petrocast import visualization
+from petrocast.visualization import (LOCK_NAME, MANIFEST_NAME, _update_manifest,
+                                     plot_results)
 
 
 class TestPlotResults(unittest.TestCase):
@@ -60,10 +65,83 @@ class TestPlotResults(unittest.TestCase):
         # Store the filename for cleanup in tearDown
         self.generated_file = output_file
 
+    def test_unchanged_plot_is_reused(self):
+        """Test that re-plotting identical inputs skips rendering and reuses the file."""
+        first = plot_results(self.data, self.laherrere_full, self.hubbert_full,
+                             self.output_path)
+        self.generated_file = first
+
+        with mock.patch("matplotlib.figure.Figure.savefig") as savefig:
+            second = plot_results(self.data, self.laherrere_full, self.hubbert_full,
+                                  self.output_path)
+
+        savefig.assert_not_called()
+        self.assertEqual(first, second)
+
+        manifest = json.loads((self.output_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(manifest[self.data["urr_key"]]["file"], first.name)
+
+    def test_changed_data_renders_new_file(self):
+        """Test that different plotted data produces a different file name."""
+        first = plot_results(self.data, self.laherrere_full, self.hubbert_full,
+                             self.output_path)
+        changed = dict(self.data, production=np.array([100, 111, 120]))
+        second = plot_results(changed, self.laherrere_full, self.hubbert_full,
+                              self.output_path)
+        self.generated_file = first
+        self.extra_files = [second]
+
+        self.assertNotEqual(first.name, second.name)
+        self.assertTrue(second.exists())
+        self.assertFalse(first.exists())
+
+        manifest = json.loads((self.output_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(manifest[self.data["urr_key"]]["file"], second.name)
+
+    def test_parallel_manifest_updates(self):
+        """Test that concurrent writers keep every scenario in the manifest."""
+        self.generated_file = plot_results(self.data, self.laherrere_full, self.hubbert_full,
+                                           self.output_path)
+
+        def record(index):
+            _update_manifest(self.output_path, f"parallel{index}", self.generated_file.name,
+                             str(index))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(record, range(32)))
+
+        manifest = json.loads((self.output_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(set(manifest) - {self.data["urr_key"]},
+                         {f"parallel{index}" for index in range(32)})
+        self.assertEqual([path.name for path in self.output_path.glob("*.tmp")], [])
+
+    def test_image_deleted_by_another_writer(self):
+        """Test that an image removed before it is recorded is rendered again."""
+        render = visualization._render_plot  # pylint: disable=protected-access
+
+        def render_then_lose(*args):
+            render(*args)
+            if renderer.call_count == 1:
+                args[-1].unlink()  # Another writer's scenario gave this image up
+
+        with mock.patch.object(visualization, "_render_plot",
+                               side_effect=render_then_lose) as renderer:
+            self.generated_file = plot_results(self.data, self.laherrere_full,
+                                               self.hubbert_full, self.output_path)
+
+        self.assertEqual(renderer.call_count, 2)
+        self.assertTrue(self.generated_file.exists())
+        manifest = json.loads((self.output_path / MANIFEST_NAME).read_text(encoding="utf-8"))
+        self.assertEqual(manifest[self.data["urr_key"]]["file"], self.generated_file.name)
+
     def tearDown(self):
         """Clean up generated test files after execution."""
-        if hasattr(self, "generated_file") and self.generated_file.exists():
-            self.generated_file.unlink()
+        for generated in [self.generated_file, *getattr(self, "extra_files", [])]:
+            if generated is not None and generated.exists():
+                generated.unlink()
+
+        for name in (MANIFEST_NAME, LOCK_NAME):
+            (self.output_path / name).unlink(missing_ok=True)
 
         # Remove directory only if empty
         if not any(self.output_path.iterdir()):
@@ -0,0 +1,169 @@
+"""
+Unit tests for the watch mode.
+
+This script checks that changes to the watched files are debounced and that only
+the scenarios affected by a change are refitted.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+import numpy as np
+import pandas as pd
+from petrocast.models.registry import get_model
+from petrocast.utils.curve_fitting import fit_model
+from petrocast.watch import PetroCastWatcher
+
+
+class TestPetroCastWatcher(unittest.TestCase):
+    """Unit tests for `PetroCastWatcher`."""
+
+    def setUp(self):
+        """Write a configuration, dataset and URR file to a temporary folder."""
+        self.root = Path(tempfile.mkdtemp())
+        self.years = np.arange(1950, 2020, dtype=float)
+        self.production = get_model("hubbert")(self.years, urr=1500.0, steepness=0.03,
+                                               peak_time=2035.0)
+        self.write_dataset(self.production)
+        self.write_estimates({"Estimate1": 1500.0, "Estimate2": 2000.0})
+        (self.root / "config.toml").write_text(
+            'dataset = "data.csv"\nurr_file = "urr.csv"\noutput_path = "out/"\nunit = "EJ"\n',
+            encoding="utf-8",
+        )
+        self.published = []
+        self.watcher = PetroCastWatcher(self.root / "config.toml", None, self.root,
+                                        debounce=0.5, publish=self.published.append)
+
+    def tearDown(self):
+        """Remove the temporary folder."""
+        shutil.rmtree(self.root)
+
+    def write_dataset(self, production):
+        """Writes the production history."""
+        pd.DataFrame({"Year": self.years, "Production": production, "Unit": "EJ"}).to_csv(
+            self.root / "data.csv", index=False
+        )
+        self.bump(self.root / "data.csv")
+
+    def write_estimates(self, estimates):
+        """Writes the URR estimate file."""
+        pd.DataFrame({"estimate": list(estimates), "value": list(estimates.values())}).to_csv(
+            self.root / "urr.csv", index=False
+        )
+        self.bump(self.root / "urr.csv")
+
+    @staticmethod
+    def bump(path):
+        """Moves the modification time forward so that every write is detected."""
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    def test_initial_refresh_fits_all_scenarios(self):
+        """Test that the first refresh publishes every estimate of the URR file."""
+        refreshed = self.watcher.refresh()
+        self.assertEqual(sorted(refreshed), ["Estimate1", "Estimate2"])
+        self.assertEqual(len(self.published), 2)
+
+    def test_debounce(self):
+        """Test that a change is only reported once the files have been quiet."""
+        self.watcher.refresh()
+        self.assertEqual(self.watcher.poll(now=0.0), set())
+
+        self.write_estimates({"Estimate1": 1500.0, "Estimate2": 2500.0})
+        self.assertEqual(self.watcher.poll(now=1.0), set())
+        self.write_estimates({"Estimate1": 1500.0, "Estimate2": 2600.0})
+        self.assertEqual(self.watcher.poll(now=1.3), set())
+        self.assertEqual(self.watcher.poll(now=1.9), {self.root / "urr.csv"})
+        self.assertEqual(self.watcher.poll(now=3.0), set())
+
+    def test_only_changed_estimates_are_refitted(self):
+        """Test that a URR file change refits only the estimates whose value changed."""
+        self.watcher.refresh()
+        first = self.watcher.results["Estimate1"]
+        previous = self.watcher.results["Estimate2"].params
+
+        self.write_estimates({"Estimate1": 1500.0, "Estimate2": 2500.0})
+        with mock.patch("petrocast.result.fit_model", wraps=fit_model) as fit:
+            refreshed = self.watcher.refresh({self.root / "urr.csv"})
+            refreshed["Estimate2"].params  # pylint: disable=pointless-statement
+
+        self.assertEqual(list(refreshed), ["Estimate2"])
+        self.assertIs(self.watcher.results["Estimate1"], first)
+        self.assertEqual(refreshed["Estimate2"].urr, 2500.0)
+        # Refits are warm-started from the previous parameters
+        self.assertEqual(fit.call_args_list[0].kwargs["p0"], previous["laherrere"])
+
+    def test_dataset_change_refits_everything(self):
+        """Test that new production data refits every scenario, unchanged data none."""
+        self.watcher.refresh()
+        self.write_dataset(self.production)
+        self.assertEqual(self.watcher.refresh({self.root / "data.csv"}), {})
+
+        self.write_dataset(self.production * 1.01)
+        refreshed = self.watcher.refresh({self.root / "data.csv"})
+        self.assertEqual(sorted(refreshed), ["Estimate1", "Estimate2"])
+
+    def test_failed_refresh_keeps_state(self):
+        """Test that a failed refresh keeps the old state and waits for a new change."""
+        self.watcher.refresh()
+        config = self.root / "config.toml"
+        config.write_text('dataset = "data.csv"\nurr_file = "missing.csv"\n'
+                          'output_path = "out/"\nunit = "Gb"\n', encoding="utf-8")
+        self.bump(config)
+        now = time.monotonic()
+        self.watcher.poll(now=now)
+        changed = self.watcher.poll(now=now + 1)
+        self.assertEqual(changed, {config})
+        with self.assertRaises(OSError):
+            self.watcher.refresh(changed)
+        self.assertEqual(self.watcher.config["unit"], "EJ")
+        np.testing.assert_allclose(self.watcher.production, self.production)
+        self.assertIn(config, self.watcher._failed)  # pylint: disable=protected-access
+        # Not retried while the inputs stay broken
+        self.assertEqual(self.watcher.poll(now=now + 10), set())
+
+        # Creating the missing input of the new configuration triggers the retry
+        shutil.copy(self.root / "urr.csv", self.root / "missing.csv")
+        self.watcher.poll(now=now + 11)
+        changed = self.watcher.poll(now=now + 12)
+        self.assertEqual(changed, {config, self.root / "missing.csv"})
+        refreshed = self.watcher.refresh(changed)
+        self.assertEqual(sorted(refreshed), ["Estimate1", "Estimate2"])
+        np.testing.assert_allclose(self.watcher.production, self.production / 6.9)
+
+    def test_config_change_with_deleted_input(self):
+        """Test that a configuration pointing away from a deleted file is processed."""
+        self.watcher.refresh()
+        shutil.copy(self.root / "data.csv", self.root / "b.csv")
+        config = self.root / "config.toml"
+        config.write_text('dataset = "b.csv"\nurr_file = "urr.csv"\n'
+                          'output_path = "out/"\nunit = "EJ"\n', encoding="utf-8")
+        self.bump(config)
+        (self.root / "data.csv").unlink()
+
+        now = time.monotonic()
+        self.watcher.poll(now=now)
+        changed = self.watcher.poll(now=now + 1)
+        self.assertEqual(changed, {config, self.root / "data.csv"})
+        self.watcher.refresh(changed)
+        self.assertEqual(Path(self.watcher.config["dataset"]).name, "b.csv")
+
+        # A referenced input that is being replaced is still waited for
+        (self.root / "b.csv").unlink()
+        self.watcher.poll(now=now + 2)
+        self.assertEqual(self.watcher.poll(now=now + 3), set())
+
+    def test_unknown_key(self):
+        """Test that tracking a missing URR key raises a ValueError."""
+        watcher = PetroCastWatcher(self.root / "config.toml", ["Estimate9"], self.root,
+                                   publish=self.published.append)
+        with self.assertRaises(ValueError):
+            watcher.refresh()
+
+
+if __name__ == '__main__':
+    unittest.main()